@@ -0,0 +1,50 @@
+"""
+Shared setup for benchmark scripts.
+Must run BEFORE any project import: config.settings reads DB_NAME/LOG_LEVEL
+at import time, and DB_PATH is relative to the working directory.
+"""
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_scratch_database(name="bench.db", **env):
+    """chdir into a fresh temp dir and point the app at a throwaway DB there."""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    workdir = tempfile.mkdtemp(prefix="hrms_bench_")
+    os.chdir(workdir)
+    os.environ["DB_NAME"] = name
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_FILE", os.path.join(workdir, "bench.log"))
+    for key, value in env.items():
+        os.environ[key] = str(value)
+    return workdir
+
+
+def seed_reference_data(cursor, n_employees, role_id=1, dept_id=1):
+    """Minimal departments/roles + n active employees (E00001...)."""
+    cursor.execute("INSERT OR IGNORE INTO departments (dept_id, dept_name) VALUES (?, 'Engineering')", (dept_id,))
+    cursor.execute("""
+        INSERT OR IGNORE INTO roles (role_id, designation, base_pf_percent, tax_deduction, daily_bonus, start_time)
+        VALUES (?, 'SDE-1', 0.12, 1500, 500, '09:30:00')
+    """, (role_id,))
+    cursor.executemany("""
+        INSERT OR IGNORE INTO employees (emp_code, full_name, joining_date, base_salary, dept_id, role_id)
+        VALUES (?, ?, '2024-01-01', ?, ?, ?)
+    """, ((f"E{i:05d}", f"Employee {i}", 30000 + (i % 50) * 1000, dept_id, role_id) for i in range(1, n_employees + 1)))
+
+
+def seed_month_activity(cursor, n_employees, year=2025, month=1, days=22, leaves_every=7):
+    """Attendance for `days` working days per employee + one approved leave for every Nth employee."""
+    dates = [f"{year}-{month:02d}-{d:02d}" for d in range(1, days + 1)]
+    cursor.executemany(
+        "INSERT OR IGNORE INTO attendance_logs (emp_code, date, in_time, status, method) VALUES (?, ?, '09:15:00', 'Present', 'FACE')",
+        ((f"E{i:05d}", d) for i in range(1, n_employees + 1) for d in dates[: 10 + i % (days - 9)]),
+    )
+    cursor.executemany(
+        "INSERT INTO employee_leaves (emp_code, leave_date, leave_type) VALUES (?, ?, 'Casual')",
+        ((f"E{i:05d}", f"{year}-{month:02d}-{days + 2:02d}") for i in range(1, n_employees + 1, leaves_every)),
+    )
@@ -0,0 +1,96 @@
+"""
+Attendance archival on a synthetic 5-year history.
+
+    python -m benchmarks.bench_attendance_archive --employees 300
+
+Seeds 2021-2025 (22 working days a month), pays everyone up to 2025-09, then
+compares live-DB maintenance (VACUUM, backup) and reads before and after
+moving the closed months into yearly archive files.
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+from benchmarks._env import use_scratch_database, seed_reference_data
+
+YEARS = range(2021, 2026)
+CLEARED_UPTO = "2025-09-30"
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def _maintenance(db_path):
+    """(VACUUM seconds, backup seconds, DB bytes)"""
+    conn = sqlite3.connect(db_path)
+    vacuum_s, _ = _timed(lambda: conn.execute("VACUUM"))
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # so the file size reflects the VACUUM
+    target = sqlite3.connect(db_path + ".bak")
+    backup_s, _ = _timed(lambda: conn.backup(target))
+    target.close()
+    conn.close()
+    os.remove(db_path + ".bak")
+    return vacuum_s, backup_s, os.path.getsize(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=300)
+    args = parser.parse_args()
+
+    use_scratch_database()
+    from database.db_connection import Database
+    from database.attendance_archive import archive_closed_months, attendance_history
+    from database.attendance_summary import verify_summary
+    from services.payroll_service import PayrollService
+
+    db = Database()
+    service = PayrollService()
+    codes = [f"E{i:05d}" for i in range(1, args.employees + 1)]
+    dates = [f"{y}-{m:02d}-{d:02d}" for y in YEARS for m in range(1, 13) for d in range(1, 23)]
+
+    conn = db.get_connection()
+    seed_reference_data(conn.cursor(), args.employees)
+    seed_s, _ = _timed(lambda: conn.executemany(
+        "INSERT INTO attendance_logs (emp_code, date, in_time, status, method) VALUES (?, ?, '09:15:00', ?, 'FACE')",
+        ((code, day, "Late" if (i + len(day)) % 9 == 0 else "Present") for day in dates for i, code in enumerate(codes)),
+    ))
+    conn.execute("UPDATE employees SET last_dues_cleared_upto = ?", (CLEARED_UPTO,))
+    conn.commit()
+    conn.close()
+    print(f"seeded {len(dates) * len(codes):,} attendance rows in {seed_s:.1f}s")
+
+    history_sql = """
+        SELECT emp_code, COUNT(*) FROM attendance_history
+        WHERE date >= '2022-03-01' AND date < '2022-04-01' GROUP BY emp_code
+    """
+
+    def measure():
+        payroll_s, payroll = _timed(lambda: service.calculate_payroll(12, 2025))
+        with attendance_history(db, "2022-03-01", "2022-04-01") as conn:
+            history_s, history = _timed(lambda: conn.execute(history_sql).fetchall())
+        conn = db.get_connection()
+        live_rows = conn.execute("SELECT COUNT(*) FROM attendance_logs").fetchone()[0]
+        conn.close()
+        return (live_rows, *_maintenance(db.db_path), payroll_s, history_s), (payroll, history)
+
+    before, results_before = measure()
+    archive_s, summary = _timed(lambda: archive_closed_months(db))
+    after, results_after = measure()
+
+    print(f"archived {summary['moved']:,} rows into {len(summary['years'])} yearly files in {archive_s:.2f}s "
+          f"(archived before {summary['archived_before']})")
+    print(f"{'':>8} {'live_rows':>10} {'vacuum_s':>9} {'backup_s':>9} {'db_MB':>7} {'payroll_s':>10} {'history_s':>10}")
+    for label, (rows, vacuum_s, backup_s, size, payroll_s, history_s) in (("before", before), ("after", after)):
+        print(f"{label:>8} {rows:>10,} {vacuum_s:>9.3f} {backup_s:>9.3f} {size / 1e6:>7.1f} {payroll_s:>10.3f} {history_s:>10.4f}")
+    print(f"payroll identical: {results_before[0] == results_after[0]}, "
+          f"archived month identical: {results_before[1] == results_after[1]}, "
+          f"summary drift rows: {len(verify_summary(db))}")
+
+
+if __name__ == "__main__":
+    main()
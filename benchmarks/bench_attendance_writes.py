@@ -0,0 +1,77 @@
+"""
+Attendance insert throughput under concurrent dashboard readers.
+
+    python -m benchmarks.bench_attendance_writes --writers 8 --readers 4
+    python -m benchmarks.bench_attendance_writes --journal DELETE   # legacy journal for comparison
+"""
+import argparse
+import threading
+import time
+
+from benchmarks._env import use_scratch_database, seed_reference_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=5, help="Attendance days each writer marks per employee slice")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--journal", default="WAL", choices=["WAL", "DELETE"])
+    args = parser.parse_args()
+
+    use_scratch_database(DB_JOURNAL_MODE=args.journal)
+    from database.db_connection import Database
+    from models.attendance_model import AttendanceModel
+    from models.dashboard_model import DashboardModel
+
+    db = Database()
+    conn = db.get_connection()
+    seed_reference_data(conn.cursor(), args.employees)
+    conn.commit()
+    conn.close()
+
+    codes = [f"E{i:05d}" for i in range(1, args.employees + 1)]
+    dates = [f"2025-01-{d:02d}" for d in range(1, args.days + 1)]
+    stop = threading.Event()
+    reads = [0] * args.readers
+    failures = [0] * args.writers
+
+    def writer(idx):
+        model = AttendanceModel()
+        for date_str in dates:
+            for code in codes[idx::args.writers]:
+                ok, _ = model.insert_attendance(code, date_str, "09:00:00", "Present", "FACE")
+                if not ok:
+                    failures[idx] += 1
+
+    def reader(idx):
+        model = DashboardModel()
+        while not stop.is_set():
+            model.get_dashboard_stats()
+            reads[idx] += 1
+
+    reader_threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    for t in reader_threads:
+        t.start()
+
+    start = time.perf_counter()
+    for t in writer_threads:
+        t.start()
+    for t in writer_threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for t in reader_threads:
+        t.join()
+
+    total = len(codes) * len(dates)
+    print(f"journal={args.journal} writers={args.writers} readers={args.readers}")
+    print(f"inserts: {total - sum(failures)}/{total} in {elapsed:.2f}s -> {total / elapsed:,.0f} inserts/sec")
+    print(f"dashboard reads during run: {sum(reads):,} ({sum(reads) / elapsed:,.0f} reads/sec)")
+
+
+if __name__ == "__main__":
+    main()
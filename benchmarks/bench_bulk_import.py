@@ -0,0 +1,96 @@
+"""
+Attendance history import: per-row insert_attendance vs the streaming importer.
+
+    python -m benchmarks.bench_bulk_import --employees 500 --days 400
+
+Writes a synthetic JSONL file, then loads it with the per-row model call
+(first --loop-limit rows only), with bulk_import, and with bulk_import
+--defer-indexes (stopped half way with --limit, then resumed from the
+checkpoint). Reports rows/sec and checks the summary table afterwards.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, timedelta
+
+from benchmarks._env import use_scratch_database, seed_reference_data
+
+
+def write_attendance(path, n_employees, days):
+    start = date(2021, 1, 1)
+    with open(path, "w", encoding="utf-8") as f:
+        for d in range(days):
+            day = (start + timedelta(days=d)).isoformat()
+            for i in range(1, n_employees + 1):
+                late = (i + d) % 9 == 0
+                f.write(json.dumps({"emp_code": f"E{i:05d}", "date": day,
+                                    "in_time": "10:05:00" if late else "09:20:00",
+                                    "status": "Late" if late else "Present"}) + "\n")
+    return n_employees * days
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--loop-limit", type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = use_scratch_database()
+    from database.attendance_summary import verify_summary
+    from database.bulk_import import import_file
+    from database.db_connection import Database
+    from models.attendance_model import AttendanceModel
+
+    db = Database()
+    conn = db.get_connection()
+    seed_reference_data(conn.cursor(), args.employees)
+    conn.commit()
+    conn.close()
+
+    path = os.path.join(workdir, "attendance.jsonl")
+    rows = write_attendance(path, args.employees, args.days)
+    print(f"{rows} attendance rows, {os.path.getsize(path) / 1e6:.0f} MB JSONL")
+
+    def reset():
+        db.execute_write(lambda cursor: (cursor.execute("DELETE FROM attendance_logs"),
+                                         cursor.execute("DELETE FROM import_checkpoints")))
+
+    # 1. Per-row model call (one transaction per row)
+    model = AttendanceModel()
+    loop_rows = min(rows, args.loop_limit)
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(next(f)) for _ in range(loop_rows)]
+    start = time.perf_counter()
+    for r in records:
+        model.insert_attendance(r["emp_code"], r["date"], r["in_time"], r["status"], "IMPORT")
+    loop_rate = loop_rows / (time.perf_counter() - start)
+    print(f"{'insert_attendance loop':<28} {loop_rate:>10.0f} rows/sec  ({loop_rows} rows)")
+    reset()
+
+    # 2. Streaming importer, indexes maintained per row
+    summary = import_file(db, "attendance", path)
+    print(f"{'bulk_import':<28} {summary['rows_per_sec']:>10.0f} rows/sec  ({summary['inserted']} rows)")
+    reset()
+
+    # 3. Deferred indexes, interrupted half way and resumed
+    start = time.perf_counter()
+    first = import_file(db, "attendance", path, defer_indexes=True, limit=rows // 2)
+    second = import_file(db, "attendance", path, defer_indexes=True)
+    seconds = time.perf_counter() - start
+    print(f"{'bulk_import --defer-indexes':<28} {rows / seconds:>10.0f} rows/sec  "
+          f"({first['inserted']} + {second['inserted']} rows, resumed at {second['resumed_from']})")
+
+    conn = db.get_connection()
+    loaded = conn.execute("SELECT COUNT(*) FROM attendance_logs").fetchone()[0]
+    indexes = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name = 'idx_attendance_date_emp'"
+    ).fetchone()[0]
+    conn.close()
+    print(f"rows loaded {loaded}/{rows}, date index restored: {bool(indexes)}, "
+          f"summary drift: {len(verify_summary(db))}, speedup vs loop: {rows / seconds / loop_rate:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
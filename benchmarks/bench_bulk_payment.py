@@ -0,0 +1,62 @@
+"""
+Closing a month: per-employee mark_as_paid vs one-transaction mark_all_as_paid.
+
+    python -m benchmarks.bench_bulk_payment --sizes 1000 10000
+
+The per-employee loop is skipped above --loop-limit employees. Each size also
+re-runs the bulk payment to show the idempotency key turning it into a no-op.
+"""
+import argparse
+import time
+
+from benchmarks._env import use_scratch_database, seed_reference_data, seed_month_activity
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--loop-limit", type=int, default=2000)
+    args = parser.parse_args()
+
+    use_scratch_database()
+    from database.db_connection import Database
+    from services.payroll_service import PayrollService
+
+    db = Database()
+    service = PayrollService()
+    print(f"{'employees':>9} {'loop_s':>8} {'bulk_s':>8} {'rerun_s':>8} {'slips':>7}")
+    for month, size in enumerate(sorted(args.sizes), start=1):
+        conn = db.get_connection()
+        seed_reference_data(conn.cursor(), size)
+        seed_month_activity(conn.cursor(), size, month=month)
+        conn.commit()
+        conn.close()
+        payroll = service.calculate_payroll(month, 2025)
+
+        loop_s = "-"
+        if size <= args.loop_limit:
+            # Same amounts, previous year's key, so the bulk run below still has work to do
+            start = time.perf_counter()
+            for data in payroll:
+                service.mark_as_paid(data['emp_code'], month, 2025 - 1, data['net_salary'])
+            loop_s = f"{time.perf_counter() - start:.2f}"
+
+        start = time.perf_counter()
+        success, msg = service.mark_all_as_paid(month, 2025, payroll)
+        bulk_s = time.perf_counter() - start
+        if not success:
+            raise SystemExit(msg)
+
+        start = time.perf_counter()
+        service.mark_all_as_paid(month, 2025, payroll)
+        rerun_s = time.perf_counter() - start
+
+        conn = db.get_connection()
+        slips = conn.execute("SELECT COUNT(*) FROM salary_slips WHERE month_year = ?",
+                             (f"{month}-2025",)).fetchone()[0]
+        conn.close()
+        print(f"{size:>9} {loop_s:>8} {bulk_s:>8.3f} {rerun_s:>8.3f} {slips:>7}")
+
+
+if __name__ == "__main__":
+    main()
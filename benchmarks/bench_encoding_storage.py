@@ -0,0 +1,74 @@
+"""
+Startup load time and DB size of face encodings: pickle BLOBs vs binary format.
+
+    python -m benchmarks.bench_encoding_storage --samples 10000
+
+Seeds legacy pickle rows, measures the old pickle.loads load path, runs the
+in-place migration (+ VACUUM) and measures AttendanceModel.get_all_encodings.
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from benchmarks._env import use_scratch_database, seed_reference_data
+
+SAMPLES_PER_EMPLOYEE = 5
+
+
+def legacy_load(conn):
+    """The pre-migration load path (row-by-row pickle.loads into a list)."""
+    rows = conn.execute("""
+        SELECT f.encoding, e.emp_code FROM face_encodings f
+        JOIN employees e ON f.emp_code = e.emp_code WHERE e.is_active = 1
+    """).fetchall()
+    return [pickle.loads(blob) for blob, _ in rows], [code for _, code in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=10000)
+    args = parser.parse_args()
+
+    use_scratch_database()
+    from database.db_connection import Database
+    from database.migrate_encodings import database_size, migrate_encodings
+    from models.attendance_model import AttendanceModel
+
+    n_emp = max(1, args.samples // SAMPLES_PER_EMPLOYEE)
+    db = Database()
+    conn = db.get_connection()
+    seed_reference_data(conn.cursor(), n_emp)
+    rng = np.random.default_rng(0)
+    conn.executemany(
+        "INSERT INTO face_encodings (emp_code, encoding) VALUES (?, ?)",
+        ((f"E{i // SAMPLES_PER_EMPLOYEE + 1:05d}", pickle.dumps(rng.normal(size=128)))
+         for i in range(n_emp * SAMPLES_PER_EMPLOYEE)),
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+
+    size_before = database_size(conn)
+    start = time.perf_counter()
+    encodings, _ = legacy_load(conn)
+    pickle_s = time.perf_counter() - start
+    conn.close()
+
+    migrate_encodings(db)
+    conn = db.get_connection()
+    conn.execute("VACUUM")
+    size_after = database_size(conn)
+    conn.close()
+
+    start = time.perf_counter()
+    matrix, _ = AttendanceModel().get_all_encodings()
+    binary_s = time.perf_counter() - start
+
+    print(f"samples: {len(encodings):,} -> {len(matrix):,}")
+    print(f"pickle : load {pickle_s * 1000:8.1f} ms   DB {size_before / 1e6:6.2f} MB")
+    print(f"binary : load {binary_s * 1000:8.1f} ms   DB {size_after / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
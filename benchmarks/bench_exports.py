@@ -0,0 +1,48 @@
+"""
+Streaming CSV exports: time and peak Python memory vs headcount.
+
+    python -m benchmarks.bench_exports --sizes 2000 20000
+
+Peak memory (tracemalloc) should stay roughly flat as headcount grows,
+since rows are fetched and written one employee chunk at a time.
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from benchmarks._env import use_scratch_database, seed_reference_data, seed_month_activity
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000])
+    args = parser.parse_args()
+
+    workdir = use_scratch_database()
+    from database.db_connection import Database
+    from services.report_export import export_attendance_matrix, export_payroll_register
+
+    db = Database()
+    print(f"{'employees':>9} {'report':>10} {'rows':>7} {'seconds':>8} {'rows/s':>8} {'peak_kb':>8} {'file_kb':>8}")
+    for month, size in enumerate(sorted(args.sizes), start=1):
+        conn = db.get_connection()
+        seed_reference_data(conn.cursor(), size)
+        seed_month_activity(conn.cursor(), size, month=month)
+        conn.commit()
+        conn.close()
+
+        for name, export in (("payroll", export_payroll_register), ("attendance", export_attendance_matrix)):
+            path = os.path.join(workdir, f"{name}_{size}.csv")
+            tracemalloc.start()
+            start = time.perf_counter()
+            summary = export(month, 2025, path=path)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{size:>9} {name:>10} {summary['rows']:>7} {seconds:>8.2f} {summary['rows'] / seconds:>8.0f} "
+                  f"{peak / 1024:>8.0f} {os.path.getsize(path) / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Recall@1 and per-query latency of the IVF face index vs exact brute force.
+
+    python -m benchmarks.bench_face_index --sizes 5000 20000 50000 --nprobe 4 8 16
+
+Synthetic gallery: each employee has a random centre on the unit-ish sphere
+scale of real dlib embeddings, with SAMPLES noisy samples around it.
+Queries are fresh noisy views of random enrolled employees. Also checks
+that a query whose probed lists were all emptied by without() (hot removal)
+still gets a match among the remaining employees.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks._env import use_scratch_database
+
+SAMPLES_PER_EMPLOYEE = 5
+
+
+def synthetic_gallery(n_samples, rng, spread=0.35, noise=0.06):
+    n_emp = max(1, n_samples // SAMPLES_PER_EMPLOYEE)
+    centres = rng.normal(scale=spread / np.sqrt(128), size=(n_emp, 128)).astype(np.float32)
+    ids = np.repeat([f"E{i:06d}" for i in range(n_emp)], SAMPLES_PER_EMPLOYEE)
+    samples = np.repeat(centres, SAMPLES_PER_EMPLOYEE, axis=0)
+    samples += rng.normal(scale=noise / np.sqrt(128), size=samples.shape).astype(np.float32)
+    return centres, samples, ids
+
+
+def time_queries(matcher, queries):
+    start = time.perf_counter()
+    results = [matcher.match([q], tolerance=10.0)[0][0] for q in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def check_emptied_lists(index, query):
+    """Removes every employee in the query's nearest list, then matches with n_probe=1."""
+    nearest = int(np.argmin(((index.centroids - query) ** 2).sum(axis=1)))
+    rows = index._list_rows[index._list_offsets[nearest]:index._list_offsets[nearest + 1]]
+    removed = set(index.ids[rows])
+    index.n_probe = 1
+    emp_code, dist = index.without(removed).match([query], tolerance=10.0)[0]
+    assert emp_code is not None and emp_code not in removed, (emp_code, dist)
+    return len(removed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 50000])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    use_scratch_database()
+    from services.face_matcher import FaceMatcher
+    from services.face_index import IVFFaceIndex
+
+    rng = np.random.default_rng(42)
+    print(f"{'samples':>8} {'index':>12} {'build_s':>8} {'ms/query':>9} {'recall@1':>9}")
+    for size in args.sizes:
+        centres, samples, ids = synthetic_gallery(size, rng)
+        picks = rng.integers(0, len(centres), size=args.queries)
+        queries = centres[picks] + rng.normal(scale=0.06 / np.sqrt(128), size=(args.queries, 128)).astype(np.float32)
+
+        start = time.perf_counter()
+        exact = FaceMatcher(samples, ids)
+        build_s = time.perf_counter() - start
+        truth, exact_ms = time_queries(exact, queries)
+        print(f"{size:>8} {'exact':>12} {build_s:>8.2f} {exact_ms:>9.3f} {1.0:>9.3f}")
+
+        for n_probe in args.nprobe:
+            start = time.perf_counter()
+            index = IVFFaceIndex(samples, ids, n_probe=n_probe)
+            build_s = time.perf_counter() - start
+            found, ivf_ms = time_queries(index, queries)
+            recall = np.mean([a == b for a, b in zip(found, truth)])
+            print(f"{size:>8} {'ivf/p' + str(n_probe):>12} {build_s:>8.2f} {ivf_ms:>9.3f} {recall:>9.3f}")
+
+        removed = check_emptied_lists(index, queries[0])
+        print(f"{size:>8} emptied nearest list ({removed} employees removed): match ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Monthly payroll: per-employee calculate_salary loop vs bulk calculate_payroll.
+
+    python -m benchmarks.bench_payroll_run --sizes 1000 10000 50000
+
+The per-employee loop is skipped above --loop-limit employees (it is 3N+1 queries).
+"""
+import argparse
+import time
+
+from benchmarks._env import use_scratch_database, seed_reference_data, seed_month_activity
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--loop-limit", type=int, default=10000)
+    args = parser.parse_args()
+
+    use_scratch_database()
+    from database.db_connection import Database
+    from services.payroll_service import PayrollService
+
+    db = Database()
+    service = PayrollService()
+    seeded = 0
+    print(f"{'employees':>9} {'loop_s':>8} {'bulk_s':>8} {'speedup':>8} {'match':>6}")
+    for size in sorted(args.sizes):
+        conn = db.get_connection()
+        seed_reference_data(conn.cursor(), size)
+        seed_month_activity(conn.cursor(), size)
+        conn.commit()
+        conn.close()
+        seeded = size
+
+        start = time.perf_counter()
+        bulk = service.calculate_payroll(1, 2025)
+        bulk_s = time.perf_counter() - start
+
+        if size <= args.loop_limit:
+            start = time.perf_counter()
+            loop = [service.calculate_salary(f"E{i:05d}", 1, 2025) for i in range(1, seeded + 1)]
+            loop_s = time.perf_counter() - start
+            same = "yes" if loop == bulk else "NO"
+            print(f"{size:>9} {loop_s:>8.2f} {bulk_s:>8.3f} {loop_s / bulk_s:>7.1f}x {same:>6}")
+        else:
+            print(f"{size:>9} {'-':>8} {bulk_s:>8.3f} {'-':>8} {'-':>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Payslip rendering cost: legacy per-slip canvas vs template-cached renderer.
+
+    python -m benchmarks.bench_payslip_render --slips 5000
+
+Single process, so the numbers compare rendering work only (the batch
+service multiplies the per-file paths by its worker count).
+"""
+import argparse
+import os
+import time
+import zipfile
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from benchmarks._env import use_scratch_database
+
+
+def legacy_render_payslip(salary_data, filename):
+    """The original renderer (whole layout redrawn per slip), kept as the baseline."""
+    c = canvas.Canvas(filename, pagesize=letter)
+    width, height = letter
+
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(50, height - 50, "SMART HRMS - MONTHLY PAYSLIP")
+
+    c.setFont("Helvetica", 12)
+    c.drawString(50, height - 80, f"Employee: {salary_data['name']} ({salary_data['emp_code']})")
+    c.drawString(50, height - 100, f"Department: {salary_data['dept']} | Role: {salary_data['role']}")
+    c.drawString(400, height - 80, f"Period: {salary_data['month_year']}")
+    c.line(50, height - 120, 550, height - 120)
+
+    y = height - 150
+    c.drawString(50, y, "EARNINGS")
+    c.drawString(300, y, "DEDUCTIONS")
+    y -= 20
+
+    c.setFont("Helvetica", 10)
+    c.drawString(50, y, f"Base Salary: {salary_data['base_salary']}")
+    c.drawString(50, y-20, f"Payable Days: {salary_data['present_days'] + salary_data['leaves']}")
+    c.drawString(50, y-40, f"Performance Bonus: {salary_data['bonus']}")
+    c.drawString(300, y, f"Provident Fund (PF): {salary_data['pf']}")
+    c.drawString(300, y-20, f"Professional Tax: {salary_data['tax']}")
+
+    c.setFont("Helvetica-Bold", 14)
+    c.setFillColor(colors.darkblue)
+    c.drawString(50, y-80, f"NET PAYABLE SALARY: INR {salary_data['net_salary']}")
+    c.save()
+    return filename
+
+
+def synthetic_payroll(n):
+    return [{
+        "emp_code": f"E{i:05d}", "name": f"Employee {i}", "dept": "Engineering", "role": "SDE-1",
+        "month_year": "January 2025", "base_salary": 30000.0 + i, "present_days": 20, "leaves": 1,
+        "pf": 2520.0, "tax": 1500.0, "bonus": 10000.0, "net_salary": 27380.0, "status": "Generated",
+    } for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slips", type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = use_scratch_database()
+    from services.payslip_renderer import PayslipRenderer, payslip_filename
+
+    payroll = synthetic_payroll(args.slips)
+    renderer = PayslipRenderer()
+
+    def legacy_files():
+        out = os.path.join(workdir, "legacy")
+        os.makedirs(out, exist_ok=True)
+        for data in payroll:
+            legacy_render_payslip(data, payslip_filename(data, out))
+
+    def template_files():
+        out = os.path.join(workdir, "template")
+        os.makedirs(out, exist_ok=True)
+        for data in payroll:
+            renderer.render_file(data, payslip_filename(data, out))
+
+    def template_zip():
+        # Same stored-entry ZIP as generate_payslips_batch(output_format='zip'), one process
+        with zipfile.ZipFile(os.path.join(workdir, "payslips.zip"), "w", compression=zipfile.ZIP_STORED) as archive:
+            for data in payroll:
+                archive.writestr(os.path.basename(payslip_filename(data)), renderer.render_bytes(data))
+
+    cases = [
+        ("legacy per-file", legacy_files),
+        ("template per-file", template_files),
+        ("template merged PDF", lambda: renderer.write_merged(payroll, os.path.join(workdir, "merged.pdf"))),
+        ("template ZIP", template_zip),
+    ]
+    print(f"{'path':<22} {'seconds':>8} {'slips/sec':>10} {'ms/slip':>8}")
+    for name, run in cases:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<22} {elapsed:>8.2f} {args.slips / elapsed:>10.0f} {elapsed / args.slips * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
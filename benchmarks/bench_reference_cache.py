@@ -0,0 +1,84 @@
+"""
+Reference-data cache: statements and latency per attendance mark, and
+dropdown loads, with the cache cold vs warm.
+
+    python -m benchmarks.bench_reference_cache --employees 5000
+
+"cold" drops each employee's entry before marking (one-row JOIN lookup +
+INSERT); "warm" runs after preload_employees (INSERT only). Statement counts
+come from the connection trace, excluding transaction control and the
+summary-trigger steps (traced with the text of the INSERT that fired them).
+"""
+import argparse
+import time
+
+from benchmarks._env import use_scratch_database, seed_reference_data
+
+CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--dropdown-loads", type=int, default=2000)
+    args = parser.parse_args()
+
+    use_scratch_database()
+    from database.db_connection import Database, set_statement_trace
+    from models.employee_model import EmployeeModel
+    from models.reference_cache import reference_cache
+    from services.attendance_service import mark_attendance
+
+    statements = []
+
+    def trace(sql):
+        if not sql.lstrip().upper().startswith(CONTROL) and (not statements or statements[-1] != sql):
+            statements.append(sql)
+
+    set_statement_trace(trace)
+
+    db = Database()
+    conn = db.get_connection()
+    seed_reference_data(conn.cursor(), args.employees)
+    conn.commit()
+    conn.close()
+    codes = [f"E{i:05d}" for i in range(1, args.employees + 1)]
+
+    def run_marks(label, before_each=None):
+        db.execute_write(lambda cursor: cursor.execute("DELETE FROM attendance_logs"))
+        del statements[:]
+        start = time.perf_counter()
+        for code in codes:
+            if before_each:
+                before_each(code)
+            ok, msg = mark_attendance(code)
+            if not ok:
+                raise RuntimeError(f"{code}: {msg}")
+        seconds = time.perf_counter() - start
+        print(f"{label:<18} {len(statements) / len(codes):>6.2f} statements/mark "
+              f"{seconds / len(codes) * 1e6:>8.0f} us/mark")
+
+    reference_cache.preload_employees()
+    run_marks("marks, cold", before_each=reference_cache.invalidate_employee)
+    reference_cache.preload_employees()
+    run_marks("marks, warm")
+
+    model = EmployeeModel()
+    for label, before_each in (("dropdowns, cold", lambda: (reference_cache.invalidate_roles(),
+                                                              reference_cache.invalidate_departments())),
+                               ("dropdowns, warm", None)):
+        start = time.perf_counter()
+        for _ in range(args.dropdown_loads):
+            if before_each:
+                before_each()
+            model.get_departments()
+            model.get_roles()
+        seconds = time.perf_counter() - start
+        print(f"{label:<18} {seconds / args.dropdown_loads * 1e6:>22.0f} us/load")
+
+    set_statement_trace(None)
+    print(f"cache stats: {reference_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
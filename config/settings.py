@@ -7,6 +7,11 @@ load_dotenv()
 # Constants
 DB_NAME = os.getenv("DB_NAME", "hrms.db")
 DB_PATH = os.path.join("database", DB_NAME)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))  # Idle connections kept warm per process
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")  # WAL | DELETE (legacy rollback journal)
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))  # Seconds before cached roles / shift info are re-read
+REFERENCE_CACHE_SIZE = int(os.getenv("REFERENCE_CACHE_SIZE", "50000"))  # Employees kept in the shift-info LRU
+ATTENDANCE_ARCHIVE_DIR = os.getenv("ATTENDANCE_ARCHIVE_DIR", os.path.join("database", "archive"))  # attendance_<year>.db files
 
 # Admin Defaults
 ADMIN_DEFAULT_USER = os.getenv("ADMIN_DEFAULT_USER", "admin")
@@ -18,6 +23,15 @@ OFFICE_WIFI_SSID = os.getenv("OFFICE_WIFI_SSID", "")
 # App Settings
 LATE_THRESHOLD = os.getenv("LATE_THRESHOLD_TIME", "10:00:00")
 
+# Face Matching
+FACE_INDEX = os.getenv("FACE_INDEX", "exact")  # exact | ivf (approximate, for very large galleries)
+FACE_IVF_NPROBE = int(os.getenv("FACE_IVF_NPROBE", "8"))  # Partitions scanned per query (recall vs latency)
+FACE_GALLERY_DIR = os.path.join("database", "gallery")  # Memory-mapped encodings snapshot
+FACE_DETECT_TARGET_MS = int(os.getenv("FACE_DETECT_TARGET_MS", "150"))  # Detection scale adapts to stay near this
+FACE_MOTION_THRESHOLD = float(os.getenv("FACE_MOTION_THRESHOLD", "0.02"))  # Changed-pixel fraction that counts as motion
+RECOGNITION_MODE = os.getenv("RECOGNITION_MODE", "thread")  # thread | pipeline (one process per stage, multi-core kiosks)
+KIOSK_STATS_OVERLAY = os.getenv("KIOSK_STATS_OVERLAY", "False").lower() == "true"  # FPS / CPU text on the camera feed
+
 # Logging Configuration
 LOG_CONFIG = {
     'version': 1,
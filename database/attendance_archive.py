@@ -0,0 +1,227 @@
+"""
+Time-partitioned archival of attendance_logs.
+
+    python -m database.attendance_archive              # move closed months out
+    python -m database.attendance_archive --dry-run    # only report what would move
+    python -m database.attendance_archive --vacuum     # archive, then shrink the live DB
+
+A month is closed once every employee with attendance in it has
+last_dues_cleared_upto at or past its last day (the current month never is).
+Closed months move into one SQLite file per year under ATTENDANCE_ARCHIVE_DIR
+and the 'archived_before' watermark advances. Payroll keeps working unchanged
+because monthly_attendance_summary keeps the archived counts; code that needs
+raw rows reads them through attendance_history().
+
+Crash safety: rows are copied first (idempotent), then deleted from the live
+table in the same transaction that moves the watermark. Archived rows are only
+visible below the watermark, so a half-finished run is never double counted.
+"""
+import argparse
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from config.settings import ATTENDANCE_ARCHIVE_DIR
+from database.db_connection import Database, open_connection
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = "log_id, emp_code, date, in_time, status, method, wifi_verified, evidence_img"
+
+# sqlite's default SQLITE_MAX_ATTACHED; one archive file per year in the range
+MAX_ATTACHED_YEARS = 10
+
+# Same columns as attendance_logs, without the FK (employees is not in the file)
+_ARCHIVE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.attendance_logs (
+        log_id INTEGER PRIMARY KEY,
+        emp_code TEXT,
+        date DATE NOT NULL,
+        in_time TEXT NOT NULL,
+        status TEXT,
+        method TEXT,
+        wifi_verified INTEGER DEFAULT 0,
+        evidence_img TEXT,
+        UNIQUE(emp_code, date)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_attendance_date_emp ON attendance_logs (date, emp_code)",
+)
+
+
+def archive_path(year):
+    return os.path.join(ATTENDANCE_ARCHIVE_DIR, f"attendance_{year}.db")
+
+
+def archived_before(conn):
+    """Current watermark ('YYYY-MM-01', or '' when nothing is archived)."""
+    row = conn.execute("SELECT archived_before FROM attendance_archive_state WHERE id = 1").fetchone()
+    return row[0] if row else ""
+
+
+def closed_before(conn, today=None):
+    """
+    First day of the oldest month that is not closed yet: the month of the
+    oldest live row whose employee has not been paid up to it, capped at the
+    current month.
+    """
+    today = today or date.today()
+    cap = f"{today.year}-{today.month:02d}-01"
+    oldest_unpaid = conn.execute("""
+        SELECT MIN(a.date) FROM attendance_logs a
+        JOIN employees e ON e.emp_code = a.emp_code
+        WHERE a.date > COALESCE(e.last_dues_cleared_upto, '')
+    """).fetchone()[0]
+    if oldest_unpaid is None:
+        return cap
+    return min(cap, f"{oldest_unpaid[:7]}-01")
+
+
+def archive_years():
+    """Years that have an archive file, ascending."""
+    if not os.path.isdir(ATTENDANCE_ARCHIVE_DIR):
+        return []
+    years = []
+    for name in os.listdir(ATTENDANCE_ARCHIVE_DIR):
+        stem, ext = os.path.splitext(name)
+        if ext == ".db" and stem.startswith("attendance_") and stem[len("attendance_"):].isdigit():
+            years.append(int(stem[len("attendance_"):]))
+    return sorted(years)
+
+
+def _attach(conn, year, create=False):
+    schema = f"arch_{year}"
+    conn.execute("ATTACH DATABASE ? AS " + schema, (archive_path(year),))
+    if create:
+        for statement in _ARCHIVE_SCHEMA:
+            conn.execute(statement.format(schema=schema))
+    return schema
+
+
+def archive_closed_months(db, dry_run=False, today=None):
+    """
+    Moves every closed month out of attendance_logs.
+    Returns {'archived_before': watermark, 'moved': rows, 'years': {year: rows}}.
+    """
+    conn = open_connection(db.db_path)
+    try:
+        watermark = archived_before(conn)
+        cutoff = closed_before(conn, today)
+        max_log_id, oldest, newest = conn.execute(
+            "SELECT MAX(log_id), MIN(date), MAX(date) FROM attendance_logs WHERE date < ?", (cutoff,)
+        ).fetchone()
+        result = {"archived_before": max(watermark, cutoff), "moved": 0, "years": {}}
+        if max_log_id is None:
+            logger.info(f"Attendance archive: nothing to move before {cutoff}")
+            return result
+
+        for year in range(int(oldest[:4]), int(newest[:4]) + 1):
+            start, end = f"{year}-01-01", min(cutoff, f"{year + 1}-01-01")
+            if dry_run:
+                rows = conn.execute(
+                    "SELECT COUNT(*) FROM attendance_logs WHERE date >= ? AND date < ? AND log_id <= ?",
+                    (start, end, max_log_id),
+                ).fetchone()[0]
+            else:
+                # 1. Copy (re-runnable: rows already in the file are ignored)
+                os.makedirs(ATTENDANCE_ARCHIVE_DIR, exist_ok=True)
+                schema = _attach(conn, year, create=True)
+                try:
+                    cursor = conn.execute(f"""
+                        INSERT OR IGNORE INTO {schema}.attendance_logs ({ARCHIVE_COLUMNS})
+                        SELECT {ARCHIVE_COLUMNS} FROM main.attendance_logs
+                        WHERE date >= ? AND date < ? AND log_id <= ?
+                    """, (start, end, max_log_id))
+                    rows = cursor.rowcount
+                    conn.commit()
+                finally:
+                    conn.rollback()  # no-op after commit; DETACH needs no open transaction
+                    conn.execute(f"DETACH DATABASE {schema}")
+            if rows:
+                result["years"][year] = rows
+    finally:
+        conn.close()
+
+    if dry_run:
+        result["moved"] = sum(result["years"].values())
+        return result
+
+    # 2. Drop the copied rows and move the watermark together. The summary
+    #    delete trigger ignores rows below the watermark, so counts are kept.
+    def _release(cursor):
+        cursor.execute("""
+            UPDATE attendance_archive_state SET archived_before = ?
+            WHERE id = 1 AND archived_before < ?
+        """, (cutoff, cutoff))
+        cursor.execute("DELETE FROM attendance_logs WHERE date < ? AND log_id <= ?", (cutoff, max_log_id))
+        return cursor.rowcount
+
+    result["moved"] = db.execute_write(_release)
+    logger.info(f"Attendance archive: {result['moved']} rows moved, live table now starts at {cutoff}")
+    return result
+
+
+@contextmanager
+def attendance_history(db, start=None, end=None):
+    """
+    Yields a private connection with a TEMP VIEW 'attendance_history': live
+    attendance_logs plus archived rows, same columns. start / end ('YYYY-MM-DD',
+    half-open) pick which yearly files get attached; filter on date in the
+    query as usual. Only the archive years overlapping the range are opened.
+    """
+    conn = open_connection(db.db_path)
+    try:
+        watermark = archived_before(conn)
+        years = []
+        if watermark and (start is None or start < watermark):
+            first = int(start[:4]) if start else 0
+            last = int(min(end or watermark, watermark)[:4])
+            years = [y for y in archive_years() if first <= y <= last]
+        if len(years) > MAX_ATTACHED_YEARS:
+            raise ValueError(f"Range spans {len(years)} archive years; query at most {MAX_ATTACHED_YEARS} at a time")
+
+        parts = [f"SELECT {ARCHIVE_COLUMNS} FROM main.attendance_logs"]
+        for year in years:
+            schema = _attach(conn, year)
+            # A back-dated row can sit in both places until the next run deletes it
+            parts.append(f"""
+                SELECT {ARCHIVE_COLUMNS} FROM {schema}.attendance_logs a
+                WHERE a.date < '{watermark}'
+                  AND NOT EXISTS (SELECT 1 FROM main.attendance_logs l
+                                  WHERE l.emp_code = a.emp_code AND l.date = a.date)
+            """)
+        conn.execute("CREATE TEMP VIEW attendance_history AS " + " UNION ALL ".join(parts))
+        yield conn
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move closed months of attendance into yearly archive files.")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be archived")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the live DB afterwards")
+    args = parser.parse_args()
+
+    db = Database()
+    start = time.perf_counter()
+    result = archive_closed_months(db, dry_run=args.dry_run)
+    for year, rows in sorted(result["years"].items()):
+        logger.info(f"  {year}: {rows} rows -> {archive_path(year)}")
+
+    if args.vacuum and not args.dry_run:
+        conn = open_connection(db.db_path)
+        conn.execute("VACUUM")
+        conn.close()
+
+    verb = "would move" if args.dry_run else "moved"
+    logger.info(
+        f"Attendance archive {verb} {result['moved']} rows in {time.perf_counter() - start:.2f}s; "
+        f"archived before {result['archived_before'] or '-'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
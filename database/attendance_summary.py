@@ -0,0 +1,136 @@
+"""
+Rebuild / verify monthly_attendance_summary against the raw logs.
+
+    python -m database.attendance_summary            # rebuild from scratch
+    python -m database.attendance_summary --verify   # report drift, exit 1 if any
+
+The table is normally kept current by triggers (migration 004); this is the
+repair tool for bulk edits made with triggers disabled or restored backups.
+Archived attendance is included (read through attendance_history, one year
+at a time).
+"""
+import argparse
+import logging
+import sys
+import time
+
+from database.attendance_archive import archive_years, attendance_history
+from database.db_connection import Database
+
+logger = logging.getLogger(__name__)
+
+# What the summary should contain for one date window, recomputed from the
+# raw rows; params: start, end, start, end ('YYYY-MM-DD', half-open)
+_EXPECTED_SQL = """
+    SELECT emp_code, month, SUM(present) AS present, SUM(late) AS late, SUM(leaves) AS leaves
+    FROM (
+        SELECT emp_code, substr(date, 1, 7) AS month, 1 AS present, (status = 'Late') AS late, 0 AS leaves
+        FROM attendance_history WHERE emp_code IS NOT NULL AND date >= ? AND date < ?
+        UNION ALL
+        SELECT emp_code, substr(leave_date, 1, 7), 0, 0, 1
+        FROM employee_leaves
+        WHERE emp_code IS NOT NULL AND status = 'Approved' AND leave_date >= ? AND leave_date < ?
+    )
+    GROUP BY emp_code, month
+"""
+
+# Rows present on one side only, or with different counters (all-zero rows left
+# behind by deletes count as absent); params: _EXPECTED_SQL's, then month range
+_DRIFT_SQL = f"""
+    WITH expected AS ({_EXPECTED_SQL}),
+    stored AS (
+        SELECT emp_code, month, present, late, leaves FROM monthly_attendance_summary
+        WHERE (present != 0 OR late != 0 OR leaves != 0) AND month >= ? AND month < ?
+    ),
+    diff AS (
+        SELECT * FROM (SELECT * FROM expected EXCEPT SELECT * FROM stored)
+        UNION
+        SELECT * FROM (SELECT * FROM stored EXCEPT SELECT * FROM expected)
+    )
+    SELECT d.emp_code, d.month,
+           s.present, s.late, s.leaves,
+           e.present, e.late, e.leaves
+    FROM (SELECT DISTINCT emp_code, month FROM diff) d
+    LEFT JOIN stored s ON s.emp_code = d.emp_code AND s.month = d.month
+    LEFT JOIN expected e ON e.emp_code = d.emp_code AND e.month = d.month
+    ORDER BY d.emp_code, d.month
+"""
+
+_SPAN_SQL = """
+    SELECT MIN(lo), MAX(hi) FROM (
+        SELECT MIN(date) AS lo, MAX(date) AS hi FROM attendance_logs
+        UNION ALL SELECT MIN(leave_date), MAX(leave_date) FROM employee_leaves
+        UNION ALL SELECT MIN(month), MAX(month) FROM monthly_attendance_summary
+    )
+"""
+
+
+def _year_windows(db):
+    """[(year, start, end)] covering every live, archived and summarized date."""
+    conn = db.get_connection()
+    try:
+        lo, hi = conn.execute(_SPAN_SQL).fetchone()
+    finally:
+        conn.close()
+    years = [int(d[:4]) for d in (lo, hi) if d] + archive_years()
+    if not years:
+        return []
+    return [(y, f"{y}-01-01", f"{y + 1}-01-01") for y in range(min(years), max(years) + 1)]
+
+
+def rebuild_summary(db):
+    """Recomputes the whole table (one write transaction); returns the row count."""
+    rows = []
+    for _, start, end in _year_windows(db):
+        with attendance_history(db, start, end) as conn:
+            rows.extend(conn.execute(_EXPECTED_SQL, (start, end, start, end)).fetchall())
+
+    def _rebuild(cursor):
+        cursor.execute("DELETE FROM monthly_attendance_summary")
+        cursor.executemany("""
+            INSERT INTO monthly_attendance_summary (emp_code, month, present, late, leaves)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+
+    db.execute_write(_rebuild)
+    return len(rows)
+
+
+def verify_summary(db):
+    """
+    Returns drifted rows:
+    [(emp_code, month, (present, late, leaves) stored, (present, late, leaves) expected)]
+    A side is None when the row is missing there.
+    """
+    drift = []
+    for year, start, end in _year_windows(db):
+        with attendance_history(db, start, end) as conn:
+            rows = conn.execute(_DRIFT_SQL, (start, end, start, end, f"{year}-01", f"{year + 1}-01")).fetchall()
+        for code, month, *counts in rows:
+            stored, expected = tuple(counts[:3]), tuple(counts[3:])
+            drift.append((code, month,
+                          stored if stored[0] is not None else None,
+                          expected if expected[0] is not None else None))
+    return drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify the monthly attendance summary.")
+    parser.add_argument("--verify", action="store_true", help="only compare with the raw logs")
+    args = parser.parse_args()
+
+    db = Database()
+    start = time.perf_counter()
+    if args.verify:
+        drift = verify_summary(db)
+        for code, month, stored, expected in drift[:50]:
+            logger.error(f"Summary drift {code} {month}: stored={stored} expected={expected}")
+        logger.info(f"Summary verified in {time.perf_counter() - start:.2f}s: {len(drift)} drifted rows")
+        sys.exit(1 if drift else 0)
+
+    rows = rebuild_summary(db)
+    logger.info(f"Summary rebuilt in {time.perf_counter() - start:.2f}s: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+Streaming bulk import of legacy HR data (CSV or JSONL).
+
+    python -m database.bulk_import employees employees.csv
+    python -m database.bulk_import attendance attendance.jsonl --defer-indexes
+    python -m database.bulk_import leaves leaves.csv --rejects leaves.rejects.jsonl
+    python -m database.bulk_import attendance attendance.jsonl --restart   # ignore the checkpoint
+
+Columns / keys per kind:
+    employees   emp_code, full_name, joining_date, base_salary, department, role
+                [, resignation_date, last_dues_cleared_upto, is_active]
+    attendance  emp_code, date, in_time [, status='Present', method='IMPORT']
+    leaves      emp_code, leave_date, leave_type [, status='Approved']
+department / role are names as stored in departments / roles; employees must
+exist before their attendance or leaves are imported.
+
+The file is read lazily and loaded in batches with executemany, one
+transaction per batch. Progress is checkpointed in import_checkpoints in
+the same transaction, so an interrupted import resumes exactly where it
+stopped (re-run the same command). Invalid records are counted, logged and
+optionally written to --rejects; they never stop the import.
+
+--defer-indexes drops the table's secondary (non-unique) indexes for the
+duration of the load and rebuilds them once at the end. UNIQUE indexes stay,
+since they reject duplicate rows. The dropped DDL is kept in the checkpoint
+and restored even if the import fails.
+"""
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from datetime import date
+
+from database.db_connection import Database, get_write_queue
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+INSERT_SQL = {
+    "employees": """
+        INSERT OR IGNORE INTO employees (emp_code, full_name, joining_date, base_salary, dept_id, role_id,
+                                         resignation_date, last_dues_cleared_upto, is_active)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "attendance": """
+        INSERT OR IGNORE INTO attendance_logs (emp_code, date, in_time, status, method)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    "leaves": """
+        INSERT OR IGNORE INTO employee_leaves (emp_code, leave_date, leave_type, status)
+        VALUES (?, ?, ?, ?)
+    """,
+}
+TABLES = {"employees": "employees", "attendance": "attendance_logs", "leaves": "employee_leaves"}
+
+
+# --- Reading ---
+def read_records(path, skip=0):
+    """Yields one dict per record, lazily. skip: records to pass over (resume)."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.lower().endswith(JSONL_EXTENSIONS):
+            lines = (line for line in f if line.strip())
+            for line in itertools.islice(lines, skip, None):
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    record = {"_error": f"invalid JSON: {e}"}
+                yield record if isinstance(record, dict) else {"_error": "record is not an object"}
+        else:
+            yield from itertools.islice(csv.DictReader(f), skip, None)
+
+
+def batched(records, size):
+    iterator = iter(records)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+# --- Validation ---
+def _text(record, key, default=None, required=True):
+    value = record.get(key)
+    value = value.strip() if isinstance(value, str) else value
+    if value in (None, ""):
+        if required and default is None:
+            raise ValueError(f"{key} is required")
+        return default
+    return str(value)
+
+
+def _date(record, key, required=True):
+    value = _text(record, key, required=required)
+    return date.fromisoformat(value).isoformat() if value is not None else None
+
+
+def _time(value):
+    hours, minutes, seconds = (value.split(":") + ["0"])[:3]
+    h, m, s = int(hours), int(minutes), int(float(seconds))
+    if not (0 <= h < 24 and 0 <= m < 60 and 0 <= s < 60):
+        raise ValueError(f"invalid time '{value}'")
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+class ReferenceData:
+    """Lookups used for validation, loaded once per import."""
+
+    def __init__(self, db):
+        conn = db.get_connection()
+        try:
+            self.departments = dict(conn.execute("SELECT dept_name, dept_id FROM departments"))
+            self.roles = dict(conn.execute("SELECT designation, role_id FROM roles"))
+            self.emp_codes = {row[0] for row in conn.execute("SELECT emp_code FROM employees")}
+        finally:
+            conn.close()
+
+    def lookup(self, table, name, label):
+        if name is None:
+            return None
+        if name not in table:
+            raise ValueError(f"unknown {label} '{name}'")
+        return table[name]
+
+    def employee(self, record):
+        code = _text(record, "emp_code")
+        if code not in self.emp_codes:
+            raise ValueError(f"unknown employee '{code}'")
+        return code
+
+
+def _employee_row(record, ref):
+    code = _text(record, "emp_code")
+    salary = float(_text(record, "base_salary"))
+    if salary < 0:
+        raise ValueError("base_salary must not be negative")
+    active = _text(record, "is_active", default="1")
+    row = (
+        code,
+        _text(record, "full_name"),
+        _date(record, "joining_date"),
+        salary,
+        ref.lookup(ref.departments, _text(record, "department", required=False), "department"),
+        ref.lookup(ref.roles, _text(record, "role", required=False), "role"),
+        _date(record, "resignation_date", required=False),
+        _date(record, "last_dues_cleared_upto", required=False),
+        0 if active.lower() in ("0", "false", "no") else 1,
+    )
+    ref.emp_codes.add(code)  # Attendance later in the same process may refer to it
+    return row
+
+
+def _attendance_row(record, ref):
+    return (
+        ref.employee(record),
+        _date(record, "date"),
+        _time(_text(record, "in_time")),
+        _text(record, "status", default="Present"),
+        _text(record, "method", default="IMPORT"),
+    )
+
+
+def _leave_row(record, ref):
+    return (
+        ref.employee(record),
+        _date(record, "leave_date"),
+        _text(record, "leave_type"),
+        _text(record, "status", default="Approved"),
+    )
+
+
+ROW_BUILDERS = {"employees": _employee_row, "attendance": _attendance_row, "leaves": _leave_row}
+
+
+def validate_batch(kind, records, ref, first_number):
+    """Returns (rows, rejects) with rejects = [(record_number, error, record)]."""
+    build = ROW_BUILDERS[kind]
+    rows, rejects = [], []
+    for number, record in enumerate(records, start=first_number):
+        try:
+            if "_error" in record:
+                raise ValueError(record["_error"])
+            rows.append(build(record, ref))
+        except (ValueError, TypeError, AttributeError) as e:
+            rejects.append((number, str(e), record))
+    return rows, rejects
+
+
+# --- Checkpoints / deferred indexes ---
+def _fingerprint(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _read_checkpoint(db, source):
+    conn = db.get_connection()
+    try:
+        return conn.execute("""
+            SELECT fingerprint, records_done, inserted, rejected, deferred_indexes, completed_at
+            FROM import_checkpoints WHERE source = ?
+        """, (source,)).fetchone()
+    finally:
+        conn.close()
+
+
+def _secondary_indexes(cursor, table):
+    cursor.execute("""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%'
+    """, (table,))
+    return cursor.fetchall()
+
+
+def _restore_indexes(db, source):
+    def _restore(cursor):
+        cursor.execute("SELECT deferred_indexes FROM import_checkpoints WHERE source = ?", (source,))
+        row = cursor.fetchone()
+        statements = [s for s in (row[0] or "").split(";") if s.strip()] if row else []
+        for statement in statements:
+            cursor.execute(statement.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1))
+        cursor.execute("UPDATE import_checkpoints SET deferred_indexes = NULL WHERE source = ?", (source,))
+        return len(statements)
+
+    start = time.perf_counter()
+    restored = db.execute_write(_restore)
+    if restored:
+        logger.info(f"Rebuilt {restored} deferred indexes in {time.perf_counter() - start:.2f}s")
+
+
+def import_file(db, kind, path, batch_size=BATCH_SIZE, defer_indexes=False, restart=False,
+                rejects_path=None, limit=None):
+    """
+    Streams one file into the DB. limit: stop after this many records (trial
+    runs; the checkpoint lets a later call continue).
+    Returns summary dict: records, inserted, rejected, skipped (duplicates),
+    seconds, rows_per_sec, resumed_from, completed.
+    """
+    if kind not in INSERT_SQL:
+        raise ValueError(f"Unknown import kind: {kind}")
+    source = f"{kind}:{os.path.abspath(path)}"
+    fingerprint = _fingerprint(path)
+
+    checkpoint = _read_checkpoint(db, source)
+    done = 0
+    if checkpoint and not restart:
+        if checkpoint[0] != fingerprint:
+            raise ValueError(f"{path} changed since its checkpoint; re-run with --restart to load it from the top")
+        if checkpoint[5]:
+            logger.info(f"{path} already imported ({checkpoint[2]} rows); use --restart to load it again")
+            return {"records": 0, "inserted": 0, "rejected": 0, "skipped": 0, "seconds": 0.0,
+                    "rows_per_sec": 0.0, "resumed_from": checkpoint[1], "completed": True}
+        done = checkpoint[1]
+
+    table = TABLES[kind]
+
+    def _begin(cursor):
+        cursor.execute("""
+            INSERT INTO import_checkpoints (source, fingerprint) VALUES (?, ?)
+            ON CONFLICT(source) DO UPDATE SET fingerprint = excluded.fingerprint, updated_at = CURRENT_TIMESTAMP
+        """, (source, fingerprint))
+        if restart:
+            cursor.execute("""
+                UPDATE import_checkpoints SET records_done = 0, inserted = 0, rejected = 0, completed_at = NULL
+                WHERE source = ?
+            """, (source,))
+        if defer_indexes:
+            indexes = _secondary_indexes(cursor, table)
+            for name, _ in indexes:
+                cursor.execute(f"DROP INDEX {name}")
+            if indexes:
+                # Appended, so statements left by an interrupted run are kept too
+                cursor.execute("""
+                    UPDATE import_checkpoints
+                    SET deferred_indexes = COALESCE(deferred_indexes || ';', '') || ?
+                    WHERE source = ?
+                """, (";".join(sql for _, sql in indexes), source))
+            return [name for name, _ in indexes]
+        return []
+
+    dropped = db.execute_write(_begin)
+    if dropped:
+        logger.info(f"Deferred indexes on {table}: {', '.join(dropped)}")
+    if done:
+        logger.info(f"Resuming {path} after record {done}")
+
+    ref = ReferenceData(db)
+    insert_sql = INSERT_SQL[kind]
+    writer = get_write_queue(db.db_path)
+    totals = {"records": 0, "inserted": 0, "rejected": 0}
+    completed = False
+    in_flight = None  # Batch being written while the next one is parsed
+    rejects_file = open(rejects_path, "a", encoding="utf-8") if rejects_path else None
+    start = time.perf_counter()
+
+    def _settle(batch):
+        count, rejects, future = batch
+        totals["inserted"] += future.result()
+        totals["records"] += count
+        totals["rejected"] += len(rejects)
+        for number, error, record in rejects:
+            logger.warning(f"Import {kind} record {number} rejected: {error}")
+            if rejects_file:
+                rejects_file.write(json.dumps({"record": number, "error": error, "data": record}) + "\n")
+        elapsed = time.perf_counter() - start
+        logger.info(f"Import {kind}: {done + totals['records']} records ({totals['records'] / elapsed:.0f} rows/sec)")
+
+    try:
+        records = read_records(path, skip=done)
+        if limit is not None:
+            records = itertools.islice(records, limit)
+        validated = 0
+        for batch in batched(records, batch_size):
+            rows, rejects = validate_batch(kind, batch, ref, done + validated + 1)
+            validated += len(batch)
+
+            def _load(cursor, rows=rows, first=done + validated - len(batch), last=done + validated,
+                      rejected=len(rejects)):
+                # Only continue from where the previous batch committed: if it failed,
+                # this one must not advance the checkpoint past its records
+                cursor.execute("SELECT records_done FROM import_checkpoints WHERE source = ?", (source,))
+                at = cursor.fetchone()[0]
+                if at != first:
+                    raise RuntimeError(f"checkpoint is at record {at}, expected {first}; an earlier batch failed")
+                cursor.executemany(insert_sql, rows)
+                inserted = cursor.rowcount if rows else 0
+                cursor.execute("""
+                    UPDATE import_checkpoints
+                    SET records_done = ?, inserted = inserted + ?, rejected = rejected + ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE source = ?
+                """, (last, inserted, rejected, source))
+                return inserted
+
+            # The single writer applies batches in order; at most one is pending
+            future = writer.submit(_load)
+            previous, in_flight = in_flight, (len(batch), rejects, future)
+            if previous:
+                _settle(previous)
+        if in_flight:
+            batch, in_flight = in_flight, None
+            _settle(batch)
+        completed = limit is None or totals["records"] < limit
+    finally:
+        if in_flight:
+            in_flight[2].exception()  # Let the pending batch finish before indexes come back
+        if rejects_file:
+            rejects_file.close()
+        if defer_indexes:
+            _restore_indexes(db, source)
+
+    if completed:
+        db.execute_write(lambda cursor: cursor.execute(
+            "UPDATE import_checkpoints SET completed_at = CURRENT_TIMESTAMP WHERE source = ?", (source,)
+        ))
+
+    seconds = time.perf_counter() - start
+    summary = dict(
+        totals,
+        skipped=totals["records"] - totals["rejected"] - totals["inserted"],
+        seconds=round(seconds, 2),
+        rows_per_sec=round(totals["records"] / seconds, 1) if seconds else 0.0,
+        resumed_from=done,
+        completed=completed,
+    )
+    logger.info(f"Import {kind} {path}: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream employees, attendance or leaves from CSV / JSONL into the DB.")
+    parser.add_argument("kind", choices=sorted(INSERT_SQL))
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="records per transaction")
+    parser.add_argument("--defer-indexes", action="store_true", help="rebuild secondary indexes once at the end")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and load from the top")
+    parser.add_argument("--rejects", default=None, help="append rejected records to this JSONL file")
+    parser.add_argument("--limit", type=int, default=None, help="stop after N records (resume later)")
+    args = parser.parse_args()
+
+    summary = import_file(Database(), args.kind, args.path, batch_size=args.batch_size,
+                          defer_indexes=args.defer_indexes, restart=args.restart,
+                          rejects_path=args.rejects, limit=args.limit)
+    print(f"{summary['records']} records: {summary['inserted']} inserted, {summary['skipped']} duplicates, "
+          f"{summary['rejected']} rejected in {summary['seconds']}s ({summary['rows_per_sec']} rows/sec)"
+          + ("" if summary["completed"] else " - incomplete, re-run to resume"))
+    return 1 if summary["rejected"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
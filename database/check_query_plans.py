@@ -0,0 +1,154 @@
+"""
+Query-plan regression check.
+
+    python -m database.check_query_plans
+
+Runs every model method against a scratch database, captures each SQL
+statement they issue, and runs EXPLAIN QUERY PLAN on it. Exits with
+status 1 if any statement falls back to a full table scan that is not
+explicitly allowed below. Run it after touching a query or schema.
+"""
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+# Full scans that are expected, with the reason. Keyed by table name (as it
+# appears in the plan) or by a fragment of the statement.
+ALLOWED_TABLE_SCANS = {
+    "admins": "bootstrap COUNT(*) on a handful of rows, once per process",
+    "departments": "small reference table, read whole for dropdowns",
+    "roles": "small reference table, read whole for dropdowns",
+}
+ALLOWED_STATEMENT_SCANS = {
+    "SELECT MAX(id), COUNT(*), (SELECT version FROM face_encodings_state": "gallery watermark needs the row count",
+    "DELETE FROM salary_slips WHERE slip_id NOT IN": "v3 migration dedupe, runs once",
+    "DELETE FROM employee_leaves WHERE leave_id NOT IN": "v7 migration dedupe, runs once",
+    "e.resignation_date IS NULL OR e.resignation_date >=": "export roster, every employee in emp_code order",
+}
+
+CHECKED_PREFIXES = ("SELECT", "UPDATE", "DELETE", "WITH")
+SCAN_RE = re.compile(r"^SCAN (\w+)")
+SUBQUERY_RE = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)")
+
+
+def _use_scratch_database():
+    """Point config at a throwaway DB; must run before any project import."""
+    workdir = tempfile.mkdtemp(prefix="hrms_plans_")
+    os.chdir(workdir)
+    os.environ["DB_NAME"] = "plans.db"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    os.environ["LOG_FILE"] = os.path.join(workdir, "plans.log")
+
+
+def run_workload():
+    """Calls every model query once; returns the distinct statements issued."""
+    from database.db_connection import Database, set_statement_trace
+
+    statements = []
+    set_statement_trace(statements.append)
+
+    import numpy as np
+    from models.admin_model import AdminModel
+    from models.attendance_model import AttendanceModel
+    from models.dashboard_model import DashboardModel
+    from models.employee_model import EmployeeModel
+    from models.payroll_model import PayrollModel
+
+    db = Database()
+    conn = db.get_connection()
+    conn.execute("INSERT INTO departments (dept_id, dept_name) VALUES (1, 'Engineering')")
+    conn.execute("INSERT INTO roles (role_id, designation) VALUES (1, 'SDE-1')")
+    conn.commit()
+    conn.close()
+
+    employees = EmployeeModel()
+    attendance = AttendanceModel()
+    payroll = PayrollModel()
+    rng = np.random.default_rng(0)
+
+    AdminModel().login("admin", "wrong-password")
+    employees.get_departments()
+    employees.get_roles()
+    employees.add_employee(
+        {"code": "E001", "name": "Plan Check", "joining_date": "2025-01-01",
+         "salary": 30000, "dept_id": 1, "role_id": 1},
+        list(rng.normal(size=(2, 128))),
+    )
+    employees.add_employees_bulk([
+        ({"code": "E002", "name": "Plan Check Bulk", "joining_date": "2025-01-01",
+          "salary": 30000, "dept_id": 1, "role_id": 1}, list(rng.normal(size=(2, 128)))),
+    ])
+    employees.existing_codes(["E001", "E002", "E003"])
+    employees.get_face_encodings("E001")
+    employees.set_active("E001", False)
+    employees.set_active("E001", True)
+
+    attendance.get_all_encodings()
+    attendance.get_encoding_watermark()
+    attendance.get_encodings_since(0)
+    attendance.get_active_employee_codes()
+    attendance.get_employee_shift_info("E001")  # Preloads every active employee
+    attendance.get_employee_shift_info("E404")  # Not preloaded: one-row lookup
+    attendance.insert_attendance("E001", "2025-01-02", "09:00:00", "Present", "FACE")
+    attendance.get_todays_attendance()
+    list(attendance.iter_month_attendance("2025-01-01", "2025-02-01"))
+    DashboardModel().get_dashboard_stats()
+
+    payroll.add_leave_record("E001", "2025-01-03", "Casual")
+    payroll.get_salary_components("E001", "2025-01-01", "2025-02-01")
+    payroll.get_bulk_salary_components("2025-01-01", "2025-02-01")
+    payroll.record_payment("E001", "1-2025", 1000.0, "2025-01-31")
+    payroll.record_payments_bulk("1-2025", [("E001", 20, 1000.0)], "2025-01-31")
+    payroll.record_slip_paths("1-2025", [("E001", 20, 1000.0, "payslips/E001.pdf")])
+
+    set_statement_trace(None)
+    seen, distinct = set(), []
+    for sql in statements:
+        text = " ".join(sql.split())
+        if text.upper().startswith(CHECKED_PREFIXES) and text not in seen:
+            seen.add(text)
+            distinct.append(text)
+    return db, distinct
+
+
+def full_scans(conn, sql):
+    """Tables read with a full scan in sql's plan (subquery results excluded)."""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    subqueries = {m.group(1) for *_, detail in plan if (m := SUBQUERY_RE.match(detail))}
+    scans = []
+    for *_, detail in plan:
+        match = SCAN_RE.match(detail)
+        if match and match.group(1) not in subqueries and detail != "SCAN CONSTANT ROW":
+            scans.append(detail)
+    return scans
+
+
+def main():
+    _use_scratch_database()
+    db, statements = run_workload()
+
+    conn = sqlite3.connect(db.db_path)
+    # Same as attendance_history() with no archive files
+    conn.execute("CREATE TEMP VIEW attendance_history AS SELECT * FROM attendance_logs")
+    failures = 0
+    for sql in statements:
+        scans = [
+            s for s in full_scans(conn, sql)
+            if s.split()[1] not in ALLOWED_TABLE_SCANS
+            and not any(fragment in sql for fragment in ALLOWED_STATEMENT_SCANS)
+        ]
+        status = "FAIL" if scans else "ok"
+        failures += bool(scans)
+        print(f"[{status:>4}] {sql[:110]}")
+        for detail in scans:
+            print(f"         -> {detail}")
+    conn.close()
+
+    print(f"\n{len(statements)} statements checked, {failures} with full table scans.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
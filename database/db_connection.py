@@ -1,7 +1,9 @@
 import sqlite3
 import os
 import logging
-from config.settings import DB_PATH, ADMIN_DEFAULT_USER, ADMIN_DEFAULT_PASS
+import threading
+from config.settings import DB_PATH, DB_POOL_SIZE, DB_JOURNAL_MODE, ADMIN_DEFAULT_USER, ADMIN_DEFAULT_PASS
+from database.write_queue import WriteQueue
 from utils.security import hash_password
 from utils.logger import setup_logging
 
@@ -9,36 +11,206 @@ from utils.logger import setup_logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# schema.sql is version 1; every later change is a numbered script in
+# migrations/ (NNN_description.sql) applied once, in order, via PRAGMA user_version.
+BASE_SCHEMA_VERSION = 1
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+
+def _migration_scripts():
+    """[(version, path), ...] ascending, parsed from migrations/NNN_*.sql."""
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return []
+    scripts = []
+    for name in os.listdir(MIGRATIONS_DIR):
+        prefix = name.split("_", 1)[0]
+        if name.endswith(".sql") and prefix.isdigit():
+            scripts.append((int(prefix), os.path.join(MIGRATIONS_DIR, name)))
+    return sorted(scripts)
+
+
+SCHEMA_VERSION = max([BASE_SCHEMA_VERSION] + [v for v, _ in _migration_scripts()])
+
+# Per-connection prepared statement cache (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Applied to every connection. WAL lets readers (dashboard, payroll) run
+# while the writer thread commits; NORMAL sync is durable in WAL mode.
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",     # ~20 MB page cache
+    "PRAGMA mmap_size = 268435456",   # 256 MB memory-mapped reads
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+# Optional fn(sql) called for every statement on new connections (diagnostics only)
+_statement_trace = None
+
+
+def set_statement_trace(fn):
+    """Installs a statement trace for connections opened from now on (None to disable)."""
+    global _statement_trace
+    _statement_trace = fn
+
+
+def open_connection(db_path, factory=sqlite3.Connection):
+    """Opens a tuned connection (journal mode + CONNECTION_PRAGMAS)."""
+    conn = sqlite3.connect(
+        db_path,
+        factory=factory,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if _statement_trace is not None:
+        conn.set_trace_callback(_statement_trace)
+    return conn
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that goes back to its pool on close().
+    Models keep calling conn.close() as before; the pool decides
+    whether the handle is kept warm or really closed.
+    """
+    pool = None
+
+    def close(self):
+        if self.pool is None:
+            return super().close()
+        if self.in_transaction:
+            self.rollback()  # Never hand out a half-finished transaction
+        self.pool.release(self)
+
+    def force_close(self):
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Process-wide, thread-safe pool of sqlite3 connections for one DB file.
+    A connection is checked out by exactly one caller at a time, so it can
+    safely move between threads (check_same_thread=False).
+    """
+
+    def __init__(self, db_path, max_idle=DB_POOL_SIZE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = open_connection(self.db_path, factory=PooledConnection)
+        conn.pool = self
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.force_close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.force_close()
+
+
+_pools = {}
+_writers = {}
+_initialized = set()
+_registry_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH):
+    """Returns the shared pool for db_path (created on first use)."""
+    with _registry_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[db_path] = pool
+        return pool
+
+
+def get_write_queue(db_path=DB_PATH):
+    """Returns the single writer for db_path (thread started on first use)."""
+    with _registry_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            writer = WriteQueue(lambda: open_connection(db_path))
+            _writers[db_path] = writer
+        return writer
+
+
 class Database:
     def __init__(self):
         self.db_path = DB_PATH
+        self.pool = get_pool(self.db_path)
         self.initialize_db()
 
     def get_connection(self):
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA foreign_keys = ON")
-            return conn
+            return self.pool.acquire()
         except sqlite3.Error as e:
             logger.critical(f"Database Connection Failed: {e}")
             raise e
 
+    def execute_write(self, fn):
+        """
+        Runs fn(cursor) on the shared writer thread and blocks for the result.
+        Concurrent callers are group-committed; fn must not commit itself.
+        Exceptions raised inside fn (e.g. IntegrityError) propagate to the caller.
+        """
+        return get_write_queue(self.db_path).execute(fn)
+
     def initialize_db(self):
+        """Runs schema bootstrap once per process (cheap no-op afterwards)."""
+        if self.db_path in _initialized:
+            return
+        with _registry_lock:
+            if self.db_path in _initialized:
+                return
+            self._bootstrap()
+            _initialized.add(self.db_path)
+
+    def _bootstrap(self):
         """Creates tables and ensures default admin exists."""
-        if not os.path.exists("database"):
-            os.makedirs("database")
-            logger.info("Created 'database' directory.")
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+            logger.info(f"Created '{db_dir}' directory.")
             
         conn = self.get_connection()
         cursor = conn.cursor()
         
         schema_path = os.path.join(os.path.dirname(__file__), "schema.sql")
         try:
-            with open(schema_path, "r") as f:
-                schema_script = f.read()
-            
-            cursor.executescript(schema_script)
-            logger.info("Schema Checked/Tables Verified.")
+            current_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            if current_version < SCHEMA_VERSION:
+                pending = [(BASE_SCHEMA_VERSION, schema_path)] + _migration_scripts()
+                for version, script_path in pending:
+                    if version <= current_version:
+                        continue
+                    with open(script_path, "r") as f:
+                        cursor.executescript(f.read())
+                    cursor.execute(f"PRAGMA user_version = {version}")
+                    logger.info(f"Applied schema v{version}: {os.path.basename(script_path)}")
+                logger.info(f"Schema upgraded: v{current_version} -> v{SCHEMA_VERSION}")
+            else:
+                logger.info(f"Schema up to date (v{current_version}).")
             
             # Bootstrapping: Admin is mandatory for system to work
             self._ensure_super_admin(cursor)
@@ -0,0 +1,101 @@
+"""
+One-shot migration: pickled face encodings -> tagged float32 BLOBs.
+
+    python -m database.migrate_encodings            # convert in place
+    python -m database.migrate_encodings --vacuum   # convert, then reclaim space
+
+Safe to re-run: rows already in the new format are left untouched.
+Pickle is only ever loaded here, from the application's own database.
+"""
+import argparse
+import logging
+import pickle
+import time
+
+from database.db_connection import Database
+from utils.face_codec import is_packed, is_legacy_pickle, pack_encoding
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def database_size(conn):
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def migrate_encodings(db, batch_size=BATCH_SIZE):
+    """Converts every legacy row; returns (converted, already_packed, failed)."""
+    stats = {"converted": 0, "packed": 0, "failed": 0}
+
+    def _convert(cursor):
+        # Paged by id and fully fetched before updating: a SELECT still stepping
+        # through face_encodings must not see rows rewritten under it
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT id, encoding FROM face_encodings WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updates = []
+            for row_id, blob in rows:
+                if is_packed(blob):
+                    stats["packed"] += 1
+                elif is_legacy_pickle(blob):
+                    try:
+                        updates.append((pack_encoding(pickle.loads(blob)), row_id))
+                    except Exception as e:
+                        logger.error(f"Encoding row {row_id} could not be converted: {e}")
+                        stats["failed"] += 1
+                else:
+                    logger.error(f"Encoding row {row_id} has an unknown format")
+                    stats["failed"] += 1
+            cursor.executemany("UPDATE face_encodings SET encoding = ? WHERE id = ?", updates)
+            stats["converted"] += len(updates)
+
+    db.execute_write(_convert)  # Single transaction: all rows or none
+    return stats["converted"], stats["packed"], stats["failed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert pickled face encodings to the binary format.")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to shrink the DB file")
+    args = parser.parse_args()
+
+    db = Database()
+    conn = db.get_connection()
+    size_before = database_size(conn)
+    conn.close()
+
+    start = time.perf_counter()
+    converted, packed, failed = migrate_encodings(db)
+    elapsed = time.perf_counter() - start
+
+    if converted:
+        # The version trigger already marks the snapshot stale; drop it so nothing reads it meanwhile
+        from services.face_gallery import FaceGallery
+        FaceGallery().invalidate()
+
+    if args.vacuum:
+        conn = db.get_connection()
+        conn.execute("VACUUM")
+        conn.close()
+
+    conn = db.get_connection()
+    size_after = database_size(conn)
+    conn.close()
+
+    logger.info(
+        f"Encodings migrated in {elapsed:.2f}s: converted={converted}, "
+        f"already_binary={packed}, failed={failed}; DB {size_before:,} -> {size_after:,} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
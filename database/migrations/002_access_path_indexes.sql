@@ -0,0 +1,28 @@
+-- v2: Indexes for the hot access paths (payroll, dashboard, kiosk startup).
+-- Column order = equality columns first, then the range column, then
+-- whatever the query reads, so most lookups are answered from the index alone.
+
+-- Attendance by day: get_todays_attendance, dashboard "present today",
+-- bulk payroll month range grouped by emp_code.
+-- (emp_code, date) lookups already use the UNIQUE(emp_code, date) index.
+CREATE INDEX IF NOT EXISTS idx_attendance_date_emp
+    ON attendance_logs (date, emp_code);
+
+-- Leaves: per-employee count (get_salary_components) ...
+CREATE INDEX IF NOT EXISTS idx_leaves_emp_status_date
+    ON employee_leaves (emp_code, status, leave_date);
+-- ... and whole-month grouped count (get_bulk_salary_components).
+CREATE INDEX IF NOT EXISTS idx_leaves_status_date_emp
+    ON employee_leaves (status, leave_date, emp_code);
+
+-- Payslip lookups per employee and month.
+CREATE INDEX IF NOT EXISTS idx_slips_emp_month
+    ON salary_slips (emp_code, month_year);
+
+-- Samples of one employee (get_all_encodings join, hot-reload).
+CREATE INDEX IF NOT EXISTS idx_face_encodings_emp
+    ON face_encodings (emp_code);
+
+-- Active headcount / active employee list.
+CREATE INDEX IF NOT EXISTS idx_employees_active
+    ON employees (is_active, emp_code);
@@ -0,0 +1,40 @@
+-- v3: One salary slip per employee and month, plus a ledger of closed
+-- payroll runs so "mark all as paid" can be re-run safely.
+
+-- Collapse duplicate slips left by double clicks. Keep the Paid row (newest
+-- first), carrying over a pdf_path recorded on one of its duplicates.
+UPDATE salary_slips
+SET pdf_path = (
+    SELECT MAX(d.pdf_path) FROM salary_slips d
+    WHERE d.emp_code = salary_slips.emp_code AND d.month_year = salary_slips.month_year
+)
+WHERE pdf_path IS NULL;
+
+DELETE FROM salary_slips
+WHERE slip_id NOT IN (
+    SELECT slip_id FROM (
+        SELECT slip_id, ROW_NUMBER() OVER (
+            PARTITION BY emp_code, month_year
+            ORDER BY payment_status = 'Paid' DESC, slip_id DESC
+        ) AS rn
+        FROM salary_slips
+    ) WHERE rn = 1
+);
+
+-- Replaces the plain v2 index; also the ON CONFLICT target for payments.
+DROP INDEX IF EXISTS idx_slips_emp_month;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_slips_emp_month
+    ON salary_slips (emp_code, month_year);
+
+-- Paid slips of one month (set-based ledger update after a bulk payment).
+CREATE INDEX IF NOT EXISTS idx_slips_month_status_emp
+    ON salary_slips (month_year, payment_status, emp_code);
+
+-- Idempotency keys of completed bulk payments (one per month by default).
+CREATE TABLE IF NOT EXISTS payroll_runs (
+    run_key TEXT PRIMARY KEY,
+    month_year TEXT NOT NULL,
+    employees INTEGER,
+    total_net REAL,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
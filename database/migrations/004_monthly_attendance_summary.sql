@@ -0,0 +1,96 @@
+-- v4: Per-employee monthly attendance/leave counters, kept current by
+-- triggers so payroll reads one row per employee instead of recounting
+-- the raw logs. month = 'YYYY-MM'. Rebuild / verify with
+--     python -m database.attendance_summary [--verify]
+
+CREATE TABLE IF NOT EXISTS monthly_attendance_summary (
+    emp_code TEXT NOT NULL,
+    month TEXT NOT NULL,
+    present INTEGER NOT NULL DEFAULT 0,   -- attendance_logs rows (any status)
+    late INTEGER NOT NULL DEFAULT 0,      -- ... of which status = 'Late'
+    leaves INTEGER NOT NULL DEFAULT 0,    -- approved employee_leaves rows
+    PRIMARY KEY (emp_code, month)
+) WITHOUT ROWID;
+
+-- Whole-month payroll run (get_bulk_salary_components).
+CREATE INDEX IF NOT EXISTS idx_attendance_summary_month_emp
+    ON monthly_attendance_summary (month, emp_code);
+
+-- Attendance counters
+CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_insert
+AFTER INSERT ON attendance_logs WHEN NEW.emp_code IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO monthly_attendance_summary (emp_code, month)
+    VALUES (NEW.emp_code, substr(NEW.date, 1, 7));
+    UPDATE monthly_attendance_summary
+    SET present = present + 1, late = late + (NEW.status = 'Late')
+    WHERE emp_code = NEW.emp_code AND month = substr(NEW.date, 1, 7);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_delete
+AFTER DELETE ON attendance_logs WHEN OLD.emp_code IS NOT NULL
+BEGIN
+    UPDATE monthly_attendance_summary
+    SET present = present - 1, late = late - (OLD.status = 'Late')
+    WHERE emp_code = OLD.emp_code AND month = substr(OLD.date, 1, 7);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_update
+AFTER UPDATE OF emp_code, date, status ON attendance_logs
+BEGIN
+    UPDATE monthly_attendance_summary
+    SET present = present - 1, late = late - (OLD.status = 'Late')
+    WHERE emp_code = OLD.emp_code AND month = substr(OLD.date, 1, 7);
+    INSERT OR IGNORE INTO monthly_attendance_summary (emp_code, month)
+    SELECT NEW.emp_code, substr(NEW.date, 1, 7) WHERE NEW.emp_code IS NOT NULL;
+    UPDATE monthly_attendance_summary
+    SET present = present + 1, late = late + (NEW.status = 'Late')
+    WHERE emp_code = NEW.emp_code AND month = substr(NEW.date, 1, 7);
+END;
+
+-- Approved leave counters
+CREATE TRIGGER IF NOT EXISTS trg_leave_summary_insert
+AFTER INSERT ON employee_leaves WHEN NEW.emp_code IS NOT NULL AND NEW.status = 'Approved'
+BEGIN
+    INSERT OR IGNORE INTO monthly_attendance_summary (emp_code, month)
+    VALUES (NEW.emp_code, substr(NEW.leave_date, 1, 7));
+    UPDATE monthly_attendance_summary
+    SET leaves = leaves + 1
+    WHERE emp_code = NEW.emp_code AND month = substr(NEW.leave_date, 1, 7);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_leave_summary_delete
+AFTER DELETE ON employee_leaves WHEN OLD.emp_code IS NOT NULL AND OLD.status = 'Approved'
+BEGIN
+    UPDATE monthly_attendance_summary
+    SET leaves = leaves - 1
+    WHERE emp_code = OLD.emp_code AND month = substr(OLD.leave_date, 1, 7);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_leave_summary_update
+AFTER UPDATE OF emp_code, leave_date, status ON employee_leaves
+BEGIN
+    UPDATE monthly_attendance_summary
+    SET leaves = leaves - 1
+    WHERE OLD.status = 'Approved'
+      AND emp_code = OLD.emp_code AND month = substr(OLD.leave_date, 1, 7);
+    INSERT OR IGNORE INTO monthly_attendance_summary (emp_code, month)
+    SELECT NEW.emp_code, substr(NEW.leave_date, 1, 7)
+    WHERE NEW.emp_code IS NOT NULL AND NEW.status = 'Approved';
+    UPDATE monthly_attendance_summary
+    SET leaves = leaves + 1
+    WHERE NEW.status = 'Approved'
+      AND emp_code = NEW.emp_code AND month = substr(NEW.leave_date, 1, 7);
+END;
+
+-- Backfill from existing history
+INSERT OR REPLACE INTO monthly_attendance_summary (emp_code, month, present, late, leaves)
+SELECT emp_code, month, SUM(present), SUM(late), SUM(leaves)
+FROM (
+    SELECT emp_code, substr(date, 1, 7) AS month, 1 AS present, (status = 'Late') AS late, 0 AS leaves
+    FROM attendance_logs WHERE emp_code IS NOT NULL
+    UNION ALL
+    SELECT emp_code, substr(leave_date, 1, 7), 0, 0, 1
+    FROM employee_leaves WHERE emp_code IS NOT NULL AND status = 'Approved'
+)
+GROUP BY emp_code, month;
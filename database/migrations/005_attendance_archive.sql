@@ -0,0 +1,20 @@
+-- v5: Attendance archival (python -m database.attendance_archive).
+-- Rows dated before archived_before live in per-year archive files; deleting
+-- them from attendance_logs must not touch the monthly summary counters.
+
+CREATE TABLE IF NOT EXISTS attendance_archive_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    archived_before TEXT NOT NULL DEFAULT ''   -- 'YYYY-MM-01', '' = nothing archived
+);
+INSERT OR IGNORE INTO attendance_archive_state (id) VALUES (1);
+
+DROP TRIGGER IF EXISTS trg_attendance_summary_delete;
+CREATE TRIGGER trg_attendance_summary_delete
+AFTER DELETE ON attendance_logs
+WHEN OLD.emp_code IS NOT NULL
+ AND OLD.date >= (SELECT archived_before FROM attendance_archive_state WHERE id = 1)
+BEGIN
+    UPDATE monthly_attendance_summary
+    SET present = present - 1, late = late - (OLD.status = 'Late')
+    WHERE emp_code = OLD.emp_code AND month = substr(OLD.date, 1, 7);
+END;
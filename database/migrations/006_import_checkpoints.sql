@@ -0,0 +1,14 @@
+-- v6: Progress of streaming imports (python -m database.bulk_import).
+-- Updated in the same transaction as each loaded batch, so a resumed import
+-- never loads a record twice or skips one.
+
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+    source TEXT PRIMARY KEY,            -- '<kind>:<absolute path>'
+    fingerprint TEXT NOT NULL,          -- size:mtime of the file the import started on
+    records_done INTEGER NOT NULL DEFAULT 0,
+    inserted INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    deferred_indexes TEXT,              -- CREATE INDEX statements to restore (';'-joined)
+    completed_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
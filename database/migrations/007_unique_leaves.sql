@@ -0,0 +1,12 @@
+-- v7: One leave row per employee and day.
+-- Re-running a leaves import (or adding the same leave twice) used to insert
+-- duplicates that the summary triggers counted twice. Extra copies are
+-- removed first; the delete trigger keeps monthly_attendance_summary in step.
+
+DELETE FROM employee_leaves
+WHERE leave_id NOT IN (
+    SELECT MIN(leave_id) FROM employee_leaves GROUP BY emp_code, leave_date
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_leaves_emp_date
+    ON employee_leaves (emp_code, leave_date);
@@ -0,0 +1,22 @@
+-- v8: Change counter for face_encodings, part of the gallery snapshot watermark.
+-- (MAX(id), COUNT(*)) only sees inserts; rows rewritten in place (e.g. by
+-- python -m database.migrate_encodings) or deleted bump the version, which
+-- forces the on-disk snapshot to rebuild.
+
+CREATE TABLE IF NOT EXISTS face_encodings_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO face_encodings_state (id) VALUES (1);
+
+CREATE TRIGGER IF NOT EXISTS trg_face_encodings_version_update
+AFTER UPDATE ON face_encodings
+BEGIN
+    UPDATE face_encodings_state SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_face_encodings_version_delete
+AFTER DELETE ON face_encodings
+BEGIN
+    UPDATE face_encodings_state SET version = version + 1 WHERE id = 1;
+END;
@@ -0,0 +1,121 @@
+"""
+Single-writer queue for SQLite.
+All writes are funnelled through one background thread that owns one
+connection, so writers never fight each other for the database lock.
+Jobs that arrive together are committed as one transaction (group commit);
+each job runs inside its own SAVEPOINT so one failing job does not undo
+its neighbours. If the writer cannot open its connection, queued jobs fail
+with that error and the next submit starts a fresh writer thread.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+# Max jobs folded into a single COMMIT
+WRITE_BATCH_SIZE = 256
+
+
+class WriteQueue:
+    def __init__(self, connect, batch_size=WRITE_BATCH_SIZE):
+        """
+        connect: zero-arg callable returning a new sqlite3 connection.
+        It is called from the writer thread.
+        """
+        self._connect = connect
+        self.batch_size = batch_size
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()  # Orders submits against a writer that failed to start
+        self._thread = None
+        with self._lock:
+            self._start()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn) -> Future:
+        """
+        Queue fn(cursor) for execution on the writer thread.
+        fn must not commit/rollback; the queue owns the transaction.
+        Returns a Future resolved with fn's return value (or exception) after COMMIT.
+        """
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._start()  # Previous writer could not connect; try again
+            self._jobs.put((fn, future))
+        return future
+
+    def execute(self, fn):
+        """Blocking submit: returns fn's result or re-raises its exception."""
+        return self.submit(fn).result()
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            logger.error(f"DB Writer Connect Error: {e}")
+            with self._lock:
+                self._thread = None
+                while True:
+                    try:
+                        _, future = self._jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(e)
+            return
+
+        conn.isolation_level = None  # Transactions are managed explicitly below
+        cursor = conn.cursor()
+
+        while True:
+            batch = [self._jobs.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            outcomes = []
+            # A lone job needs no savepoint: its failure rolls back the whole
+            # transaction. This also keeps big jobs (bulk imports) off the
+            # in-memory sub-journal, which slows down as the job grows.
+            use_savepoints = len(batch) > 1
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                for fn, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    if use_savepoints:
+                        cursor.execute("SAVEPOINT job")
+                    try:
+                        outcomes.append((future, fn(cursor), None))
+                        if use_savepoints:
+                            cursor.execute("RELEASE job")
+                    except Exception as e:
+                        if use_savepoints:
+                            cursor.execute("ROLLBACK TO job")
+                            cursor.execute("RELEASE job")
+                        else:
+                            cursor.execute("ROLLBACK")
+                        outcomes.append((future, None, e))
+                if conn.in_transaction:
+                    cursor.execute("COMMIT")
+            except Exception as e:
+                logger.error(f"Write Batch Failed ({len(batch)} jobs): {e}")
+                if conn.in_transaction:
+                    conn.rollback()
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for future, result, error in outcomes:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
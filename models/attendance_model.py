@@ -1,8 +1,11 @@
 import sqlite3
-import pickle
 import logging
+import numpy as np
 from datetime import datetime
+from database.attendance_archive import attendance_history
 from database.db_connection import Database
+from models.reference_cache import reference_cache
+from utils.face_codec import ENCODING_DIM, unpack_rows
 
 logger = logging.getLogger(__name__)
 
@@ -11,12 +14,12 @@ class AttendanceModel:
     def __init__(self):
         self.db = Database()
 
-    def get_all_encodings(self) -> tuple[list, list]:
+    def get_all_encodings(self) -> tuple[np.ndarray, list]:
         """
         Load all employees' face encodings on startup.
         Returns:
-            known_face_encodings (List): [encoding1, encoding2...]
-            known_face_ids (List): ['E001', 'E002'...]
+            known_face_encodings (ndarray): float32 matrix, one row per sample (N x 128)
+            known_face_ids (List): ['E001', 'E002'...] aligned with matrix rows
         """
         conn = self.db.get_connection()
         cursor = conn.cursor()
@@ -29,50 +32,65 @@ class AttendanceModel:
                 WHERE e.is_active = 1
             """
             cursor.execute(query)
-            rows = cursor.fetchall()
+            known_encodings, kept = unpack_rows(cursor.fetchall())
+            known_ids = [emp_code for _, emp_code in kept]
 
-            known_encodings = []
-            known_ids = []
-
-            for blob, emp_code in rows:
-                encoding = pickle.loads(blob)
-                known_encodings.append(encoding)
-                known_ids.append(emp_code)
-
-            logger.info(f"Loaded {len(known_encodings)} face samples from DB.")
+            logger.info(f"Loaded {len(known_ids)} face samples from DB.")
             return known_encodings, known_ids
 
         except Exception as e:
             logger.error(f"Encoding Load Error: {e}")
-            return [], []
+            return np.empty((0, ENCODING_DIM), dtype=np.float32), []
         finally:
             conn.close()
 
-    def get_employee_shift_info(self, emp_code: str) -> tuple[str | None, str | None]:
+    def get_encoding_watermark(self) -> tuple[int, int, int]:
         """
-        Returns (full_name, shift_start_str) from employees JOIN roles.
-        Returns (None, None) if employee not found.
+        (max id, row count, change version) of face_encodings, for snapshot freshness
+        checks. The version is bumped by triggers on every UPDATE / DELETE.
         """
         conn = self.db.get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute(
-                """
-                SELECT e.full_name, r.start_time
-                FROM employees e
-                JOIN roles r ON e.role_id = r.role_id
-                WHERE e.emp_code = ?
-                """,
-                (emp_code,),
-            )
-            result = cursor.fetchone()
-            if not result:
-                return (None, None)
-            full_name, shift_start_str = result
-            return (full_name, shift_start_str)
+            row = conn.execute("""
+                SELECT MAX(id), COUNT(*), (SELECT version FROM face_encodings_state WHERE id = 1)
+                FROM face_encodings
+            """).fetchone()
+            return (row[0] or 0, row[1], row[2] or 0)
+        finally:
+            conn.close()
+
+    def get_encodings_since(self, after_id: int = 0) -> tuple[np.ndarray, list, list]:
+        """
+        Face samples with id > after_id, active or not, ordered by (emp_code, id).
+        Returns (matrix N x 128, emp_codes, row_ids).
+        """
+        conn = self.db.get_connection()
+        try:
+            rows = conn.execute(
+                "SELECT encoding, emp_code, id FROM face_encodings WHERE id > ? ORDER BY id",
+                (after_id,),
+            ).fetchall()
+            rows.sort(key=lambda row: row[1])  # Stable: (emp_code, id) without an index scan
+            matrix, kept = unpack_rows(rows)
+            return matrix, [r[1] for r in kept], [r[2] for r in kept]
+        finally:
+            conn.close()
+
+    def get_active_employee_codes(self) -> set:
+        conn = self.db.get_connection()
+        try:
+            return {row[0] for row in conn.execute("SELECT emp_code FROM employees WHERE is_active = 1")}
         finally:
             conn.close()
 
+    def get_employee_shift_info(self, emp_code: str) -> tuple[str | None, str | None]:
+        """
+        Returns (full_name, shift_start_str) from employees JOIN roles, served
+        from the reference cache (active employees are preloaded).
+        Returns (None, None) if employee not found.
+        """
+        return reference_cache.employee(emp_code)
+
     def insert_attendance(
         self,
         emp_code: str,
@@ -80,15 +98,14 @@ class AttendanceModel:
         time_str: str,
         status: str,
         method: str,
+        full_name: str | None = None,
     ) -> tuple[bool, str]:
         """
         Pure INSERT into attendance_logs. No business logic.
-        Returns (success, message). On success message is full_name for welcome text.
+        Returns (success, message). On success message is full_name for welcome text;
+        pass full_name when the caller already has it to skip the lookup.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
-        try:
+        def _insert(cursor):
             cursor.execute(
                 """
                 INSERT INTO attendance_logs (emp_code, date, in_time, status, method)
@@ -96,11 +113,14 @@ class AttendanceModel:
                 """,
                 (emp_code, date_str, time_str, status, method),
             )
-            conn.commit()
-
+            if full_name is not None:
+                return full_name
             cursor.execute("SELECT full_name FROM employees WHERE emp_code=?", (emp_code,))
             row = cursor.fetchone()
-            full_name = row[0] if row else emp_code
+            return row[0] if row else emp_code
+
+        try:
+            full_name = self.db.execute_write(_insert)
 
             logger.info(f"Attendance inserted: {emp_code} ({method})")
             return (True, full_name)
@@ -111,8 +131,6 @@ class AttendanceModel:
         except Exception as e:
             logger.error(f"Attendance Insert Error: {e}")
             return (False, str(e))
-        finally:
-            conn.close()
 
     def get_todays_attendance(self) -> set:
         """Get today's attendance (set of emp_code)."""
@@ -125,3 +143,36 @@ class AttendanceModel:
 
         conn.close()
         return set(marked_ids)
+
+    def iter_month_attendance(self, month_start: str, next_month_start: str, chunk_size: int = 500):
+        """
+        Attendance matrix source, streamed one employee chunk at a time.
+        Yields (employees, marks): employees = [(emp_code, full_name, dept_name)]
+        on the roll during the month, by emp_code; marks = {emp_code: [(date, status)]}
+        with status 'Leave' for approved leaves. Archived months are included.
+        """
+        with attendance_history(self.db, month_start, next_month_start) as conn:
+            roster = conn.execute("""
+                SELECT e.emp_code, e.full_name, d.dept_name
+                FROM employees e
+                LEFT JOIN departments d ON d.dept_id = e.dept_id
+                WHERE e.joining_date < ? AND (e.resignation_date IS NULL OR e.resignation_date >= ?)
+                ORDER BY e.emp_code
+            """, (next_month_start, month_start))
+            while True:
+                employees = roster.fetchmany(chunk_size)
+                if not employees:
+                    break
+                codes = [row[0] for row in employees]
+                placeholders = ",".join("?" * len(codes))
+                marks = {}
+                for emp_code, day, status in conn.execute(f"""
+                    SELECT emp_code, date, status FROM attendance_history
+                    WHERE emp_code IN ({placeholders}) AND date >= ? AND date < ?
+                    UNION ALL
+                    SELECT emp_code, leave_date, 'Leave' FROM employee_leaves
+                    WHERE emp_code IN ({placeholders}) AND status = 'Approved'
+                      AND leave_date >= ? AND leave_date < ?
+                """, (*codes, month_start, next_month_start, *codes, month_start, next_month_start)):
+                    marks.setdefault(emp_code, []).append((day, status))
+                yield employees, marks
@@ -1,31 +1,50 @@
 import sqlite3
-import pickle
 import logging
+import threading
 from database.db_connection import Database
+from models.reference_cache import reference_cache
+from utils.face_codec import pack_encoding, unpack_rows
 
 logger = logging.getLogger(__name__)
 
 class EmployeeModel:
+    # Change listeners (process-wide): fn(event, emp_code, encodings)
+    # event: 'added' | 'deactivated' | 'reactivated'; encodings is None for 'deactivated'
+    _listeners = []
+    _listeners_lock = threading.Lock()
+
     def __init__(self):
         self.db = Database()
 
+    @classmethod
+    def add_listener(cls, fn):
+        with cls._listeners_lock:
+            cls._listeners.append(fn)
+
+    @classmethod
+    def remove_listener(cls, fn):
+        with cls._listeners_lock:
+            if fn in cls._listeners:
+                cls._listeners.remove(fn)
+
+    def _notify(self, event, emp_code, encodings=None):
+        """Called after the write is committed; a failing listener never fails the write."""
+        reference_cache.invalidate_employee(emp_code)
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for fn in listeners:
+            try:
+                fn(event, emp_code, encodings)
+            except Exception as e:
+                logger.error(f"Employee Change Listener Error ({event} {emp_code}): {e}")
+
     def get_departments(self):
-        """Fetch departments for dropdown"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT dept_id, dept_name FROM departments")
-        data = cursor.fetchall()
-        conn.close()
-        return data
+        """Fetch departments for dropdown (cached, see models.reference_cache)"""
+        return reference_cache.departments()
 
     def get_roles(self):
-        """Fetch roles for dropdown"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT role_id, designation FROM roles")
-        data = cursor.fetchall()
-        conn.close()
-        return data
+        """Fetch roles for dropdown (cached, see models.reference_cache)"""
+        return reference_cache.roles()
 
     def add_employee(self, emp_data, face_encodings):
         """
@@ -33,10 +52,7 @@ class EmployeeModel:
         emp_data: Dictionary {emp_code, name, salary, etc.}
         face_encodings: List of numpy arrays
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        try:
+        def _insert(cursor):
             # 1. Insert Employee Basic Details
             cursor.execute("""
                 INSERT INTO employees (emp_code, full_name, joining_date, base_salary, dept_id, role_id)
@@ -52,29 +68,127 @@ class EmployeeModel:
             
             # 2. Insert Face Encodings (Multiple samples)
             for encoding in face_encodings:
-                # Convert numpy array to binary (BLOB)
-                encoding_blob = pickle.dumps(encoding)
+                # Convert numpy array to tagged float32 binary (BLOB)
+                encoding_blob = pack_encoding(encoding)
                 
                 cursor.execute("""
                     INSERT INTO face_encodings (emp_code, encoding)
                     VALUES (?, ?)
                 """, (emp_data['code'], encoding_blob))
-            
-            conn.commit()
+        
+        try:
+            # Both steps commit together (or not at all) on the writer thread
+            self.db.execute_write(_insert)
             logger.info(f"Employee {emp_data['code']} added with {len(face_encodings)} face samples.")
+            self._notify('added', emp_data['code'], list(face_encodings))
             return True, "Employee Added Successfully"
             
         except sqlite3.IntegrityError as e:
-            conn.rollback()
             if "UNIQUE constraint failed: employees.emp_code" in str(e):
                 return False, "Employee Code already exists!"
             logger.error(f"DB Integrity Error: {e}")
             return False, f"Database Error: {e}"
             
         except Exception as e:
-            conn.rollback()
             logger.error(f"Add Employee Error: {e}")
             return False, str(e)
-            
+
+    def add_employees_bulk(self, records, chunk_size=200):
+        """
+        Bulk version of add_employee for offline enrollment.
+        records: iterable of (emp_data, face_encodings), same shapes as add_employee.
+        Each chunk is one transaction; a bad row is rolled back to its own
+        savepoint and reported, the rest of the chunk still commits.
+        Returns (added_codes, failures) with failures = [(emp_code, message)].
+        """
+        records = list(records)
+        added, failures = [], []
+
+        def _insert_chunk(chunk):
+            def _insert(cursor):
+                done, errors = [], []
+                for emp_data, face_encodings in chunk:
+                    cursor.execute("SAVEPOINT bulk_employee")
+                    try:
+                        cursor.execute("""
+                            INSERT INTO employees (emp_code, full_name, joining_date, base_salary, dept_id, role_id)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                        """, (emp_data['code'], emp_data['name'], emp_data['joining_date'],
+                              emp_data['salary'], emp_data['dept_id'], emp_data['role_id']))
+                        cursor.executemany(
+                            "INSERT INTO face_encodings (emp_code, encoding) VALUES (?, ?)",
+                            [(emp_data['code'], pack_encoding(e)) for e in face_encodings],
+                        )
+                        cursor.execute("RELEASE bulk_employee")
+                        done.append(emp_data)
+                    except sqlite3.IntegrityError as e:
+                        cursor.execute("ROLLBACK TO bulk_employee")
+                        cursor.execute("RELEASE bulk_employee")
+                        if "UNIQUE constraint failed: employees.emp_code" in str(e):
+                            errors.append((emp_data['code'], "Employee Code already exists!"))
+                        else:
+                            errors.append((emp_data['code'], f"Database Error: {e}"))
+                return done, errors
+            return _insert
+
+        for i in range(0, len(records), chunk_size):
+            chunk = records[i:i + chunk_size]
+            try:
+                done, errors = self.db.execute_write(_insert_chunk(chunk))
+            except Exception as e:
+                logger.error(f"Bulk Add Employee Error: {e}")
+                failures.extend((emp_data['code'], str(e)) for emp_data, _ in chunk)
+                continue
+            failures.extend(errors)
+            encodings_by_code = {emp_data['code']: enc for emp_data, enc in chunk}
+            for emp_data in done:
+                added.append(emp_data['code'])
+                self._notify('added', emp_data['code'], list(encodings_by_code[emp_data['code']]))
+
+        logger.info(f"Bulk add: {len(added)} employees added, {len(failures)} failed.")
+        return added, failures
+
+    def existing_codes(self, emp_codes, chunk_size=500):
+        """Subset of emp_codes already registered (active or not)."""
+        emp_codes = list(emp_codes)
+        found = set()
+        conn = self.db.get_connection()
+        try:
+            for i in range(0, len(emp_codes), chunk_size):
+                chunk = emp_codes[i:i + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"SELECT emp_code FROM employees WHERE emp_code IN ({placeholders})", chunk)
+                found.update(row[0] for row in rows)
+            return found
+        finally:
+            conn.close()
+
+    def set_active(self, emp_code, is_active):
+        """Activate/deactivate an employee (is_active flag). Face samples are kept."""
+        def _update(cursor):
+            cursor.execute("UPDATE employees SET is_active = ? WHERE emp_code = ?", (int(is_active), emp_code))
+            return cursor.rowcount
+
+        try:
+            if not self.db.execute_write(_update):
+                return False, "Employee Not Found"
+        except Exception as e:
+            logger.error(f"Set Active Error: {e}")
+            return False, str(e)
+
+        if is_active:
+            self._notify('reactivated', emp_code, list(self.get_face_encodings(emp_code)))
+        else:
+            self._notify('deactivated', emp_code)
+        logger.info(f"Employee {emp_code} {'activated' if is_active else 'deactivated'}.")
+        return True, "Employee Updated"
+
+    def get_face_encodings(self, emp_code):
+        """Decoded face samples of one employee (float32 matrix)."""
+        conn = self.db.get_connection()
+        try:
+            rows = conn.execute("SELECT encoding FROM face_encodings WHERE emp_code = ?", (emp_code,)).fetchall()
+            matrix, _ = unpack_rows(rows)
+            return matrix
         finally:
-            conn.close()
\ No newline at end of file
+            conn.close()
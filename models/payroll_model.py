@@ -1,16 +1,41 @@
 import sqlite3
+import hashlib
 import logging
 from database.db_connection import Database
 
 logger = logging.getLogger(__name__)
 
+# Salary inputs for all active employees; params: first and next month ('YYYY-MM')
+_BULK_COMPONENTS_SQL = """
+    SELECT e.emp_code, e.full_name, e.base_salary, r.base_pf_percent,
+           r.tax_deduction, r.daily_bonus, d.dept_name, r.designation,
+           COALESCE(s.present_days, 0), COALESCE(s.leave_days, 0)
+    FROM employees e
+    JOIN roles r ON e.role_id = r.role_id
+    JOIN departments d ON e.dept_id = d.dept_id
+    LEFT JOIN (
+        SELECT emp_code, SUM(present) AS present_days, SUM(leaves) AS leave_days
+        FROM monthly_attendance_summary
+        WHERE month >= ? AND month < ?
+        GROUP BY emp_code
+    ) s ON s.emp_code = e.emp_code
+    WHERE e.is_active = 1
+    ORDER BY e.emp_code
+"""
+
+
+def _summary_months(month_start, next_month_start):
+    """'YYYY-MM-DD' month bounds -> 'YYYY-MM' keys of monthly_attendance_summary."""
+    return month_start[:7], next_month_start[:7]
+
 class PayrollModel:
     def __init__(self):
         self.db = Database()
 
-    def get_salary_components(self, emp_code, month_str, year_month_wildcard):
+    def get_salary_components(self, emp_code, month_start, next_month_start):
         """
         Fetches all raw data required for salary calculation.
+        month_start / next_month_start: first days of the month and the next one ('YYYY-MM-DD').
         Returns: Tuple (emp_data, present_days, leave_days) or None
         """
         conn = self.db.get_connection()
@@ -29,19 +54,13 @@ class PayrollModel:
             
             if not emp_data: return None
 
-            # 2. Present Days
+            # 2. Present Days & Approved Leaves (maintained by triggers)
             cursor.execute("""
-                SELECT COUNT(*) FROM attendance_logs 
-                WHERE emp_code = ? AND date LIKE ?
-            """, (emp_code, year_month_wildcard))
-            present_days = cursor.fetchone()[0]
-
-            # 3. Approved Leaves
-            cursor.execute("""
-                SELECT COUNT(*) FROM employee_leaves 
-                WHERE emp_code = ? AND strftime('%Y-%m', leave_date) = ? AND status = 'Approved'
-            """, (emp_code, month_str))
-            leave_days = cursor.fetchone()[0]
+                SELECT COALESCE(SUM(present), 0), COALESCE(SUM(leaves), 0)
+                FROM monthly_attendance_summary
+                WHERE emp_code = ? AND month >= ? AND month < ?
+            """, (emp_code, *_summary_months(month_start, next_month_start)))
+            present_days, leave_days = cursor.fetchone()
 
             return emp_data, present_days, leave_days
 
@@ -51,46 +70,159 @@ class PayrollModel:
         finally:
             conn.close()
 
-    def record_payment(self, emp_code, month_year, net_salary, cleared_upto_date):
-        """Transactional update for Slip + Ledger"""
+    def get_bulk_salary_components(self, month_start, next_month_start):
+        """
+        Salary inputs for every active employee in ONE grouped query.
+        Returns: List of (emp_code, full_name, base_salary, pf_pct, tax, daily_bonus,
+                          dept_name, designation, present_days, leave_days)
+        """
         conn = self.db.get_connection()
         cursor = conn.cursor()
         try:
-            # 1. Insert Slip
-            cursor.execute("""
-                INSERT INTO salary_slips (emp_code, month_year, net_salary, payment_status, payment_date)
-                VALUES (?, ?, ?, 'Paid', DATE('now'))
-            """, (emp_code, month_year, net_salary))
+            cursor.execute(_BULK_COMPONENTS_SQL, _summary_months(month_start, next_month_start))
+            return cursor.fetchall()
+
+        except Exception as e:
+            logger.error(f"Bulk Payroll Fetch Error: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def iter_bulk_salary_components(self, month_start, next_month_start, chunk_size=500):
+        """Same rows as get_bulk_salary_components, yielded in lists of up to chunk_size."""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(_BULK_COMPONENTS_SQL, _summary_months(month_start, next_month_start))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    # One slip per (emp_code, month_year); an existing Paid slip is left untouched,
+    # so repeated clicks / re-runs never duplicate or overwrite a payment.
+    _PAY_SLIP_SQL = """
+        INSERT INTO salary_slips (emp_code, month_year, total_present, net_salary, payment_status, payment_date)
+        VALUES (?, ?, ?, ?, 'Paid', DATE('now'))
+        ON CONFLICT (emp_code, month_year) DO UPDATE SET
+            total_present = COALESCE(excluded.total_present, salary_slips.total_present),
+            net_salary = excluded.net_salary,
+            payment_status = 'Paid',
+            payment_date = excluded.payment_date
+        WHERE salary_slips.payment_status != 'Paid'
+    """
+
+    # Ledger only moves forward (re-paying an older month never rewinds it)
+    _ADVANCE_LEDGER_SQL = """
+        UPDATE employees
+        SET last_dues_cleared_upto = ?
+        WHERE emp_code IN (
+            SELECT emp_code FROM salary_slips
+            WHERE month_year = ? AND payment_status = 'Paid'
+        )
+        AND (last_dues_cleared_upto IS NULL OR last_dues_cleared_upto < ?)
+    """
+
+    def record_payment(self, emp_code, month_year, net_salary, cleared_upto_date):
+        """Transactional update for Slip + Ledger (idempotent per employee and month)"""
+        def _record(cursor):
+            # 1. Upsert Slip
+            cursor.execute(self._PAY_SLIP_SQL, (emp_code, month_year, None, net_salary))
             
             # 2. Update Ledger
             cursor.execute("""
                 UPDATE employees 
                 SET last_dues_cleared_upto = ? 
                 WHERE emp_code = ?
-            """, (cleared_upto_date, emp_code))
-            
-            conn.commit()
+                AND (last_dues_cleared_upto IS NULL OR last_dues_cleared_upto < ?)
+            """, (cleared_upto_date, emp_code, cleared_upto_date))
+
+        try:
+            self.db.execute_write(_record)
             return True, "Success"
         except Exception as e:
-            conn.rollback()
             logger.error(f"Payment Record Error: {e}")
             return False, str(e)
-        finally:
-            conn.close()
 
-    def add_leave_record(self, emp_code, leave_date, leave_type):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+    def record_payments_bulk(self, month_year, payments, cleared_upto_date, run_key=None):
+        """
+        Pays a whole month in one transaction.
+        payments: [(emp_code, total_present, net_salary)]
+        run_key: idempotency key; a key that was already completed makes this a
+        no-op. The default is derived from the slips being paid, so retrying the
+        same payment is a no-op while employees added (or slips regenerated)
+        later can still be paid. Paid slips are never rewritten either way.
+        """
+        if run_key is None:
+            digest = hashlib.sha1(repr(sorted((code, net) for code, _, net in payments)).encode()).hexdigest()
+            run_key = f"payroll:{month_year}:{digest[:16]}"
+
+        def _record(cursor):
+            cursor.execute("""
+                INSERT OR IGNORE INTO payroll_runs (run_key, month_year, employees, total_net)
+                VALUES (?, ?, ?, ?)
+            """, (run_key, month_year, len(payments), round(sum(p[2] for p in payments), 2)))
+            if cursor.rowcount == 0:
+                return None
+
+            cursor.executemany(self._PAY_SLIP_SQL,
+                               [(code, month_year, present, net) for code, present, net in payments])
+            newly_paid = cursor.rowcount
+            cursor.execute(self._ADVANCE_LEDGER_SQL, (cleared_upto_date, month_year, cleared_upto_date))
+            return newly_paid
+
         try:
+            newly_paid = self.db.execute_write(_record)
+        except Exception as e:
+            logger.error(f"Bulk Payment Error ({month_year}): {e}")
+            return False, str(e)
+
+        if newly_paid is None:
+            return True, f"Payroll {month_year} was already paid ({run_key})."
+        logger.info(f"Bulk payment {run_key}: {newly_paid} of {len(payments)} slips marked Paid")
+        return True, f"{newly_paid} employees marked as paid for {month_year}."
+
+    def record_slip_paths(self, month_year, slips):
+        """
+        Stores generated payslip paths for a month in one transaction.
+        slips: [(emp_code, total_present, net_salary, pdf_path)]
+        Existing slips get their pdf_path updated, and unpaid ones the re-run
+        figures too (paid amounts are never rewritten); others get a 'Pending'
+        slip row.
+        """
+        def _record(cursor):
+            cursor.executemany("""
+                INSERT INTO salary_slips (emp_code, month_year, total_present, net_salary, payment_status, pdf_path)
+                VALUES (?, ?, ?, ?, 'Pending', ?)
+                ON CONFLICT (emp_code, month_year) DO UPDATE SET
+                    pdf_path = excluded.pdf_path,
+                    total_present = CASE WHEN salary_slips.payment_status = 'Paid'
+                                         THEN salary_slips.total_present ELSE excluded.total_present END,
+                    net_salary = CASE WHEN salary_slips.payment_status = 'Paid'
+                                      THEN salary_slips.net_salary ELSE excluded.net_salary END
+            """, [(code, month_year, present, net, path) for code, present, net, path in slips])
+
+        try:
+            self.db.execute_write(_record)
+            return True, "Success"
+        except Exception as e:
+            logger.error(f"Slip Path Record Error: {e}")
+            return False, str(e)
+
+    def add_leave_record(self, emp_code, leave_date, leave_type):
+        def _insert(cursor):
             cursor.execute("""
                 INSERT INTO employee_leaves (emp_code, leave_date, leave_type, status)
                 VALUES (?, ?, ?, 'Approved')
             """, (emp_code, leave_date, leave_type))
-            conn.commit()
+
+        try:
+            self.db.execute_write(_insert)
             return True, "Leave Added"
         except sqlite3.IntegrityError:
             return False, "Leave already exists"
         except Exception as e:
-            return False, str(e)
-        finally:
-            conn.close()
\ No newline at end of file
+            return False, str(e)
\ No newline at end of file
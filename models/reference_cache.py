@@ -0,0 +1,176 @@
+"""
+In-process cache for reference data: departments, roles and the
+emp_code -> (full_name, shift start) lookup used on every attendance mark.
+
+Entries expire after REFERENCE_CACHE_TTL seconds, so writes made by another
+process (bulk import, a second kiosk) show up within that window. Writes
+made through the models in this process invalidate immediately:
+EmployeeModel calls invalidate_employee() from _notify, and anything that
+edits departments or roles should call invalidate_roles() /
+invalidate_departments().
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL
+from database.db_connection import Database
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU with per-entry expiry and hit/miss counters."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                if entry[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._put(key, value, time.monotonic() + self.ttl)
+
+    def put_many(self, items):
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl
+            for key, value in items:
+                self._put(key, value, expires_at)
+
+    def _put(self, key, value, expires_at):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class ReferenceCache:
+    """
+    Departments / roles lists plus the per-employee shift lookup.
+    The first employee lookup (and the first one after the TTL) preloads
+    every active employee in one query; codes outside that set (inactive,
+    evicted, added elsewhere) are fetched one row at a time and cached too.
+    """
+
+    def __init__(self, maxsize=REFERENCE_CACHE_SIZE, ttl=REFERENCE_CACHE_TTL):
+        self.lists = TTLCache(8, ttl)
+        self.employees = TTLCache(maxsize, ttl)
+        self._preloaded_at = None
+        self._preload_lock = threading.Lock()
+
+    def _query(self, sql, params=()):
+        conn = Database().get_connection()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _list(self, key, sql):
+        rows = self.lists.get(key)
+        if rows is None:
+            rows = self._query(sql)
+            self.lists.put(key, rows)
+        return list(rows)
+
+    def departments(self):
+        """[(dept_id, dept_name)]"""
+        return self._list("departments", "SELECT dept_id, dept_name FROM departments")
+
+    def roles(self):
+        """[(role_id, designation)]"""
+        return self._list("roles", "SELECT role_id, designation FROM roles")
+
+    def preload_employees(self):
+        """Caches (full_name, start_time) for every active employee. Returns the count."""
+        rows = self._query("""
+            SELECT e.emp_code, e.full_name, r.start_time
+            FROM employees e
+            JOIN roles r ON e.role_id = r.role_id
+            WHERE e.is_active = 1
+        """)
+        self.employees.put_many((code, (name, start)) for code, name, start in rows)
+        self._preloaded_at = time.monotonic()
+        logger.info(f"Reference cache: preloaded {len(rows)} active employees")
+        return len(rows)
+
+    def _preload_due(self):
+        return self._preloaded_at is None or time.monotonic() - self._preloaded_at >= self.employees.ttl
+
+    def employee(self, emp_code):
+        """(full_name, shift_start_str), or (None, None) if the employee does not exist."""
+        if self._preload_due():
+            with self._preload_lock:
+                if self._preload_due():
+                    self.preload_employees()
+
+        info = self.employees.get(emp_code)
+        if info is None:
+            row = self._query("""
+                SELECT e.full_name, r.start_time
+                FROM employees e
+                JOIN roles r ON e.role_id = r.role_id
+                WHERE e.emp_code = ?
+            """, (emp_code,))
+            info = tuple(row[0]) if row else (None, None)
+            self.employees.put(emp_code, info)
+        return info
+
+    def invalidate_employee(self, emp_code):
+        self.employees.invalidate(emp_code)
+
+    def invalidate_departments(self):
+        self.lists.invalidate("departments")
+
+    def invalidate_roles(self):
+        """Shift start times hang off roles, so every employee entry goes too."""
+        self.lists.invalidate("roles")
+        self.invalidate_employees()
+
+    def invalidate_employees(self):
+        self.employees.clear()
+        self._preloaded_at = None
+
+    def stats(self):
+        return {"lists": self.lists.stats(), "employees": self.employees.stats()}
+
+
+reference_cache = ReferenceCache()
@@ -53,7 +53,7 @@ def mark_attendance(emp_code: str, method: str = "FACE") -> tuple[bool, str]:
         return (False, "Employee Not Found")
 
     status, date_str, time_str = compute_attendance_status(shift_start_str)
-    success, msg = model.insert_attendance(emp_code, date_str, time_str, status, method)
+    success, msg = model.insert_attendance(emp_code, date_str, time_str, status, method, full_name=full_name)
 
     if success:
         return (True, f"Welcome, {msg}")  # msg is full_name from model
@@ -0,0 +1,236 @@
+"""
+Offline enrollment of many employees from a CSV and a folder of photos.
+
+    python -m services.bulk_enrollment employees.csv photos/
+    python -m services.bulk_enrollment employees.csv photos/ --workers 8 --require-poses FRONT
+    python -m services.bulk_enrollment employees.csv photos/ --failures failed_rows.csv
+
+CSV columns: emp_code, full_name, joining_date (YYYY-MM-DD), base_salary,
+department, role (department name / role designation as in the DB).
+Photos: <photos>/<emp_code>/*.jpg|jpeg|png.
+
+Faces are encoded in a process pool. Every image must show exactly one
+face, and the usable images must cover the required head poses (by
+default the same FRONT / LEFT / RIGHT set as the live camera flow).
+Employees already in the DB are skipped before encoding, so a failed run
+can simply be repeated. Rows are inserted in chunked transactions.
+"""
+import argparse
+import csv
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+MAX_IMAGE_SIDE = 1280      # Larger photos are downscaled before detection
+MAX_SAMPLES = 5            # Same number of samples as the live capture flow
+DEFAULT_POSES = ("FRONT", "LEFT", "RIGHT")
+INSERT_CHUNK_SIZE = 200
+REQUIRED_COLUMNS = ("emp_code", "full_name", "joining_date", "base_salary", "department", "role")
+
+
+def _encode_person(emp_code, paths):
+    """
+    Pool worker: one detection per image, reused for landmarks and encoding.
+    Returns (emp_code, [(pose, encoding)], [issue], images_read).
+    """
+    import cv2
+    import face_recognition
+    from services.face_service import detect_head_pose
+
+    samples, issues = [], []
+    for path in paths:
+        name = os.path.basename(path)
+        try:
+            image = face_recognition.load_image_file(path)
+            scale = MAX_IMAGE_SIDE / max(image.shape[:2])
+            if scale < 1:
+                image = cv2.resize(image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            locations = face_recognition.face_locations(image)
+            if len(locations) != 1:
+                issues.append(f"{name}: {len(locations)} faces found, expected 1")
+                continue
+            landmarks = face_recognition.face_landmarks(image, locations)
+            encodings = face_recognition.face_encodings(image, locations)
+            if not landmarks or not encodings:
+                issues.append(f"{name}: face could not be encoded")
+                continue
+            samples.append((detect_head_pose(landmarks[0]), encodings[0]))
+        except Exception as e:
+            issues.append(f"{name}: {e}")
+    return emp_code, samples, issues, len(paths)
+
+
+def select_samples(samples, required_poses, max_samples=MAX_SAMPLES):
+    """
+    Picks up to max_samples encodings, one per required pose first.
+    Returns (encodings, missing_poses).
+    """
+    chosen, rest = [], []
+    covered = set()
+    for pose, encoding in samples:
+        if pose in required_poses and pose not in covered:
+            covered.add(pose)
+            chosen.append(encoding)
+        else:
+            rest.append(encoding)
+    missing = [pose for pose in required_poses if pose not in covered]
+    return (chosen + rest)[:max_samples], missing
+
+
+def read_rows(csv_path, photos_dir, dept_map, role_map):
+    """
+    Validates the CSV. Returns ({emp_code: (emp_data, image_paths)}, failures)
+    in file order; failures = [(emp_code_or_line, message)].
+    """
+    rows, failures = {}, []
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+
+        for line, record in enumerate(reader, start=2):
+            code = (record["emp_code"] or "").strip()
+            key = code or f"line {line}"
+            try:
+                if not code or not (record["full_name"] or "").strip():
+                    raise ValueError("emp_code and full_name are required")
+                if code in rows:
+                    raise ValueError("duplicate emp_code in CSV")
+                joining_date = datetime.strptime(record["joining_date"].strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+                salary = float(record["base_salary"] or 0)
+                dept_id = dept_map.get(record["department"].strip())
+                role_id = role_map.get(record["role"].strip())
+                if dept_id is None:
+                    raise ValueError(f"unknown department '{record['department']}'")
+                if role_id is None:
+                    raise ValueError(f"unknown role '{record['role']}'")
+
+                person_dir = os.path.join(photos_dir, code)
+                paths = sorted(
+                    os.path.join(person_dir, name) for name in os.listdir(person_dir)
+                    if name.lower().endswith(IMAGE_EXTENSIONS)
+                ) if os.path.isdir(person_dir) else []
+                if not paths:
+                    raise ValueError(f"no photos in {person_dir}")
+            except (ValueError, AttributeError) as e:
+                failures.append((key, str(e)))
+                continue
+
+            rows[code] = ({
+                'code': code,
+                'name': record["full_name"].strip(),
+                'joining_date': joining_date,
+                'salary': salary,
+                'dept_id': dept_id,
+                'role_id': role_id,
+            }, paths)
+    return rows, failures
+
+
+def enroll_from_folder(csv_path, photos_dir, workers=None, required_poses=DEFAULT_POSES,
+                       chunk_size=INSERT_CHUNK_SIZE, progress=None):
+    """
+    Encodes and inserts every valid row. progress: optional callback(done, total).
+    Returns summary dict: added, skipped, failures [(emp_code, message)],
+    images, seconds, images_per_sec.
+    """
+    from models.employee_model import EmployeeModel
+
+    start = time.perf_counter()
+    model = EmployeeModel()
+    dept_map = {name: dept_id for dept_id, name in model.get_departments()}
+    role_map = {name: role_id for role_id, name in model.get_roles()}
+    rows, failures = read_rows(csv_path, photos_dir, dept_map, role_map)
+
+    existing = model.existing_codes(rows)
+    for code in existing:
+        del rows[code]
+    if existing:
+        logger.info(f"Bulk enrollment: {len(existing)} employees already registered, skipped.")
+
+    added, pending, images = [], [], 0
+
+    def flush():
+        done, errors = model.add_employees_bulk(pending, chunk_size=chunk_size)
+        added.extend(done)
+        failures.extend(errors)
+        pending.clear()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_encode_person, code, paths) for code, (_, paths) in rows.items()]
+        for n, future in enumerate(as_completed(futures), start=1):
+            emp_code, samples, issues, images_read = future.result()
+            images += images_read
+            for issue in issues:
+                logger.warning(f"Bulk enrollment {emp_code}: {issue}")
+
+            encodings, missing = select_samples(samples, required_poses)
+            if missing:
+                reason = f"missing poses: {', '.join(missing)}"
+                if issues:
+                    reason += f" ({len(issues)} images rejected)"
+                failures.append((emp_code, reason))
+            else:
+                pending.append((rows[emp_code][0], encodings))
+                if len(pending) >= chunk_size:
+                    flush()
+            if progress:
+                progress(n, len(futures))
+    if pending:
+        flush()
+
+    seconds = time.perf_counter() - start
+    summary = {
+        "added": len(added),
+        "skipped": len(existing),
+        "failures": failures,
+        "images": images,
+        "seconds": round(seconds, 2),
+        "images_per_sec": round(images / seconds, 1) if seconds else 0.0,
+    }
+    logger.info(f"Bulk enrollment: {summary['added']} added, {len(failures)} failed, "
+                f"{images} images in {summary['seconds']}s ({summary['images_per_sec']} images/sec)")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enroll employees from a CSV and per-employee photo folders.")
+    parser.add_argument("csv_path")
+    parser.add_argument("photos_dir")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--require-poses", default=",".join(DEFAULT_POSES),
+                        help="Comma separated poses every employee needs (FRONT, LEFT, RIGHT)")
+    parser.add_argument("--chunk-size", type=int, default=INSERT_CHUNK_SIZE, help="Employees per transaction")
+    parser.add_argument("--failures", default=None, help="Write failed rows to this CSV")
+    args = parser.parse_args()
+
+    required_poses = tuple(p.strip().upper() for p in args.require_poses.split(",") if p.strip())
+
+    def progress(done, total):
+        print(f"\r{done}/{total} employees encoded", end="", flush=True)
+
+    summary = enroll_from_folder(args.csv_path, args.photos_dir, workers=args.workers,
+                                 required_poses=required_poses, chunk_size=args.chunk_size, progress=progress)
+    print()
+    for emp_code, message in summary["failures"]:
+        print(f"  FAILED {emp_code}: {message}")
+    if args.failures:
+        with open(args.failures, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["emp_code", "error"])
+            writer.writerows(summary["failures"])
+    print(f"{summary['added']} added, {summary['skipped']} already registered, "
+          f"{len(summary['failures'])} failed; {summary['images']} images in {summary['seconds']}s "
+          f"({summary['images_per_sec']} images/sec)")
+    return 1 if summary["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
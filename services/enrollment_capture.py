@@ -0,0 +1,106 @@
+"""
+Background pose capture for employee registration.
+
+The Tk loop only hands frames over and drains events; head-pose detection and
+encoding run on this worker. The face location found for the pose check is
+reused for the encoding, so taking a sample costs no second detection.
+
+Events returned by poll():
+    ("pose", target, pose)       pose the user holds now (None = no face)
+    ("captured", target, count)  a sample was taken; target is the next pose
+    ("done", encodings)
+    ("error", message)
+"""
+import logging
+import queue
+import threading
+import time
+
+import cv2
+
+from services.face_service import analyze_pose, get_face_encodings
+from services.recognition_scheduler import FrameSlot
+
+logger = logging.getLogger(__name__)
+
+# 3 Front, 1 Left, 1 Right
+POSE_SEQUENCE = ("FRONT", "FRONT", "FRONT", "LEFT", "RIGHT")
+STABLE_SECONDS = 0.3  # Pose must be held this long before a sample is taken
+
+
+class PoseCaptureWorker:
+    """Owns the capture state machine; the UI only renders what it reports."""
+
+    def __init__(self, scale=0.5, stable_seconds=STABLE_SECONDS):
+        self.scale = scale
+        self.stable_seconds = stable_seconds
+        self.slot = FrameSlot()
+        self.events = queue.Queue()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, frame):
+        """Latest BGR frame; the worker only reads it, and drops it if still busy."""
+        self.slot.put(frame)
+
+    def poll(self):
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def stop(self):
+        self.stop_event.set()
+        self.slot.close()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+
+    def _run(self):
+        encodings = []
+        last_pose = None
+        held_since = None
+        self.events.put(("pose", POSE_SEQUENCE[0], None))
+        while not self.stop_event.is_set():
+            frame = self.slot.take(timeout=0.5)
+            if frame is None:
+                continue
+            try:
+                small = cv2.resize(frame, (0, 0), fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+                rgb_small = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+                target = POSE_SEQUENCE[len(encodings)]
+                pose, location = analyze_pose(rgb_small)
+                if pose != last_pose:
+                    self.events.put(("pose", target, pose))
+                    last_pose = pose
+
+                # Capture Logic: the target pose, held steady
+                now = time.monotonic()
+                if pose != target:
+                    held_since = None
+                    continue
+                if held_since is None:
+                    held_since = now
+                if now - held_since < self.stable_seconds:
+                    continue
+
+                found = get_face_encodings(rgb_small, [location])
+                if not found:
+                    continue
+                encodings.append(found[0])
+                held_since = None
+                if len(encodings) == len(POSE_SEQUENCE):
+                    self.events.put(("done", encodings))
+                    return
+                self.events.put(("captured", POSE_SEQUENCE[len(encodings)], len(encodings)))
+                last_pose = None  # Report the pose again against the new target
+            except Exception as e:
+                logger.error(f"Pose Capture Error: {e}")
+                self.events.put(("error", str(e)))
+                return
@@ -0,0 +1,146 @@
+"""
+On-disk face gallery snapshot shared by kiosk processes.
+
+Layout (FACE_GALLERY_DIR):
+    encodings_<gen>.npy   float32 N x 128, opened with mmap_mode='r'
+    index.npz             generation, emp_codes, row_ids (face_encodings.id), watermark
+
+The snapshot holds every sample (active or not); inactive employees are
+masked out at load time, so deactivation never forces a rebuild.
+It is refreshed against the face_encodings watermark (max id, count, version;
+the version is bumped by triggers on every UPDATE / DELETE):
+    - unchanged            -> reused as-is
+    - only new ids         -> only the new rows are read from SQLite and merged in
+                              (the matrix file is still rewritten whole)
+    - rows deleted/changed -> full rebuild
+Rows are kept grouped by emp_code (as FaceMatcher needs), so loading never
+re-sorts, and the memory map is used without a private copy.
+Every write goes to a new generation and index.npz is replaced last, so a
+reader never pairs an index with the wrong matrix.
+"""
+import glob
+import logging
+import os
+
+import numpy as np
+
+from config.settings import FACE_GALLERY_DIR
+from models.attendance_model import AttendanceModel
+from utils.face_codec import ENCODING_DIM
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.npz"
+
+
+class FaceGallery:
+    def __init__(self, model=None, directory=FACE_GALLERY_DIR):
+        self.model = model or AttendanceModel()
+        self.directory = directory
+
+    # --- Snapshot files ---
+    def _matrix_path(self, generation):
+        return os.path.join(self.directory, f"encodings_{generation}.npy")
+
+    def _read_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+
+    def _open(self, index):
+        matrix = np.load(self._matrix_path(int(index["generation"])), mmap_mode="r")
+        return matrix[:len(index["emp_codes"])]
+
+    def _write(self, index, matrix, emp_codes, row_ids, max_id, count, version):
+        generation = int(index["generation"]) + 1 if index is not None else 1
+        os.makedirs(self.directory, exist_ok=True)
+
+        matrix_path = self._matrix_path(generation)
+        np.save(matrix_path + ".tmp.npy", np.ascontiguousarray(matrix, dtype=np.float32))
+        os.replace(matrix_path + ".tmp.npy", matrix_path)
+
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        np.savez(
+            index_path + ".tmp.npz",
+            generation=generation,
+            emp_codes=np.asarray(emp_codes, dtype=str),
+            row_ids=np.asarray(row_ids, dtype=np.int64),
+            max_id=max_id,
+            count=count,
+            version=version,
+        )
+        os.replace(index_path + ".tmp.npz", index_path)
+
+        # Old generations: processes that already mapped them keep their pages
+        for stale in glob.glob(os.path.join(self.directory, "encodings_*.npy")):
+            if stale != matrix_path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    # --- Public API ---
+    def refresh(self) -> str:
+        """Brings the snapshot up to date. Returns 'fresh', 'appended' or 'rebuilt'."""
+        max_id, count, version = self.model.get_encoding_watermark()
+        index = self._read_index()
+        # Snapshots written before the version existed can't prove nothing was rewritten
+        index_current = index is not None and int(index.get("version", -1)) == version
+
+        if index_current and int(index["max_id"]) == max_id and int(index["count"]) == count:
+            return "fresh"
+
+        snap_max = int(index["max_id"]) if index is not None else 0
+        snap_count = int(index["count"]) if index is not None else 0
+        new_matrix, new_codes, new_ids = self.model.get_encodings_since(snap_max)
+
+        # Merging is only valid if every row the snapshot knows about still exists
+        snap_codes = index["emp_codes"] if index is not None else None
+        if (index_current and count - len(new_ids) == snap_count
+                and (len(snap_codes) < 2 or np.all(snap_codes[:-1] <= snap_codes[1:]))):
+            # New rows (sorted by emp_code, id) go after each employee's existing samples
+            new_codes = np.asarray(new_codes, dtype=str)
+            at = np.searchsorted(snap_codes, new_codes, side="right")
+            matrix = np.insert(self._open(index), at, new_matrix, axis=0)
+            emp_codes = np.insert(snap_codes.astype(object), at, new_codes.astype(object)).astype(str)
+            row_ids = np.insert(index["row_ids"], at, np.asarray(new_ids, dtype=np.int64))
+            self._write(index, matrix, emp_codes, row_ids, max_id, count, version)
+            logger.info(f"Face gallery appended {len(new_ids)} samples ({len(row_ids)} total).")
+            return "appended"
+
+        matrix, emp_codes, row_ids = self.model.get_encodings_since(0)
+        self._write(index, matrix, emp_codes, row_ids, max_id, count, version)
+        logger.info(f"Face gallery rebuilt with {len(row_ids)} samples.")
+        return "rebuilt"
+
+    def invalidate(self):
+        """Drops the snapshot index so the next refresh rebuilds from SQLite."""
+        try:
+            os.remove(os.path.join(self.directory, INDEX_FILE))
+        except FileNotFoundError:
+            pass
+
+    def load(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Refreshes, then returns (encodings, emp_codes) for active employees.
+        encodings is a read-only memory map when every sample is active.
+        """
+        self.refresh()
+        for attempt in range(2):
+            index = self._read_index()
+            try:
+                matrix = self._open(index)
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise  # Another process swapped generations twice in a row
+
+        emp_codes = index["emp_codes"].astype(object)
+        active = np.isin(emp_codes, list(self.model.get_active_employee_codes()))
+        if not active.all():
+            matrix, emp_codes = matrix[active], emp_codes[active]
+
+        logger.info(f"Face gallery loaded: {len(emp_codes)} active samples (memory-mapped).")
+        return matrix.reshape(-1, ENCODING_DIM), emp_codes
@@ -0,0 +1,156 @@
+"""
+Approximate nearest-neighbour index for large face galleries.
+Pure-NumPy IVF (inverted file): samples are partitioned with k-means and a
+query only scans the n_probe closest partitions. Candidate employees found
+there are then re-ranked exactly over all of their samples, so the returned
+distance is identical to FaceMatcher's whenever the right employee is probed.
+"""
+import logging
+import math
+
+import numpy as np
+
+from config.settings import FACE_INDEX, FACE_IVF_NPROBE
+from services.face_matcher import FaceMatcher, ENCODING_DIM
+
+logger = logging.getLogger(__name__)
+
+# Rows per distance block during k-means (bounds peak memory to ~chunk x n_lists floats)
+KMEANS_CHUNK = 8192
+# Training rows per centroid; more gives better partitions, slower build
+KMEANS_SAMPLES_PER_LIST = 64
+
+
+def _sq_distances(x, x_sq, centroids, c_sq):
+    sq = x_sq[:, None] + c_sq[None, :] - 2.0 * (x @ centroids.T)
+    np.maximum(sq, 0.0, out=sq)
+    return sq
+
+
+def _assign(x, centroids):
+    """Nearest centroid for every row of x (chunked)."""
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    out = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), KMEANS_CHUNK):
+        block = x[start:start + KMEANS_CHUNK]
+        b_sq = np.einsum("ij,ij->i", block, block)
+        out[start:start + KMEANS_CHUNK] = np.argmin(_sq_distances(block, b_sq, centroids, c_sq), axis=1)
+    return out
+
+
+def kmeans(x, k, iters=10, seed=0):
+    """Plain Lloyd's k-means; empty clusters keep their previous centroid."""
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = _assign(x, centroids)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.stack([np.bincount(assign, weights=x[:, d], minlength=k) for d in range(x.shape[1])], axis=1)
+        filled = counts > 0
+        centroids[filled] = (sums[filled] / counts[filled, None]).astype(np.float32)
+    return centroids
+
+
+class IVFFaceIndex(FaceMatcher):
+    """
+    Drop-in replacement for FaceMatcher (same match() API).
+    n_lists: number of k-means partitions (default ~ 4 * sqrt(N)).
+    n_probe: partitions scanned per query; higher = better recall, slower.
+    centroids: reuse an existing partitioning (skips k-means training).
+    """
+
+    def __init__(self, encodings, ids, aggregate="min", n_lists=None, n_probe=FACE_IVF_NPROBE,
+                 kmeans_iters=10, seed=0, centroids=None):
+        super().__init__(encodings, ids, aggregate=aggregate)
+        n = len(self)
+        self.n_lists = min(n, n_lists or max(1, int(4 * math.sqrt(n))))
+        self.n_probe = n_probe
+        self._row_group = np.repeat(np.arange(len(self.employee_ids)), self._group_counts)
+
+        if n == 0:
+            self.centroids = np.empty((0, ENCODING_DIM), dtype=np.float32)
+            self._list_rows = np.empty(0, dtype=np.int64)
+            self._list_offsets = np.zeros(1, dtype=np.int64)
+            return
+
+        if centroids is not None:
+            self.centroids = centroids
+            self.n_lists = len(centroids)
+        else:
+            rng = np.random.default_rng(seed)
+            n_train = min(n, self.n_lists * KMEANS_SAMPLES_PER_LIST)
+            train = self.matrix[rng.choice(n, size=n_train, replace=False)]
+            self.centroids = kmeans(train, self.n_lists, iters=kmeans_iters, seed=seed)
+        self._c_sq = np.einsum("ij,ij->i", self.centroids, self.centroids)
+
+        # Inverted lists in CSR form: rows of list i are _list_rows[_list_offsets[i]:_list_offsets[i+1]]
+        assign = _assign(self.matrix, self.centroids)
+        self._list_rows = np.argsort(assign, kind="stable")
+        self._list_offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=self.n_lists))))
+        logger.info(f"IVF index built: {n} samples in {self.n_lists} lists (n_probe={self.n_probe})")
+
+    def _derive(self, encodings, ids):
+        # Hot updates keep the trained partitions; new rows just join their nearest list
+        centroids = self.centroids if len(self.centroids) else None
+        return IVFFaceIndex(encodings, ids, aggregate=self.aggregate, n_probe=self.n_probe, centroids=centroids)
+
+    def _candidate_groups(self, query, q_sq):
+        """
+        Employees having at least one sample in the n_probe nearest lists.
+        Lists emptied by without() keep their centroid; if every probed list is
+        empty, the n_probe nearest non-empty lists are scanned instead.
+        """
+        c_dist = _sq_distances(query[None, :], q_sq[None], self.centroids, self._c_sq)[0]
+        n_probe = min(self.n_probe, self.n_lists)
+        probe = np.argpartition(c_dist, n_probe - 1)[:n_probe]
+        sizes = np.diff(self._list_offsets)
+        if not sizes[probe].any():
+            filled = np.flatnonzero(sizes)
+            n_probe = min(n_probe, len(filled))
+            if n_probe == 0:
+                return np.empty(0, dtype=np.int64)
+            probe = filled[np.argpartition(c_dist[filled], n_probe - 1)[:n_probe]]
+        rows = np.concatenate([
+            self._list_rows[self._list_offsets[i]:self._list_offsets[i + 1]] for i in probe
+        ])
+        return np.unique(self._row_group[rows])
+
+    def _rerank(self, query, q_sq, groups):
+        """Exact aggregated distance over every sample of the candidate employees."""
+        counts = self._group_counts[groups]
+        offsets = np.cumsum(counts) - counts
+        rows = np.repeat(self._group_starts[groups] - offsets, counts) + np.arange(counts.sum())
+
+        sq = q_sq + self._sq_norms[rows] - 2.0 * (self.matrix[rows] @ query)
+        dist = np.sqrt(np.maximum(sq, 0.0))
+        if self.aggregate == "min":
+            return np.minimum.reduceat(dist, offsets)
+        return np.add.reduceat(dist, offsets) / counts
+
+    def match(self, face_encodings, tolerance: float = 0.5) -> list[tuple[str | None, float]]:
+        if len(face_encodings) == 0:
+            return []
+        if len(self) == 0:
+            return [(None, float("inf"))] * len(face_encodings)
+
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, ENCODING_DIM)
+        results = []
+        for query in queries:
+            q_sq = np.float32(query @ query)
+            groups = self._candidate_groups(query, q_sq)
+            if groups.size == 0:
+                results.append((None, float("inf")))
+                continue
+            emp_dist = self._rerank(query, q_sq, groups)
+            best = int(np.argmin(emp_dist))
+            dist = float(emp_dist[best])
+            emp_code = self.employee_ids[groups[best]] if dist <= tolerance else None
+            results.append((emp_code, dist))
+        return results
+
+
+def build_matcher(encodings, ids, aggregate="min"):
+    """Gallery matcher selected by FACE_INDEX setting ('exact' or 'ivf')."""
+    if FACE_INDEX == "ivf":
+        return IVFFaceIndex(encodings, ids, aggregate=aggregate)
+    return FaceMatcher(encodings, ids, aggregate=aggregate)
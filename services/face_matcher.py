@@ -0,0 +1,107 @@
+"""
+Vectorized nearest-neighbour matcher for face encodings.
+Keeps the whole gallery as one contiguous float32 (N x 128) matrix and
+scores every face of a frame against it in a single matrix product.
+"""
+import logging
+from typing import Literal
+
+import numpy as np
+
+from utils.face_codec import ENCODING_DIM
+
+logger = logging.getLogger(__name__)
+
+
+class FaceMatcher:
+    """
+    Gallery of known faces.
+    Rows are grouped by emp_code so per-employee aggregation over samples
+    is a single reduceat instead of a Python loop.
+    """
+
+    def __init__(self, encodings, ids, aggregate: Literal["min", "mean"] = "min"):
+        if aggregate not in ("min", "mean"):
+            raise ValueError(f"Unknown aggregate {aggregate!r} (expected 'min' or 'mean')")
+        self.aggregate = aggregate
+
+        ids = np.asarray(ids, dtype=object)
+        if len(ids):
+            matrix = np.asarray(encodings, dtype=np.float32).reshape(len(ids), ENCODING_DIM)
+        else:
+            matrix = np.empty((0, ENCODING_DIM), dtype=np.float32)
+
+        if len(ids) > 1 and not np.all(ids[:-1] <= ids[1:]):
+            order = np.argsort(ids, kind="stable")
+            ids, matrix = ids[order], matrix[order]
+        self.ids = ids
+        # No copy when already contiguous float32 (e.g. a memory-mapped gallery)
+        self.matrix = np.ascontiguousarray(matrix)
+        self._sq_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+
+        # Employee groups: ids are sorted, so each employee is one contiguous run
+        self.employee_ids, self._group_starts, self._group_counts = np.unique(
+            self.ids, return_index=True, return_counts=True
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distances(self, face_encodings) -> np.ndarray:
+        """Euclidean distance of every query face to every gallery sample, shape (F, N)."""
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, ENCODING_DIM)
+        q_norms = np.einsum("ij,ij->i", queries, queries)
+        # |q - g|^2 = |q|^2 + |g|^2 - 2 q.g  (one GEMM for the whole frame)
+        sq = q_norms[:, None] + self._sq_norms[None, :] - 2.0 * (queries @ self.matrix.T)
+        np.maximum(sq, 0.0, out=sq)
+        return np.sqrt(sq)
+
+    def employee_distances(self, face_encodings) -> np.ndarray:
+        """Per-employee distance (min or mean over that employee's samples), shape (F, E)."""
+        sample_dist = self.distances(face_encodings)
+        if self.aggregate == "min":
+            return np.minimum.reduceat(sample_dist, self._group_starts, axis=1)
+        return np.add.reduceat(sample_dist, self._group_starts, axis=1) / self._group_counts
+
+    def match(self, face_encodings, tolerance: float = 0.5) -> list[tuple[str | None, float]]:
+        """
+        Best match for each query face.
+        Returns [(emp_code_or_None, distance), ...]; emp_code is None when the
+        closest employee is farther than tolerance.
+        """
+        n_queries = len(face_encodings)
+        if n_queries == 0:
+            return []
+        if len(self) == 0:
+            return [(None, float("inf"))] * n_queries
+
+        emp_dist = self.employee_distances(face_encodings)
+        best = np.argmin(emp_dist, axis=1)
+        best_dist = emp_dist[np.arange(n_queries), best]
+
+        results = []
+        for idx, dist in zip(best, best_dist):
+            emp_code = self.employee_ids[idx] if dist <= tolerance else None
+            results.append((emp_code, float(dist)))
+        return results
+
+    # --- Copy-on-write updates: the receiver is never modified ---
+    def _derive(self, encodings, ids):
+        return FaceMatcher(encodings, ids, aggregate=self.aggregate)
+
+    def with_added(self, encodings, ids):
+        """New matcher with extra samples appended."""
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_DIM)
+        if len(encodings) == 0:
+            return self
+        return self._derive(
+            np.concatenate([self.matrix, encodings]),
+            np.concatenate([self.ids, np.asarray(ids, dtype=object)]),
+        )
+
+    def without(self, emp_codes):
+        """New matcher with every sample of the given employees removed."""
+        keep = ~np.isin(self.ids, list(emp_codes))
+        if keep.all():
+            return self
+        return self._derive(self.matrix[keep], self.ids[keep])
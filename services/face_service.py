@@ -9,6 +9,9 @@ import cv2
 import face_recognition
 import numpy as np
 
+from services.face_matcher import FaceMatcher
+from services.face_tracker import FaceTracker, Track
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,21 +42,40 @@ def get_face_landmarks(rgb_frame: np.ndarray) -> list:
     return face_recognition.face_landmarks(rgb_frame)
 
 
-def get_face_encodings(rgb_frame: np.ndarray) -> list:
-    """Return face encodings from RGB frame (for registration capture)."""
-    return face_recognition.face_encodings(rgb_frame)
+def get_face_encodings(rgb_frame: np.ndarray, face_locations: list | None = None) -> list:
+    """
+    Return face encodings from RGB frame (for registration capture).
+    Pass face_locations already found for this frame to skip a second detection.
+    """
+    return face_recognition.face_encodings(rgb_frame, face_locations)
+
+
+def analyze_pose(rgb_frame: np.ndarray) -> tuple[str | None, tuple[int, int, int, int] | None]:
+    """
+    One detection for the first face: returns (pose, face_location), or
+    (None, None) without a face. The location can go to get_face_encodings.
+    """
+    face_locations = face_recognition.face_locations(rgb_frame)
+    if not face_locations:
+        return None, None
+    location = face_locations[0]
+    landmarks = face_recognition.face_landmarks(rgb_frame, [location])
+    if not landmarks:
+        return None, None
+    return detect_head_pose(landmarks[0]), location
 
 
 def process_face_recognition(
     frame: np.ndarray,
-    known_encodings: list,
-    known_ids: list,
+    matcher: FaceMatcher,
     scale: float = 1.0,
     tolerance: float = 0.5,
 ) -> list[tuple[tuple[int, int, int, int], str | None]]:
     """
     Run face detection and recognition on a frame.
     Frame should be RGB; pass scale < 1.0 to resize for speed (e.g. 0.25).
+    Each face is assigned its closest employee in the matcher's gallery
+    (not the first one under tolerance).
     Returns list of (face_location, emp_code_or_None) in same scale as input.
     face_location is (top, right, bottom, left).
     """
@@ -76,15 +98,44 @@ def process_face_recognition(
     face_encodings_list = face_recognition.face_encodings(rgb_small, face_locations)
     results: list[tuple[tuple[int, int, int, int], str | None]] = []
 
-    for (top, right, bottom, left), face_encoding in zip(face_locations, face_encodings_list):
-        matches = face_recognition.compare_faces(known_encodings, face_encoding, tolerance=tolerance)
-        emp_code: str | None = None
-        if True in matches:
-            first_match_index = matches.index(True)
-            emp_code = known_ids[first_match_index]
-
+    matches = matcher.match(face_encodings_list, tolerance=tolerance)
+    for (top, right, bottom, left), (emp_code, distance) in zip(face_locations, matches):
+        logger.debug("Best match %s at distance %.3f", emp_code, distance)
         results.append(((top, right, bottom, left), emp_code))
 
     if results:
         logger.debug("Recognized %d face(s)", len(results))
     return results
+
+
+def recognize_tracked(
+    frame: np.ndarray,
+    matcher: FaceMatcher,
+    tracker: FaceTracker,
+    scale: float = 1.0,
+    now: float = 0.0,
+    tolerance: float = 0.5,
+) -> tuple[list[Track], list[Track]]:
+    """
+    Detection round with tracking: locates faces in a BGR frame that was
+    already resized by `scale`, associates them with the tracker's tracks
+    (boxes in full-frame pixels) and encodes + matches only the faces that are
+    new or whose identity confidence has decayed.
+    Returns (visible_tracks, tracks_identified_this_round).
+    """
+    if frame is None or frame.size == 0:
+        return [], []
+
+    rgb_small = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    face_locations = face_recognition.face_locations(rgb_small)
+    boxes = [tuple(int(v / scale) for v in location) for location in face_locations]
+    visible, to_encode = tracker.update(boxes, now)
+    if not to_encode:
+        return visible, []
+
+    encodings = face_recognition.face_encodings(rgb_small, [face_locations[i] for i, _ in to_encode])
+    matches = matcher.match(encodings, tolerance=tolerance)
+    for (_, track), (emp_code, distance) in zip(to_encode, matches):
+        tracker.assign(track, emp_code, distance, now)
+        logger.debug("Track %d -> %s at distance %.3f", track.track_id, emp_code, distance)
+    return visible, [track for _, track in to_encode]
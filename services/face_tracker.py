@@ -0,0 +1,183 @@
+"""
+Face tracks across detections, so a person standing at (or walking past) the
+kiosk is encoded once instead of on every detection.
+
+Detections are associated with existing tracks by IoU, falling back to
+centroid distance. A track keeps its identity until its confidence decays:
+confidence starts at the match margin ((tolerance - distance) / tolerance),
+halves every `half_life` seconds and on every missed detection. Only new
+tracks and decayed tracks are re-encoded.
+"""
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes."""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    inter = max(0, bottom - top) * max(0, right - left)
+    if inter == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return inter / float(area_a + area_b - inter)
+
+
+def _centroid(box):
+    return (box[0] + box[2]) / 2.0, (box[1] + box[3]) / 2.0
+
+
+class Track:
+    """One face followed across frames."""
+    __slots__ = ("track_id", "box", "emp_code", "distance", "margin", "hits", "misses",
+                 "encodes", "votes", "created_at", "encoded_at", "seen_at")
+
+    def __init__(self, track_id, box, now):
+        self.track_id = track_id
+        self.box = box
+        self.emp_code = None
+        self.distance = None
+        self.margin = 0.0           # confidence right after the last encode
+        self.hits = 1               # detections associated with this track
+        self.misses = 0             # consecutive detections without it
+        self.encodes = 0
+        self.votes = {}             # emp_code (None = unknown) -> encodes agreeing
+        self.created_at = now
+        self.encoded_at = None
+        self.seen_at = now
+
+    def confidence(self, now, half_life):
+        if self.encoded_at is None:
+            return 0.0
+        return self.margin * 0.5 ** ((now - self.encoded_at) / half_life + self.misses)
+
+    @property
+    def stability(self):
+        """Share of this track's encodes that agree with its current identity."""
+        return self.votes.get(self.emp_code, 0) / self.encodes if self.encodes else 0.0
+
+    def report(self, now, half_life):
+        return {
+            "track_id": self.track_id,
+            "emp_code": self.emp_code,
+            "confidence": round(self.confidence(now, half_life), 3),
+            "stability": round(self.stability, 3),
+            "hits": self.hits,
+            "encodes": self.encodes,
+            "age": round(now - self.created_at, 2),
+        }
+
+
+class FaceTracker:
+    """
+    Not thread-safe: owned by the recognition worker.
+    Boxes are (top, right, bottom, left) in one fixed coordinate space
+    (the worker uses full-frame pixels).
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=2, half_life=2.0,
+                 min_confidence=0.1, unknown_retry=0.5, tolerance=0.5):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses            # detections a track may miss before it ends
+        self.half_life = half_life
+        self.min_confidence = min_confidence    # below this a known track is re-encoded
+        self.unknown_retry = unknown_retry      # seconds between encodes of an unknown face
+        self.tolerance = tolerance
+        self.tracks = []
+        self._ids = itertools.count(1)
+        self.stats = {"detections": 0, "encodes": 0, "tracks": 0}
+
+    def _associate(self, boxes):
+        """Greedy IoU matching, then centroid distance for the leftovers. Returns {box_idx: track}."""
+        pairs = sorted(
+            ((iou(box, t.box), i, t) for i, box in enumerate(boxes) for t in self.tracks),
+            key=lambda p: p[0], reverse=True,
+        )
+        matched, used = {}, set()
+        for score, i, track in pairs:
+            if score < self.iou_threshold:
+                break
+            if i not in matched and track.track_id not in used:
+                matched[i] = track
+                used.add(track.track_id)
+
+        for i, box in enumerate(boxes):
+            if i in matched:
+                continue
+            cy, cx = _centroid(box)
+            best, best_dist = None, None
+            for track in self.tracks:
+                if track.track_id in used:
+                    continue
+                ty, tx = _centroid(track.box)
+                dist = ((cy - ty) ** 2 + (cx - tx) ** 2) ** 0.5
+                reach = max(track.box[2] - track.box[0], track.box[1] - track.box[3])
+                if dist < reach and (best_dist is None or dist < best_dist):
+                    best, best_dist = track, dist
+            if best is not None:
+                matched[i] = best
+                used.add(best.track_id)
+        return matched
+
+    def update(self, boxes, now):
+        """
+        Feeds one detection round. Returns (visible_tracks, to_encode), both in
+        the order of `boxes`; to_encode is [(box_index, track)].
+        """
+        self.stats["detections"] += len(boxes)
+        matched = self._associate(boxes)
+        visible, to_encode = [], []
+        for i, box in enumerate(boxes):
+            track = matched.get(i)
+            if track is None:
+                track = Track(next(self._ids), box, now)
+                self.tracks.append(track)
+                self.stats["tracks"] += 1
+            else:
+                track.box = box
+                track.hits += 1
+                track.misses = 0
+            track.seen_at = now
+            visible.append(track)
+            if self._needs_encode(track, now):
+                to_encode.append((i, track))
+
+        seen = {t.track_id for t in visible}
+        alive = []
+        for track in self.tracks:
+            if track.track_id not in seen:
+                track.misses += 1
+            if track.misses > self.max_misses:
+                logger.debug(f"Track ended: {track.report(now, self.half_life)}")
+            else:
+                alive.append(track)
+        self.tracks = alive
+        return visible, to_encode
+
+    def _needs_encode(self, track, now):
+        if track.encoded_at is None:
+            return True
+        if track.emp_code is None:
+            return now - track.encoded_at >= self.unknown_retry
+        return track.confidence(now, self.half_life) < self.min_confidence
+
+    def assign(self, track, emp_code, distance, now):
+        """Records an encode + match result; identity is the majority vote (ties: latest)."""
+        self.stats["encodes"] += 1
+        track.encodes += 1
+        track.encoded_at = now
+        track.distance = distance
+        track.votes[emp_code] = track.votes.get(emp_code, 0) + 1
+        if track.votes[emp_code] >= track.votes.get(track.emp_code, 0):
+            track.emp_code = emp_code
+        if emp_code is None or emp_code != track.emp_code:
+            track.margin = 0.0  # Unknown or outvoted: check again on the next round
+        else:
+            track.margin = max(0.0, (self.tolerance - distance) / self.tolerance)
+
+    def report(self, now):
+        """Per-track identity / confidence / stability for the live tracks."""
+        return [t.report(now, self.half_life) for t in self.tracks]
@@ -1,15 +1,106 @@
 import os
+import time
+import zipfile
 import calendar
-from datetime import datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import logging
+import numpy as np
 
 from models.payroll_model import PayrollModel
+from services.payslip_renderer import PAYSLIP_DIR, PayslipRenderer, payslip_filename
 
 logger = logging.getLogger(__name__)
 
+# Slips per worker task: amortizes process IPC without starving the progress bar
+BATCH_CHUNK_SIZE = 50
+
+
+def _render_chunk(jobs):
+    """Worker process entry: [(salary_data, filename)] -> (rendered, failed)."""
+    renderer = PayslipRenderer()
+    rendered, failed = [], []
+    for salary_data, filename in jobs:
+        try:
+            renderer.render_file(salary_data, filename)
+            rendered.append((salary_data['emp_code'], filename))
+        except Exception as e:
+            failed.append((salary_data['emp_code'], str(e)))
+    return rendered, failed
+
+
+def _render_chunk_bytes(jobs):
+    """Worker process entry for ZIP output: returns PDF bytes instead of writing files."""
+    renderer = PayslipRenderer()
+    rendered, failed = [], []
+    for salary_data, filename in jobs:
+        try:
+            rendered.append((salary_data['emp_code'], os.path.basename(filename), renderer.render_bytes(salary_data)))
+        except Exception as e:
+            failed.append((salary_data['emp_code'], str(e)))
+    return rendered, failed
+
+
+def month_bounds(month, year):
+    """Half-open date range ('YYYY-MM-01', first day of next month) for range predicates."""
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year}-{month:02d}-01", f"{next_year}-{next_month:02d}-01"
+
+
+def period_label(month, year):
+    """Payslip period text, e.g. 'January 2025' (from the payroll month, not today)."""
+    return f"{calendar.month_name[month]} {year}"
+
+
+def month_end(month, year):
+    """Last day of the month ('YYYY-MM-DD'), the ledger's cleared-upto date."""
+    return f"{year}-{month:02d}-{calendar.monthrange(year, month)[1]}"
+
+
+def _apply_salary_rules(rows, month, year):
+    """
+    calculate_salary() math over many employees at once (NumPy).
+    rows: get_bulk_salary_components() tuples -> list of salary dicts.
+    """
+    if not rows:
+        return []
+
+    codes, names, base, pf_pct, tax_ded, bonus, depts, roles, present, leaves = zip(*rows)
+    base = np.asarray(base, dtype=np.float64)
+    pf_pct = np.asarray(pf_pct, dtype=np.float64)
+    tax_ded = np.asarray(tax_ded, dtype=np.float64)
+    bonus = np.asarray(bonus, dtype=np.float64)
+    present_arr = np.asarray(present, dtype=np.float64)
+
+    # --- BUSINESS LOGIC (same formulas as calculate_salary) ---
+    earned_basic = (base / 30) * (present_arr + np.asarray(leaves, dtype=np.float64))
+    bonus_amt = bonus * present_arr
+    gross_earnings = earned_basic + bonus_amt
+    pf_amt = earned_basic * pf_pct
+    has_earnings = gross_earnings > 0
+    final_tax = np.where(has_earnings, tax_ded, 0)
+    net_salary = np.maximum(gross_earnings - pf_amt - final_tax, 0)
+
+    month_year = period_label(month, year)
+    results = []
+    for i, emp_code in enumerate(codes):
+        results.append({
+            "emp_code": emp_code,
+            "name": names[i],
+            "dept": depts[i],
+            "role": roles[i],
+            "month_year": month_year,
+            "base_salary": base[i].item(),
+            "present_days": present[i],
+            "leaves": leaves[i],
+            "pf": round(pf_amt[i].item(), 2),
+            "tax": tax_ded[i].item() if has_earnings[i] else 0,
+            "bonus": round(bonus_amt[i].item(), 2),
+            "net_salary": round(net_salary[i].item(), 2),
+            "status": "Generated"
+        })
+    return results
+
+
 class PayrollService:
     def __init__(self):
         self.model = PayrollModel()
@@ -19,11 +110,10 @@ class PayrollService:
         Pure Business Logic Layer.
         Fetches data from Model -> Applies Math -> Returns Result.
         """
-        month_str = f"{year}-{month:02d}"          # For Exact Match
-        wildcard_str = f"{year}-{month:02d}%"      # For LIKE query
+        month_start, next_month_start = month_bounds(month, year)
         
         # --- DATA FETCHING ---
-        data = self.model.get_salary_components(emp_code, month_str, wildcard_str)
+        data = self.model.get_salary_components(emp_code, month_start, next_month_start)
         if not data:
             return None
             
@@ -53,7 +143,7 @@ class PayrollService:
             "name": name,
             "dept": dept,
             "role": role,
-            "month_year": f"{datetime.now().strftime('%B')} {year}",
+            "month_year": period_label(month, year),
             "base_salary": base,
             "present_days": present_days,
             "leaves": leave_days,
@@ -64,15 +154,35 @@ class PayrollService:
             "status": "Generated"
         }
 
+    def calculate_payroll(self, month, year):
+        """
+        Whole-month payroll for all active employees.
+        One grouped query + one vectorized pass; returns the same dicts as
+        calculate_salary(), ordered by emp_code.
+        """
+        rows = self.model.get_bulk_salary_components(*month_bounds(month, year))
+        return _apply_salary_rules(rows, month, year)
+
+    def iter_payroll(self, month, year, chunk_size=500):
+        """calculate_payroll() in chunks (lists of dicts) for incremental display."""
+        for rows in self.model.iter_bulk_salary_components(*month_bounds(month, year), chunk_size=chunk_size):
+            yield _apply_salary_rules(rows, month, year)
+
     def mark_as_paid(self, emp_code, month, year, net_salary):
         """Delegates update to Model"""
         month_year_txt = f"{month}-{year}"
-        
-        # Calculate Last Day of Month for Ledger
-        last_day = calendar.monthrange(year, month)[1]
-        cleared_date = f"{year}-{month:02d}-{last_day}"
-        
-        return self.model.record_payment(emp_code, month_year_txt, net_salary, cleared_date)
+        return self.model.record_payment(emp_code, month_year_txt, net_salary, month_end(month, year))
+
+    def mark_all_as_paid(self, month, year, payroll=None):
+        """
+        Closes a month: every employee's slip marked Paid and ledger advanced in
+        one transaction. Safe to re-run (paid slips are never rewritten); employees
+        added later are paid by the next run.
+        payroll: already computed calculate_payroll() result (recomputed if None).
+        """
+        payroll = payroll if payroll is not None else self.calculate_payroll(month, year)
+        payments = [(d['emp_code'], d['present_days'], d['net_salary']) for d in payroll]
+        return self.model.record_payments_bulk(f"{month}-{year}", payments, month_end(month, year))
 
     def add_leave(self, emp_code, leave_date, leave_type="Casual"):
         """Delegates insert to Model"""
@@ -80,63 +190,86 @@ class PayrollService:
 
     def generate_payslip_pdf(self, salary_data):
         """Generates a PDF payslip and returns the filepath."""
-        if not os.path.exists("payslips"):
-            os.makedirs("payslips")
+        filename = payslip_filename(salary_data)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        PayslipRenderer().render_file(salary_data, filename)
+        logger.info(f"Payslip generated: {filename}")
+        return filename
+
+    def generate_payslips_batch(self, month, year, output_dir=None, workers=None, progress=None,
+                                output_format="files"):
+        """
+        Renders payslips for every active employee.
+        output_format:
+            'files'  - one PDF per employee, rendered in a process pool (default)
+            'zip'    - same PDFs rendered in the pool, streamed into payslips_<YYYY-MM>.zip
+            'merged' - one multi-page PDF payslips_<YYYY-MM>.pdf (template stored once)
+        output_dir: defaults to payslips/<YYYY-MM>/
+        progress: optional callback(done, total), called from the calling thread.
+        Records each pdf_path in salary_slips (the archive path for zip/merged).
+        Returns summary dict: count, failed, seconds, slips_per_sec, output_dir, output_path.
+        """
+        if output_format not in ("files", "zip", "merged"):
+            raise ValueError(f"Unknown payslip output format: {output_format}")
 
-        filename = f"payslips/Payslip_{salary_data['emp_code']}_{salary_data['month_year'].replace(' ', '_')}.pdf"
-        c = canvas.Canvas(filename, pagesize=letter)
-        width, height = letter
+        start = time.perf_counter()
+        payroll = self.calculate_payroll(month, year)
+        output_dir = output_dir or os.path.join(PAYSLIP_DIR, f"{year}-{month:02d}")
+        os.makedirs(output_dir, exist_ok=True)
 
-        # Header
-        c.setFont("Helvetica-Bold", 20)
-        c.drawString(50, height - 50, "SMART HRMS - MONTHLY PAYSLIP")
-        
-        c.setFont("Helvetica", 12)
-        c.drawString(50, height - 80, f"Employee: {salary_data['name']} ({salary_data['emp_code']})")
-        c.drawString(50, height - 100, f"Department: {salary_data['dept']} | Role: {salary_data['role']}")
-        c.drawString(400, height - 80, f"Period: {salary_data['month_year']}")
-
-        # Line
-        c.line(50, height - 120, 550, height - 120)
-
-        # Earnings Table
-        y = height - 150
-        c.drawString(50, y, "EARNINGS")
-        c.drawString(300, y, "DEDUCTIONS")
-        y -= 20
-        
-        c.setFont("Helvetica", 10)
-        # Left Side (Earnings)
-        c.drawString(50, y, f"Base Salary: {salary_data['base_salary']}")
-        c.drawString(50, y-20, f"Payable Days: {salary_data['present_days'] + salary_data['leaves']}")
-        c.drawString(50, y-40, f"Performance Bonus: {salary_data['bonus']}")
-        
-        # Right Side (Deductions)
-        c.drawString(300, y, f"Provident Fund (PF): {salary_data['pf']}")
-        c.drawString(300, y-20, f"Professional Tax: {salary_data['tax']}")
+        jobs = [(data, payslip_filename(data, output_dir)) for data in payroll]
+        chunks = [jobs[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(jobs), BATCH_CHUNK_SIZE)]
+        by_code = {data['emp_code']: data for data in payroll}
 
-        # Total
-        c.setFont("Helvetica-Bold", 14)
-        c.setFillColor(colors.darkblue)
-        c.drawString(50, y-80, f"NET PAYABLE SALARY: INR {salary_data['net_salary']}")
+        rendered, failed = [], []
+        output_path = output_dir
+        if output_format == "merged":
+            output_path = os.path.join(output_dir, f"payslips_{year}-{month:02d}.pdf")
+            PayslipRenderer().write_merged(payroll, output_path)
+            rendered = [(data['emp_code'], output_path) for data in payroll]
+            if progress:
+                progress(len(rendered), len(jobs))
 
-        c.save()
-        logger.info(f"Payslip generated: {filename}")
-        return filename
+        elif output_format == "zip":
+            output_path = os.path.join(output_dir, f"payslips_{year}-{month:02d}.zip")
+            # PDFs are already compressed; stored entries keep the ZIP write cheap
+            with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_STORED) as archive, \
+                    ProcessPoolExecutor(max_workers=workers) as pool:
+                for future in as_completed([pool.submit(_render_chunk_bytes, chunk) for chunk in chunks]):
+                    done, errors = future.result()
+                    for emp_code, name, pdf_bytes in done:
+                        archive.writestr(name, pdf_bytes)
+                        rendered.append((emp_code, output_path))
+                    failed.extend(errors)
+                    if progress:
+                        progress(len(rendered) + len(failed), len(jobs))
 
-        """Simple method to add a leave record manually."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO employee_leaves (emp_code, leave_date, leave_type, status)
-                VALUES (?, ?, ?, 'Approved')
-            """, (emp_code, leave_date, leave_type))
-            conn.commit()
-            return True, "Leave Added Successfully"
-        except sqlite3.IntegrityError:
-            return False, "Leave already exists for this date"
-        except Exception as e:
-            return False, str(e)
-        finally:
-            conn.close()
\ No newline at end of file
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for future in as_completed([pool.submit(_render_chunk, chunk) for chunk in chunks]):
+                    done, errors = future.result()
+                    rendered.extend(done)
+                    failed.extend(errors)
+                    if progress:
+                        progress(len(rendered) + len(failed), len(jobs))
+
+        for emp_code, error in failed:
+            logger.error(f"Payslip Render Error ({emp_code}): {error}")
+
+        month_year_txt = f"{month}-{year}"  # Same key as mark_as_paid
+        self.model.record_slip_paths(month_year_txt, [
+            (code, by_code[code]['present_days'], by_code[code]['net_salary'], path)
+            for code, path in rendered
+        ])
+
+        seconds = time.perf_counter() - start
+        summary = {
+            "count": len(rendered),
+            "failed": len(failed),
+            "seconds": round(seconds, 2),
+            "slips_per_sec": round(len(rendered) / seconds, 1) if seconds else 0.0,
+            "output_dir": output_dir,
+            "output_path": output_path,
+        }
+        logger.info(f"Payslip batch {month_year_txt}: {summary}")
+        return summary
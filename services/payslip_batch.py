@@ -0,0 +1,41 @@
+"""
+Month-end payslip run from the command line.
+
+    python -m services.payslip_batch --month 1 --year 2025
+    python -m services.payslip_batch --month 1 --year 2025 --workers 8 --out /srv/payslips/2025-01
+    python -m services.payslip_batch --month 1 --year 2025 --format merged   # one multi-page PDF
+    python -m services.payslip_batch --month 1 --year 2025 --format zip      # one ZIP of PDFs
+"""
+import argparse
+import logging
+import sys
+
+from services.payroll_service import PayrollService
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate payslips for all active employees.")
+    parser.add_argument("--month", type=int, required=True)
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--out", default=None, help="Output directory (default: payslips/<YYYY-MM>)")
+    parser.add_argument("--format", dest="output_format", default="files", choices=["files", "zip", "merged"])
+    args = parser.parse_args()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} payslips", end="", flush=True)
+
+    summary = PayrollService().generate_payslips_batch(
+        args.month, args.year, output_dir=args.out, workers=args.workers, progress=progress,
+        output_format=args.output_format,
+    )
+    print()
+    print(f"{summary['count']} payslips in {summary['seconds']}s "
+          f"({summary['slips_per_sec']} slips/sec), {summary['failed']} failed -> {summary['output_path']}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Template-cached payslip renderer.
+
+The static part of the payslip (title, rule line, section titles, field
+labels) is kept apart from the per-employee values. In multi-page output
+it is drawn once as a ReportLab form XObject that every page references;
+single-page files draw it inline (an XObject costs more than it saves there).
+Label widths are measured once, so values land exactly where the legacy
+single-string layout put them.
+
+Outputs:
+    render_file(data, path)        one payslip per PDF
+    render_bytes(data)             one payslip as PDF bytes (ZIP output)
+    write_merged(payroll, path)    N payslips as pages of one PDF (form stored once)
+"""
+import io
+import os
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+PAYSLIP_DIR = "payslips"
+FORM_NAME = "payslip_static"
+WIDTH, HEIGHT = letter
+
+# (label, font, size, x, y) -> value is drawn right after the label
+_LABELS = {
+    "employee": ("Employee: ", "Helvetica", 12, 50, HEIGHT - 80),
+    "department": ("Department: ", "Helvetica", 12, 50, HEIGHT - 100),
+    "period": ("Period: ", "Helvetica", 12, 400, HEIGHT - 80),
+    "base": ("Base Salary: ", "Helvetica", 10, 50, HEIGHT - 170),
+    "payable": ("Payable Days: ", "Helvetica", 10, 50, HEIGHT - 190),
+    "bonus": ("Performance Bonus: ", "Helvetica", 10, 50, HEIGHT - 210),
+    "pf": ("Provident Fund (PF): ", "Helvetica", 10, 300, HEIGHT - 170),
+    "tax": ("Professional Tax: ", "Helvetica", 10, 300, HEIGHT - 190),
+    "net": ("NET PAYABLE SALARY: INR ", "Helvetica-Bold", 14, 50, HEIGHT - 250),
+}
+# Value x-offsets, measured once at import
+_VALUE_X = {key: x + stringWidth(label, font, size) for key, (label, font, size, x, _) in _LABELS.items()}
+
+
+def payslip_filename(salary_data, directory=PAYSLIP_DIR):
+    return os.path.join(directory, f"Payslip_{salary_data['emp_code']}_{salary_data['month_year'].replace(' ', '_')}.pdf")
+
+
+def payslip_values(salary_data):
+    """Per-employee text for each template slot."""
+    return {
+        "employee": f"{salary_data['name']} ({salary_data['emp_code']})",
+        "department": f"{salary_data['dept']} | Role: {salary_data['role']}",
+        "period": f"{salary_data['month_year']}",
+        "base": f"{salary_data['base_salary']}",
+        "payable": f"{salary_data['present_days'] + salary_data['leaves']}",
+        "bonus": f"{salary_data['bonus']}",
+        "pf": f"{salary_data['pf']}",
+        "tax": f"{salary_data['tax']}",
+        "net": f"{salary_data['net_salary']}",
+    }
+
+
+class PayslipRenderer:
+    def _draw_static(self, c):
+        c.setFont("Helvetica-Bold", 20)
+        c.drawString(50, HEIGHT - 50, "SMART HRMS - MONTHLY PAYSLIP")
+        c.line(50, HEIGHT - 120, 550, HEIGHT - 120)
+        c.setFont("Helvetica", 12)
+        c.drawString(50, HEIGHT - 150, "EARNINGS")
+        c.drawString(300, HEIGHT - 150, "DEDUCTIONS")
+        for key, (label, font, size, x, y) in _LABELS.items():
+            if key == "net":
+                c.setFillColor(colors.darkblue)
+            c.setFont(font, size)
+            c.drawString(x, y, label)
+        c.setFillColor(colors.black)
+
+    def _define_template(self, c):
+        """Static layout as a form XObject (once per document)."""
+        c.beginForm(FORM_NAME)
+        self._draw_static(c)
+        c.endForm()
+
+    def _stamp(self, c, salary_data, use_form=True):
+        """One page: static layer + per-employee values."""
+        if use_form:
+            c.doForm(FORM_NAME)
+        else:
+            self._draw_static(c)
+        current_font = None
+        for key, value in payslip_values(salary_data).items():
+            _, font, size, _, y = _LABELS[key]
+            if key == "net":
+                c.setFillColor(colors.darkblue)
+            if (font, size) != current_font:
+                c.setFont(font, size)
+                current_font = (font, size)
+            c.drawString(_VALUE_X[key], y, value)
+        c.showPage()
+
+    def _render_document(self, target, payroll):
+        c = canvas.Canvas(target, pagesize=letter)
+        # A form XObject only pays off when several pages share it; a
+        # single-page file draws the static layer inline instead.
+        use_form = len(payroll) > 1
+        if use_form:
+            self._define_template(c)
+        for salary_data in payroll:
+            self._stamp(c, salary_data, use_form)
+        c.save()
+
+    def render_file(self, salary_data, filename):
+        self._render_document(filename, [salary_data])
+        return filename
+
+    def render_bytes(self, salary_data):
+        buffer = io.BytesIO()
+        self._render_document(buffer, [salary_data])
+        return buffer.getvalue()
+
+    def write_merged(self, payroll, filename):
+        """All payslips as pages of one PDF; the template is stored once."""
+        self._render_document(filename, payroll)
+        return filename
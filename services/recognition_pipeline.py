@@ -0,0 +1,363 @@
+"""
+Optional multi-process recognition pipeline (RECOGNITION_MODE=pipeline).
+
+    capture --detect ring--> detect --slot index--> encode --> match --> results queue (UI)
+       \\--display ring--> UI
+
+Each stage is its own process, so dlib / NumPy work no longer competes with Tk
+for the GIL. Frames live in multiprocessing.shared_memory rings; queues only
+carry slot indices, face boxes, 128-d encodings and timestamps. When every
+detect slot is busy the capture stage drops the frame instead of queueing it.
+
+    python -m services.recognition_pipeline --source 0 --seconds 15   # fps / latency report
+"""
+import argparse
+import logging
+import queue
+import time
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing import get_context, shared_memory
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAME_SIZE = (640, 480)     # (width, height) every frame is normalized to
+DETECT_SLOTS = 3            # frames in flight between capture and encode
+DISPLAY_SLOTS = 3           # capture writes one slot while the UI reads another
+DETECT_SCALE = 0.25
+JOIN_TIMEOUT = 2.0
+
+# (stage name, start timestamp key, end timestamp key) reported by PipelineStats
+STAGES = (
+    ("queue", "captured", "detect_start"),
+    ("detect", "detect_start", "detect_end"),
+    ("encode", "encode_start", "encode_end"),
+    ("match", "match_start", "match_end"),
+    ("end_to_end", "captured", "received"),
+)
+
+
+class SharedFrameRing:
+    """Fixed number of uint8 frames in one shared memory block."""
+
+    def __init__(self, slots, shape, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        size = slots * int(np.prod(self.shape))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False  # Spawned stages share the owner's resource tracker; only the owner unlinks
+        self.frames = np.ndarray((slots, *self.shape), dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def spec(self):
+        """Picklable handle for attach()."""
+        return self.slots, self.shape, self.shm.name
+
+    @classmethod
+    def attach(cls, spec):
+        slots, shape, name = spec
+        return cls(slots, shape, name=name)
+
+    def close(self):
+        del self.frames  # Views must go before the mapping is closed
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _stage_setup():
+    from utils.logger import setup_logging
+    setup_logging()
+
+
+def _small_rgb(frame, scale):
+    small = cv2.resize(frame, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+
+def _capture_stage(source, display_spec, detect_spec, latest, display_lock, captured,
+                   free_q, detect_q, result_q, stop):
+    _stage_setup()
+    display, ring = SharedFrameRing.attach(display_spec), SharedFrameRing.attach(detect_spec)
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened() and source == 0:
+        cap = cv2.VideoCapture(1)
+    if not cap.isOpened():
+        result_q.put(("error", "capture", "No Camera Found"))
+        return
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_SIZE[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_SIZE[1])
+
+    seq, write = 0, 0
+    try:
+        while not stop.is_set():
+            ok, frame = cap.read()
+            if not ok:
+                if isinstance(source, str):
+                    break  # End of a video file
+                time.sleep(0.01)
+                continue
+            now = time.monotonic()
+            if frame.shape[1::-1] != FRAME_SIZE:
+                frame = cv2.resize(frame, FRAME_SIZE, interpolation=cv2.INTER_AREA)
+
+            # Mirror straight into the display slot, then publish it
+            cv2.flip(frame, 1, dst=display.frames[write])
+            with display_lock:
+                latest.value = write
+            captured.value += 1
+
+            try:
+                idx = free_q.get_nowait()
+            except queue.Empty:
+                pass  # Detection busy: drop this frame for recognition
+            else:
+                np.copyto(ring.frames[idx], display.frames[write])
+                seq += 1
+                detect_q.put((idx, seq, {"captured": now}))
+            write = (write + 1) % display.slots
+    finally:
+        cap.release()
+        display.close()
+        ring.close()
+
+
+def _detect_stage(detect_spec, scale, detect_q, encode_q, stop):
+    _stage_setup()
+    import face_recognition
+    ring = SharedFrameRing.attach(detect_spec)
+    try:
+        while not stop.is_set():
+            try:
+                idx, seq, times = detect_q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            times["detect_start"] = time.monotonic()
+            locations = face_recognition.face_locations(_small_rgb(ring.frames[idx], scale))
+            times["detect_end"] = time.monotonic()
+            encode_q.put((idx, seq, times, locations))
+    finally:
+        ring.close()
+
+
+def _encode_stage(detect_spec, scale, encode_q, match_q, free_q, stop):
+    _stage_setup()
+    import face_recognition
+    ring = SharedFrameRing.attach(detect_spec)
+    try:
+        while not stop.is_set():
+            try:
+                idx, seq, times, locations = encode_q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            times["encode_start"] = time.monotonic()
+            encodings = []
+            if locations:
+                encodings = face_recognition.face_encodings(_small_rgb(ring.frames[idx], scale), locations)
+            free_q.put(idx)  # Slot can be refilled by capture
+            boxes = [tuple(int(v / scale) for v in location) for location in locations]
+            times["encode_end"] = time.monotonic()
+            match_q.put((seq, times, boxes, [np.asarray(e, dtype=np.float32) for e in encodings]))
+    finally:
+        ring.close()
+
+
+def _match_stage(match_q, control_q, result_q, tolerance, stop):
+    _stage_setup()
+    from models.attendance_model import AttendanceModel
+    from services.face_gallery import FaceGallery
+    from services.face_index import build_matcher
+
+    matcher = build_matcher(*FaceGallery(AttendanceModel()).load())
+    while not stop.is_set():
+        # Registrations / deactivations forwarded from the UI process
+        while True:
+            try:
+                event, emp_code, encodings = control_q.get_nowait()
+            except queue.Empty:
+                break
+            matcher = matcher.without([emp_code])
+            if event != "deactivated":
+                matcher = matcher.with_added(encodings, [emp_code] * len(encodings))
+
+        try:
+            seq, times, boxes, encodings = match_q.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        times["match_start"] = time.monotonic()
+        matches = matcher.match(encodings, tolerance=tolerance)
+        times["match_end"] = time.monotonic()
+        faces = [(box, emp_code) for box, (emp_code, _) in zip(boxes, matches)]
+        result_q.put(("result", seq, times, faces))
+
+
+class PipelineStats:
+    """Rolling per-stage latency (ms) and frame rates, computed in the UI process."""
+
+    def __init__(self, window=100):
+        self.samples = {name: deque(maxlen=window) for name, _, _ in STAGES}
+        self.results = deque(maxlen=window)   # receive times
+        self._captured = deque(maxlen=window)  # (time, captured counter)
+
+    def add(self, times):
+        for name, start, end in STAGES:
+            if start in times and end in times:
+                self.samples[name].append((times[end] - times[start]) * 1000.0)
+        self.results.append(times["received"])
+
+    def sample_capture(self, count, now):
+        self._captured.append((now, count))
+
+    @staticmethod
+    def _rate(points):
+        if len(points) < 2 or points[-1] == points[0]:
+            return 0.0
+        return (len(points) - 1) / (points[-1] - points[0])
+
+    def summary(self):
+        result = {
+            "processed_fps": round(self._rate(list(self.results)), 1),
+            "capture_fps": 0.0,
+        }
+        if len(self._captured) >= 2:
+            (t0, c0), (t1, c1) = self._captured[0], self._captured[-1]
+            result["capture_fps"] = round((c1 - c0) / (t1 - t0), 1) if t1 > t0 else 0.0
+        for name, values in self.samples.items():
+            result[f"{name}_ms"] = round(sum(values) / len(values), 1) if values else None
+        return result
+
+    def text(self):
+        s = self.summary()
+        stages = " ".join(f"{name} {s[name + '_ms']}" for name, _, _ in STAGES if s[name + "_ms"] is not None)
+        return f"capture {s['capture_fps']} fps | recognized {s['processed_fps']} fps | ms: {stages}"
+
+
+class RecognitionPipeline:
+    """Owns the rings, queues and stage processes; used from the Tk thread."""
+
+    def __init__(self, source=0, scale=DETECT_SCALE, tolerance=0.5):
+        self.source = source
+        self.scale = scale
+        self.tolerance = tolerance
+        self.stats = PipelineStats()
+        self.processes = []
+        self.display = None
+        self.ring = None
+
+    def start(self):
+        ctx = get_context("spawn")  # No forked Tk / dlib state in the children
+        shape = (FRAME_SIZE[1], FRAME_SIZE[0], 3)
+        self.display = SharedFrameRing(DISPLAY_SLOTS, shape)
+        self.ring = SharedFrameRing(DETECT_SLOTS, shape)
+
+        self.stop_event = ctx.Event()
+        self.latest = ctx.Value("i", -1, lock=False)
+        self.display_lock = ctx.Lock()
+        self.captured = ctx.Value("q", 0, lock=False)
+        # All kept on self: a queue collected in this process before a child unpickles it breaks the child
+        self.free_q, self.detect_q, self.encode_q, self.match_q = ctx.Queue(), ctx.Queue(), ctx.Queue(), ctx.Queue()
+        self.control_q, self.result_q = ctx.Queue(), ctx.Queue()
+        for idx in range(DETECT_SLOTS):
+            self.free_q.put(idx)
+
+        stages = (
+            ("capture", _capture_stage, (self.source, self.display.spec, self.ring.spec, self.latest,
+                                         self.display_lock, self.captured, self.free_q, self.detect_q,
+                                         self.result_q, self.stop_event)),
+            ("detect", _detect_stage, (self.ring.spec, self.scale, self.detect_q, self.encode_q,
+                                       self.stop_event)),
+            ("encode", _encode_stage, (self.ring.spec, self.scale, self.encode_q, self.match_q, self.free_q,
+                                       self.stop_event)),
+            ("match", _match_stage, (self.match_q, self.control_q, self.result_q, self.tolerance, self.stop_event)),
+        )
+        for name, target, args in stages:
+            process = ctx.Process(target=target, args=args, name=f"recognition-{name}", daemon=True)
+            process.start()
+            self.processes.append(process)
+        logger.info(f"Recognition pipeline started ({len(self.processes)} processes)")
+        return self
+
+    @contextmanager
+    def latest_view(self):
+        """
+        Newest mirrored camera frame as a view into shared memory (None before
+        the first one). Read it inside the block only: the slot is reused after.
+        """
+        with self.display_lock:
+            idx = self.latest.value
+            yield None if idx < 0 else self.display.frames[idx]
+
+    def poll_results(self):
+        """
+        Drains finished frames without blocking.
+        Returns (faces_per_frame, errors): faces are [((top, right, bottom, left), emp_code_or_None)].
+        """
+        now = time.monotonic()
+        self.stats.sample_capture(self.captured.value, now)
+        frames, errors = [], []
+        while True:
+            try:
+                message = self.result_q.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == "error":
+                errors.append(f"{message[1]}: {message[2]}")
+                continue
+            _, _, times, faces = message
+            times["received"] = now
+            self.stats.add(times)
+            frames.append(faces)
+        return frames, errors
+
+    def update_matcher(self, event, emp_code, encodings):
+        """Forwards an EmployeeModel change to the match process."""
+        self.control_q.put((event, emp_code, [np.asarray(e, dtype=np.float32) for e in encodings or []]))
+
+    def stop(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        for ring in (self.display, self.ring):
+            if ring is not None:
+                ring.close()
+        self.display = self.ring = None
+        logger.info(f"Recognition pipeline stopped: {self.stats.text()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the recognition pipeline headless and report fps / latency.")
+    parser.add_argument("--source", default="0", help="camera index or video file")
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--scale", type=float, default=DETECT_SCALE)
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    pipeline = RecognitionPipeline(source, scale=args.scale).start()
+    deadline = time.monotonic() + args.seconds
+    next_report = time.monotonic() + 1.0
+    try:
+        while time.monotonic() < deadline:
+            _, errors = pipeline.poll_results()
+            for error in errors:
+                logger.error(f"Pipeline error: {error}")
+            if time.monotonic() >= next_report:
+                print(pipeline.stats.text())
+                next_report += 1.0
+            time.sleep(0.03)
+    finally:
+        pipeline.stop()
+    print(pipeline.stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Adaptive scheduling for the kiosk recognition worker.
+
+Per frame the scheduler picks the cheapest action that keeps results current:
+    SKIP   - scene unchanged since the last processed frame; reuse results
+    TRACK  - only the known faces moved; follow them by template matching
+    DETECT - something new (or tracking lost): full HOG detect; faces are then
+             encoded only for new or decayed tracks (see face_tracker)
+The detection scale follows measured latency, and the worker blocks on a
+FrameSlot instead of polling.
+"""
+import logging
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from config.settings import FACE_DETECT_TARGET_MS, FACE_MOTION_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+SKIP, TRACK, DETECT = "skip", "track", "detect"
+
+
+class FrameSlot:
+    """
+    Latest-frame mailbox between the UI loop and the worker. put() replaces
+    any frame the worker has not taken yet (stale frames are dropped, never
+    queued); take() blocks until a frame arrives. Ownership passes with the
+    frame, so neither side copies it.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._closed = False
+
+    def put(self, frame):
+        with self._cond:
+            self._frame = frame
+            self._cond.notify()
+
+    def take(self, timeout=None):
+        """Next frame, or None on timeout / close."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame is not None or self._closed, timeout)
+            frame, self._frame = self._frame, None
+            return frame
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self._closed = False
+            self._frame = None
+
+
+class RecognitionScheduler:
+    """
+    Decides SKIP / TRACK / DETECT per frame and adapts the detection scale.
+    Not thread-safe: owned by the recognition worker.
+    faces: [((top, right, bottom, left), emp_code_or_None)] in full-frame pixels.
+    """
+    THUMB_WIDTH = 96         # motion check resolution
+    PIXEL_DELTA = 25         # grey-level change that counts as motion
+    TRACK_SCALE = 0.25       # template matching resolution
+    TRACK_MIN_SCORE = 0.6    # normalized correlation below this = track lost
+
+    def __init__(self, scale=0.25, min_scale=0.15, max_scale=0.5,
+                 target_latency=FACE_DETECT_TARGET_MS / 1000.0,
+                 motion_threshold=FACE_MOTION_THRESHOLD,
+                 idle_interval=1.0, refresh_interval=3.0):
+        self.scale = scale
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.target_latency = target_latency
+        self.motion_threshold = motion_threshold
+        self.idle_interval = idle_interval          # empty scene: re-detect at least this often
+        self.refresh_interval = refresh_interval    # faces present: full re-detect at least this often
+        self.latency = None                         # EWMA of detect+encode+match seconds
+        self.faces = []
+        self._patches = []
+        self._reference = None                      # thumbnail of the last processed frame
+        self._last_detect = 0.0
+        self.stats = {SKIP: 0, TRACK: 0, DETECT: 0}
+
+    # --- Planning ---
+    def _thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        size = (self.THUMB_WIDTH, max(1, h * self.THUMB_WIDTH // w))
+        return cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+
+    def _face_mask(self, shape, frame_width):
+        mask = np.zeros(shape, dtype=bool)
+        f = self.THUMB_WIDTH / frame_width
+        for (top, right, bottom, left), _ in self.faces:
+            mask[int(top * f):int(bottom * f) + 1, int(left * f):int(right * f) + 1] = True
+        return mask
+
+    def plan(self, frame, now=None):
+        now = time.monotonic() if now is None else now
+        thumb = self._thumbnail(frame)
+        action = self._decide(frame, thumb, now)
+        if action != SKIP:
+            self._reference = thumb
+        self.stats[action] += 1
+        return action
+
+    def _decide(self, frame, thumb, now):
+        if self._reference is None or self._reference.shape != thumb.shape:
+            return DETECT
+        since_detect = now - self._last_detect
+        changed = cv2.absdiff(thumb, self._reference) > self.PIXEL_DELTA
+
+        if not self.faces:
+            if changed.mean() > self.motion_threshold or since_detect > self.idle_interval:
+                return DETECT
+            return SKIP
+
+        if since_detect > self.refresh_interval:
+            return DETECT
+        in_faces = self._face_mask(thumb.shape, frame.shape[1])
+        outside = changed[~in_faces]
+        if outside.size and outside.mean() > self.motion_threshold:
+            return DETECT  # someone may have stepped in
+        inside = changed[in_faces]
+        if inside.size and inside.mean() > self.motion_threshold:
+            return TRACK
+        return SKIP
+
+    # --- Tracking ---
+    def _track_gray(self, frame):
+        small = cv2.resize(frame, (0, 0), fx=self.TRACK_SCALE, fy=self.TRACK_SCALE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def track(self, frame):
+        """Moves every face box by template matching. False if any face was lost."""
+        if self._patches is None:
+            return False
+        gray = self._track_gray(frame)
+        s = self.TRACK_SCALE
+        moved, patches = [], []
+        for ((top, right, bottom, left), emp_code), patch in zip(self.faces, self._patches):
+            ph, pw = patch.shape
+            pad = max(ph, pw) // 2
+            y0, x0 = max(0, int(top * s) - pad), max(0, int(left * s) - pad)
+            window = gray[y0:int(bottom * s) + pad, x0:int(right * s) + pad]
+            if window.shape[0] < ph or window.shape[1] < pw:
+                return False
+            _, score, _, (dx, dy) = cv2.minMaxLoc(cv2.matchTemplate(window, patch, cv2.TM_CCOEFF_NORMED))
+            if score < self.TRACK_MIN_SCORE:
+                return False
+            new_top, new_left = (y0 + dy) / s, (x0 + dx) / s
+            box = (int(new_top), int(new_left + (right - left)), int(new_top + (bottom - top)), int(new_left))
+            moved.append((box, emp_code))
+            patches.append(window[dy:dy + ph, dx:dx + pw].copy())
+        self.faces, self._patches = moved, patches
+        return True
+
+    # --- Detection feedback ---
+    def detected(self, frame, faces, latency, now=None):
+        """Stores a full detection result and adapts the scale to its latency."""
+        self._last_detect = time.monotonic() if now is None else now
+        self.faces = faces
+        gray = self._track_gray(frame)
+        s = self.TRACK_SCALE
+        self._patches = [
+            gray[max(0, int(top * s)):int(bottom * s), max(0, int(left * s)):int(right * s)].copy()
+            for (top, right, bottom, left), _ in faces
+        ]
+        if any(p.size == 0 for p in self._patches):
+            self._patches = None  # Too small to track; movement triggers a re-detect
+
+        self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        if self.latency > self.target_latency and self.scale > self.min_scale:
+            self.scale = max(self.min_scale, self.scale * 0.8)
+            logger.debug(f"Detection scale down to {self.scale:.2f} ({self.latency * 1000:.0f} ms)")
+        elif self.latency < self.target_latency / 2 and self.scale < self.max_scale:
+            self.scale = min(self.max_scale, self.scale * 1.15)
+            logger.debug(f"Detection scale up to {self.scale:.2f} ({self.latency * 1000:.0f} ms)")
@@ -0,0 +1,143 @@
+"""
+Streaming CSV exports (open directly in Excel / LibreOffice).
+
+    python -m services.report_export payroll --month 1 --year 2025 --out register_2025-01.csv
+    python -m services.report_export attendance --month 1 --year 2025 --out attendance_2025-01.csv
+
+Rows go from SQLite cursors (fetchmany) straight to the file, one employee
+chunk at a time, so memory stays flat whatever the headcount. Payroll figures
+come from PayrollService.iter_payroll (the calculate_salary formulas). Files
+are written next to the target and renamed into place when complete.
+"""
+import argparse
+import calendar
+import csv
+import logging
+import os
+import sys
+import time
+
+from models.attendance_model import AttendanceModel
+from services.payroll_service import PayrollService, month_bounds
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_DIR = "exports"
+
+PAYROLL_COLUMNS = (
+    ("emp_code", "Emp Code"), ("name", "Name"), ("dept", "Department"), ("role", "Role"),
+    ("base_salary", "Base Salary"), ("present_days", "Present Days"), ("leaves", "Approved Leaves"),
+    ("bonus", "Bonus"), ("pf", "PF"), ("tax", "Tax"), ("net_salary", "Net Salary"),
+)
+TOTAL_FIELDS = ("base_salary", "bonus", "pf", "tax", "net_salary")
+
+# Matrix cell per day: P = present, L = late, LV = approved leave, blank = absent
+MARKS = {"Present": "P", "Late": "L", "Leave": "LV"}
+
+
+def default_path(kind, month, year):
+    return os.path.join(EXPORT_DIR, f"{kind}_{year}-{month:02d}.csv")
+
+
+def _write_csv(path, header, rows, progress=None):
+    """Streams rows into path (utf-8 BOM so Excel picks the encoding). Returns the row count."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.part"
+    count = 0
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for chunk in rows:
+                writer.writerows(chunk)
+                count += len(chunk)
+                if progress:
+                    progress(count)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+
+def _payroll_rows(service, month, year, chunk_size):
+    totals = dict.fromkeys(TOTAL_FIELDS, 0.0)
+    for chunk in service.iter_payroll(month, year, chunk_size=chunk_size):
+        for data in chunk:
+            for field in TOTAL_FIELDS:
+                totals[field] += data[field]
+        yield [[data[field] for field, _ in PAYROLL_COLUMNS] for data in chunk]
+    yield [["TOTAL", "", "", ""] + [
+        round(totals[field], 2) if field in totals else "" for field, _ in PAYROLL_COLUMNS[4:]
+    ]]
+
+
+def _attendance_rows(model, month, year, chunk_size):
+    days = calendar.monthrange(year, month)[1]
+    for employees, marks in model.iter_month_attendance(*month_bounds(month, year), chunk_size=chunk_size):
+        rows = []
+        for emp_code, name, dept in employees:
+            cells = [""] * days
+            for day, status in marks.get(emp_code, ()):
+                mark = MARKS.get(status, "P")
+                index = int(day[8:10]) - 1
+                if not cells[index]:  # Attendance wins over a leave on the same day
+                    cells[index] = mark
+            present = sum(1 for c in cells if c in ("P", "L"))
+            rows.append([emp_code, name, dept or "", *cells, present,
+                         cells.count("L"), cells.count("LV"), days - present - cells.count("LV")])
+        yield rows
+
+
+def export_payroll_register(month, year, path=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Payroll register CSV for every active employee plus a TOTAL row.
+    progress: optional callback(rows_written). Returns summary dict: rows, seconds, path.
+    """
+    path = path or default_path("payroll_register", month, year)
+    start = time.perf_counter()
+    header = [title for _, title in PAYROLL_COLUMNS]
+    count = _write_csv(path, header, _payroll_rows(PayrollService(), month, year, chunk_size), progress) - 1
+    summary = {"rows": count, "seconds": round(time.perf_counter() - start, 2), "path": path}
+    logger.info(f"Payroll register {month}-{year} exported: {summary}")
+    return summary
+
+
+def export_attendance_matrix(month, year, path=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Employees x days CSV (P / L / LV / blank) with per-employee totals.
+    progress: optional callback(rows_written). Returns summary dict: rows, seconds, path.
+    """
+    path = path or default_path("attendance", month, year)
+    start = time.perf_counter()
+    days = calendar.monthrange(year, month)[1]
+    header = ["Emp Code", "Name", "Department", *(str(d) for d in range(1, days + 1)),
+              "Present", "Late", "Leaves", "Absent"]
+    count = _write_csv(path, header, _attendance_rows(AttendanceModel(), month, year, chunk_size), progress)
+    summary = {"rows": count, "seconds": round(time.perf_counter() - start, 2), "path": path}
+    logger.info(f"Attendance matrix {month}-{year} exported: {summary}")
+    return summary
+
+
+EXPORTS = {"payroll": export_payroll_register, "attendance": export_attendance_matrix}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a monthly payroll register or attendance matrix to CSV.")
+    parser.add_argument("report", choices=sorted(EXPORTS))
+    parser.add_argument("--month", type=int, required=True)
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--out", default=None, help="Output file (default: exports/<report>_<YYYY-MM>.csv)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Employees per fetch")
+    args = parser.parse_args()
+
+    summary = EXPORTS[args.report](args.month, args.year, path=args.out, chunk_size=args.chunk_size)
+    print(f"{summary['rows']} rows in {summary['seconds']}s -> {summary['path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
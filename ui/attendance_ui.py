@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
 import cv2
+import numpy as np
 from PIL import Image, ImageTk
 import logging
 import time
@@ -9,11 +10,30 @@ from datetime import datetime
 
 from ui.styles import *
 from models.attendance_model import AttendanceModel
-from services.face_service import process_face_recognition
+from models.employee_model import EmployeeModel
+from models.reference_cache import reference_cache
+from services.face_service import recognize_tracked
+from services.face_tracker import FaceTracker
+from services.face_matcher import FaceMatcher
+from services.face_index import build_matcher
+from services.face_gallery import FaceGallery
+from services.recognition_scheduler import FrameSlot, RecognitionScheduler, SKIP, TRACK
+from services.recognition_pipeline import RecognitionPipeline
 from services.attendance_service import mark_attendance as attendance_mark
+from config.settings import RECOGNITION_MODE, KIOSK_STATS_OVERLAY
 
 logger = logging.getLogger(__name__)
 
+
+def _bgr(hex_color):
+    return tuple(int(hex_color.lstrip("#")[i:i+2], 16) for i in (4, 2, 0))
+
+# Box colours, parsed once
+BOX_UNKNOWN = _bgr(ERROR_COLOR)
+BOX_MARKED = _bgr(ACCENT_COLOR)
+BOX_NEW = _bgr(SUCCESS_COLOR)
+
+
 class AttendanceFrame(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=BACKGROUND_MAIN)
@@ -25,24 +45,40 @@ class AttendanceFrame(tk.Frame):
         self.is_running = False
         
         # UI State
-        self.unknown_counter = 0
-        self.last_results = [] # Stores latest face boxes [(top, right, bottom, left), name, color]
+        self.unknown_since = None  # monotonic time an unknown face was first on screen (None = none now)
+        self.last_results = [] # Stores latest face boxes [(top, right, bottom, left), name, bgr]
+
+        # Render State (one PhotoImage / canvas item, refilled in place every frame)
+        self._display = None
+        self._photo = None
+        self._image_item = None
+        self._overlay_item = None
+        self._render_stats = None
         
-        # Threading State
-        self.thread_lock = threading.Lock()
-        self.current_frame_to_process = None
-        self.is_processing = False
+        # Threading State (worker blocks on the slot; the scheduler decides how much work a frame gets)
+        self.frame_slot = FrameSlot()
+        self.scheduler = RecognitionScheduler()
+        self.tracker = FaceTracker()
         self.stop_event = threading.Event()
 
+        # RECOGNITION_MODE=pipeline: capture / detect / encode / match run as separate processes
+        self.pipeline = None
+        self._next_stats_log = 0.0
+
         # Debouncing
         self.last_shown_at = {} 
         self.COOLDOWN_SECONDS = 5.0
+        self.UNKNOWN_SECONDS = 1.5  # Unknown face on screen this long -> offer manual check-in
 
-        # RAM Cache
-        self.known_face_encodings = []
-        self.known_face_ids = []
+        # RAM Cache (copy-on-write: updates build a new matcher and swap the reference,
+        # so recognition_worker always holds one consistent snapshot)
+        self.matcher = FaceMatcher([], [])
+        self.matcher_lock = threading.Lock()
         self.marked_today = set()
 
+        # Hot-reload: registrations / (de)activations reach the matcher without a reload
+        EmployeeModel.add_listener(self.on_employee_change)
+
         self._init_ui()
         logger.info("Attendance UI Initialized (Threaded)")
 
@@ -118,9 +154,17 @@ class AttendanceFrame(tk.Frame):
         self.lbl_status.config(text="Loading Data...", fg="#f39c12")
         self.update_idletasks()
 
+        if RECOGNITION_MODE == "pipeline":
+            self._start_pipeline()
+            return
+
         try:
-            self.known_face_encodings, self.known_face_ids = self.model.get_all_encodings()
+            known_encodings, known_ids = FaceGallery(self.model).load()
+            matcher = build_matcher(known_encodings, known_ids)
+            with self.matcher_lock:
+                self.matcher = matcher
             self.marked_today = self.model.get_todays_attendance()
+            reference_cache.preload_employees()  # Marks then need only the INSERT
         except Exception as e:
             logger.error(f"DB Error: {e}")
             return
@@ -132,6 +176,9 @@ class AttendanceFrame(tk.Frame):
 
             self.is_running = True
             self.stop_event.clear()
+            self.frame_slot.reopen()
+            self.scheduler = RecognitionScheduler()
+            self.tracker = FaceTracker()
             
             # Start Background Thread for Recognition
             self.process_thread = threading.Thread(target=self.recognition_worker, daemon=True)
@@ -144,101 +191,196 @@ class AttendanceFrame(tk.Frame):
             logger.error(f"Start Error: {e}")
             self.lbl_status.config(text="Camera Error", fg=ERROR_COLOR)
 
+    def _start_pipeline(self):
+        try:
+            self.marked_today = self.model.get_todays_attendance()
+            reference_cache.preload_employees()
+            self.pipeline = RecognitionPipeline().start()  # The match process loads the gallery itself
+            self.is_running = True
+            self._next_stats_log = time.monotonic() + 10.0
+            self.update_frame_loop()
+            self.lbl_status.config(text="Scanning Active", fg=SUCCESS_COLOR)
+        except Exception as e:
+            logger.error(f"Pipeline Start Error: {e}")
+            self.lbl_status.config(text="Camera Error", fg=ERROR_COLOR)
+
+    def on_employee_change(self, event, emp_code, encodings):
+        """EmployeeModel listener: incremental add/remove on the live matcher."""
+        if self.pipeline is not None:
+            self.pipeline.update_matcher(event, emp_code, encodings)
+            logger.info(f"Matcher update sent to pipeline: {event} {emp_code}")
+            return
+        with self.matcher_lock:
+            if event == "deactivated":
+                self.matcher = self.matcher.without([emp_code])
+            else:
+                # 'added' / 'reactivated': drop stale rows first so samples are never doubled
+                current = self.matcher.without([emp_code])
+                self.matcher = current.with_added(encodings, [emp_code] * len(encodings))
+        logger.info(f"Matcher updated: {event} {emp_code} ({len(self.matcher)} samples)")
+
     def recognition_worker(self):
         """Background Thread: Sirf Recognition karega"""
+        scheduler, tracker = self.scheduler, self.tracker
         while not self.stop_event.is_set():
-            frame_copy = None
-            
-            with self.thread_lock:
-                if self.current_frame_to_process is not None:
-                    frame_copy = self.current_frame_to_process.copy()
-                    self.current_frame_to_process = None # Clear buffer
-            
-            if frame_copy is None:
-                time.sleep(0.05)
+            frame = self.frame_slot.take(timeout=0.5)  # Wakes on a new frame or stop
+            if frame is None:
                 continue
 
             try:
-                # 2. Heavy Processing
-                small_frame = cv2.resize(frame_copy, (0, 0), fx=0.25, fy=0.25)
-                rgb_small = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
-
-                results = process_face_recognition(
-                    rgb_small, self.known_face_encodings, self.known_face_ids
-                )
-
-                # 3. Process Results
-                processed_results = []
-                found_unknown = False
-                
-                for (top, right, bottom, left), emp_code in results:
-                    # Scale coordinates back
-                    coords = (top*4, right*4, bottom*4, left*4)
-                    
-                    if emp_code is None:
-                        processed_results.append((coords, "Unknown", ERROR_COLOR))
-                        found_unknown = True
-                    else:
-                        color = ACCENT_COLOR if emp_code in self.marked_today else SUCCESS_COLOR
-                        processed_results.append((coords, emp_code, color))
-                        
-                        # Trigger UI update in Main Thread
-                        self.after(0, lambda code=emp_code: self.handle_recognition(code))
-
-
-                if found_unknown:
-                    self.unknown_counter += 1
-                else:
-                    self.unknown_counter = 0
-
-                # 4. Update Shared State for Drawing
-                self.last_results = processed_results
+                # 1. Cheap checks first: unchanged scene / known faces that only moved
+                action = scheduler.plan(frame)
+                if action == SKIP:
+                    continue
+                if action == TRACK and scheduler.track(frame):
+                    for box, track in scheduler.faces:
+                        track.box = box
+                    self._publish_results([(box, track.emp_code) for box, track in scheduler.faces])
+                    continue
+
+                # 2. Heavy Processing (at the latency-adapted scale)
+                started = time.perf_counter()
+                scale = scheduler.scale
+                small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+                matcher = self.matcher  # Snapshot; a concurrent swap won't affect this frame
+                now = time.monotonic()
+                # Only new tracks / tracks with decayed confidence get encoded
+                visible, identified = recognize_tracked(small_frame, matcher, tracker, scale, now)
+
+                scheduler.detected(frame, [(track.box, track) for track in visible],
+                                   time.perf_counter() - started, now)
+                self._publish_results([(t.box, t.emp_code) for t in visible],
+                                      [t.emp_code for t in identified])
 
             except Exception as e:
                 logger.error(f"Worker Error: {e}")
 
+    def _publish_results(self, faces, identified=None):
+        """
+        faces: [(box, emp_code_or_None)] for drawing. identified: emp codes
+        (re)recognized in this detection round; only those trigger attendance.
+        Tracked rounds still count towards how long an unknown face has been on screen.
+        """
+        processed_results = []
+        for box, emp_code in faces:
+            if emp_code is None:
+                processed_results.append((box, "Unknown", BOX_UNKNOWN))
+            else:
+                color = BOX_MARKED if emp_code in self.marked_today else BOX_NEW
+                processed_results.append((box, emp_code, color))
+
+        if identified is not None:
+            for emp_code in identified:
+                if emp_code is not None:
+                    # Trigger UI update in Main Thread
+                    self.after(0, lambda code=emp_code: self.handle_recognition(code))
+
+        if any(emp_code is None for _, emp_code in faces):
+            if self.unknown_since is None:
+                self.unknown_since = time.monotonic()
+        else:
+            self.unknown_since = None
+
+        # Update Shared State for Drawing
+        self.last_results = processed_results
+
     def update_frame_loop(self):
         """Main Thread: Sirf Video dikhayega"""
         if not self.is_running: return
 
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.flip(frame, 1)
-            
-            # Pass frame to worker thread (if free)
-            with self.thread_lock:
-                self.current_frame_to_process = frame
+        started = time.perf_counter()
+        if self.pipeline is not None:
+            self._poll_pipeline()
+            with self.pipeline.latest_view() as frame:
+                if frame is not None:
+                    self._render(frame)
+        else:
+            ret, frame = self.cap.read()
+            if ret:
+                frame = cv2.flip(frame, 1)
+                # Both sides only read the frame (boxes go on the display buffer), so no copy
+                self.frame_slot.put(frame)
+                self._render(frame)
+
+        unknown_since = self.unknown_since
+        if unknown_since is not None and time.monotonic() - unknown_since > self.UNKNOWN_SECONDS:
+            self.btn_manual.pack(side="right", padx=10)
+        else:
+            self.btn_manual.pack_forget()
 
-            # Draw Boxes (From last known results)
-            for (top, right, bottom, left), name, color in self.last_results:
-                c = tuple(int(color.lstrip("#")[i:i+2], 16) for i in (4, 2, 0))
-                cv2.rectangle(frame, (left, top), (right, bottom), c, 2)
+        if KIOSK_STATS_OVERLAY:
+            self._update_overlay(time.perf_counter() - started)
 
-            if self.unknown_counter > 10:
-                self.btn_manual.pack(side="right", padx=10)
-            else:
-                self.btn_manual.pack_forget()
+        self.after(30, self.update_frame_loop) # Keep running smoothly
 
-            # Render
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Resize logic
-            cw = self.canvas.winfo_width()
-            ch = self.canvas.winfo_height()
-            if cw > 10 and ch > 10:
-                img_pil = Image.fromarray(rgb_frame)
-                
-                # Aspect Ratio Resize
-                w, h = img_pil.size
-                scale = min(cw/w, ch/h)
-                new_w, new_h = int(w*scale), int(h*scale)
-                img_pil = img_pil.resize((new_w, new_h), Image.Resampling.LANCZOS)
-                
-                imgtk = ImageTk.PhotoImage(image=img_pil)
-                self.canvas.create_image(cw//2, ch//2, anchor="center", image=imgtk)
-                self.canvas.imgtk = imgtk
+    def _render(self, frame):
+        """Fits the BGR frame to the canvas and draws the latest boxes on the scaled copy."""
+        cw = self.canvas.winfo_width()
+        ch = self.canvas.winfo_height()
+        if cw <= 10 or ch <= 10:
+            return
 
-        self.after(30, self.update_frame_loop) # Keep running smoothly
+        # Aspect Ratio Resize (buffers are only reallocated when the canvas size changes)
+        h, w = frame.shape[:2]
+        scale = min(cw/w, ch/h)
+        size = (max(1, int(w*scale)), max(1, int(h*scale)))
+        if self._display is None or self._display.shape[1::-1] != size:
+            self._display = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._photo = ImageTk.PhotoImage("RGB", size)
+            if self._image_item is None:
+                self._image_item = self.canvas.create_image(0, 0, anchor="center", image=self._photo)
+            else:
+                self.canvas.itemconfig(self._image_item, image=self._photo)
+        self.canvas.coords(self._image_item, cw//2, ch//2)
+
+        display = self._display
+        cv2.resize(frame, size, dst=display, interpolation=cv2.INTER_AREA)
+
+        # Draw Boxes (From last known results, in display coordinates)
+        for (top, right, bottom, left), name, color in self.last_results:
+            cv2.rectangle(display, (int(left*scale), int(top*scale)), (int(right*scale), int(bottom*scale)), color, 2)
+
+        cv2.cvtColor(display, cv2.COLOR_BGR2RGB, dst=display)
+        self._photo.paste(Image.fromarray(display))
+
+    def _update_overlay(self, work_seconds):
+        """FPS / CPU readout (KIOSK_STATS_OVERLAY), refreshed twice a second."""
+        now, cpu = time.perf_counter(), time.process_time()
+        stats = self._render_stats
+        if stats is None:
+            self._render_stats = {"since": now, "cpu": cpu, "frames": 0, "work": 0.0}
+            self._overlay_item = self.canvas.create_text(8, 8, anchor="nw", fill="#f1c40f",
+                                                         font=("Consolas", 10), text="")
+            return
+        stats["frames"] += 1
+        stats["work"] += work_seconds
+        elapsed = now - stats["since"]
+        if elapsed < 0.5:
+            return
+        text = (f"UI {stats['frames'] / elapsed:.1f} fps | "
+                f"frame {stats['work'] / stats['frames'] * 1000:.1f} ms | "
+                f"CPU {(cpu - stats['cpu']) / elapsed * 100:.0f}%")
+        if self.pipeline is not None:
+            text += f"\n{self.pipeline.stats.text()}"
+        self.canvas.itemconfig(self._overlay_item, text=text)
+        self.canvas.tag_raise(self._overlay_item)
+        self._render_stats = {"since": now, "cpu": cpu, "frames": 0, "work": 0.0}
+
+    def _poll_pipeline(self):
+        """Applies finished pipeline results and logs the pipeline stats now and then."""
+        frames, errors = self.pipeline.poll_results()
+        for error in errors:
+            logger.error(f"Pipeline Error: {error}")
+            self.lbl_status.config(text="Camera Error", fg=ERROR_COLOR)
+        for faces in frames:
+            # Every pipeline result is a full recognition; handle_recognition debounces repeats
+            self._publish_results(faces, [emp_code for _, emp_code in faces])
+
+        now = time.monotonic()
+        if now >= self._next_stats_log:
+            logger.info(f"Recognition pipeline: {self.pipeline.stats.text()}")
+            self._next_stats_log = now + 10.0
 
     def handle_recognition(self, emp_code):
         """UI updates (Called via self.after from worker)"""
@@ -281,8 +423,16 @@ class AttendanceFrame(tk.Frame):
     def stop_system(self):
         self.is_running = False
         self.stop_event.set() # Stop worker
+        self.frame_slot.close()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline = None
+        else:
+            logger.info(f"Recognition session: frames {self.scheduler.stats}, faces {self.tracker.stats}")
+        logger.info(f"Reference cache: {reference_cache.stats()}")
         if self.cap: self.cap.release()
 
     def destroy(self):
+        EmployeeModel.remove_listener(self.on_employee_change)
         self.stop_system()
         super().destroy()
\ No newline at end of file
@@ -7,10 +7,17 @@ import logging
 
 from ui.styles import *
 from models.employee_model import EmployeeModel
-from services.face_service import detect_head_pose, get_face_landmarks, get_face_encodings
+from services.enrollment_capture import PoseCaptureWorker, POSE_SEQUENCE
 
 logger = logging.getLogger(__name__)
 
+# Instruction banner per target pose
+POSE_INSTRUCTIONS = {
+    'FRONT': ("Look Straight 😐", "#3498db"),
+    'LEFT': ("Turn Head Left ⬅️", "#e67e22"),
+    'RIGHT': ("Turn Head Right ➡️", "#e67e22"),
+}
+
 class EmployeeFrame(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg=BACKGROUND_MAIN)
@@ -24,7 +31,8 @@ class EmployeeFrame(tk.Frame):
         
         # State Machine: 'IDLE', 'FRONT', 'LEFT', 'RIGHT', 'DONE'
         self.capture_state = 'IDLE' 
-        self.frame_stability_counter = 0 # To ensure pose is stable before capturing
+        self.pose_ok = False # Worker reports the target pose is being held
+        self.capture_worker = None # Pose detection + encoding run off the Tk thread
         
         # UI Layout
         self.grid_columnconfigure(0, weight=1) # Form
@@ -127,7 +135,9 @@ class EmployeeFrame(tk.Frame):
                 self.btn_start.config(text="Stop Camera", bg=ERROR_COLOR)
                 self.captured_encodings = []
                 self.capture_state = 'FRONT' # Start State
+                self.pose_ok = False
                 self.progress['value'] = 0
+                self.capture_worker = PoseCaptureWorker().start()
                 self.update_frame()
             except Exception as e:
                 messagebox.showerror("Camera Error", str(e))
@@ -137,12 +147,20 @@ class EmployeeFrame(tk.Frame):
 
     def stop_camera(self):
         self.is_camera_on = False
+        if self.capture_worker:
+            self.capture_worker.stop()
+            self.capture_worker = None
         if self.cap:
             self.cap.release()
         self.btn_start.config(text="Start Camera", bg=ACCENT_COLOR)
         self.cam_canvas.delete("all")
         self.lbl_instruction.config(text="Camera Stopped", bg=SIDEBAR_BG)
 
+    def destroy(self):
+        # Leaving the screen with the camera on must not leave the worker / camera running
+        self.stop_camera()
+        super().destroy()
+
     def update_frame(self):
         if not self.is_camera_on: return
 
@@ -155,14 +173,19 @@ class EmployeeFrame(tk.Frame):
             # Mirror Effect (Better UX)
             frame = cv2.flip(frame, 1)
             
-            # Processing Logic (Pose & Auto Capture)
-            frame_processed = self.process_auto_capture(frame)
+            # Pose & Auto Capture run on the worker; apply what it reported so far
+            self.capture_worker.submit(frame)
+            self.apply_capture_events()
             
-            # Render to UI
-            rgb_frame = cv2.cvtColor(frame_processed, cv2.COLOR_BGR2RGB)
-            rgb_frame = cv2.resize(rgb_frame, (440, 330))
+            # Render to UI (the worker still reads `frame`, so draw on the resized copy)
+            display = cv2.resize(frame, (440, 330), interpolation=cv2.INTER_AREA)
+            if self.pose_ok:
+                # Draw Green Box to indicate "Good"
+                cv2.rectangle(display, (10, 10), (430, 320), (0, 255, 0), 3)
+            rgb_frame = cv2.cvtColor(display, cv2.COLOR_BGR2RGB)
             img = Image.fromarray(rgb_frame)
             imgtk = ImageTk.PhotoImage(image=img)
+            self.cam_canvas.delete("all")
             self.cam_canvas.create_image(0, 0, anchor="nw", image=imgtk)
             self.cam_canvas.imgtk = imgtk
 
@@ -175,74 +198,30 @@ class EmployeeFrame(tk.Frame):
             logger.error(f"Frame Update Error: {e}")
             self.stop_camera()
 
-    def process_auto_capture(self, frame):
-        """State Machine for capturing 3 Front, 1 Left, 1 Right"""
-        
-        # --- STATE MACHINE ---
-        target_pose = 'FRONT'
-        if self.capture_state == 'FRONT':
-            target_pose = 'FRONT'
-            self.update_instruction("Look Straight 😐", "#3498db")
-            
-        elif self.capture_state == 'LEFT':
-            target_pose = 'LEFT'
-            self.update_instruction("Turn Head Left ⬅️", "#e67e22")
-            
-        elif self.capture_state == 'RIGHT':
-            target_pose = 'RIGHT'
-            self.update_instruction("Turn Head Right ➡️", "#e67e22")
-        
-        # Resize for speed
-        small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
-        rgb_small = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
-        
-        # Detect Landmarks
-        landmarks_list = get_face_landmarks(rgb_small)
-        
-        if not landmarks_list:
-            self.update_instruction("No Face Detected", "#e74c3c")
-            return frame
-        
-        # Assuming single face
-        landmarks = landmarks_list[0]
-        
-        pose = detect_head_pose(landmarks)
-
-        # Capture Logic
-        if pose == target_pose:
-            self.frame_stability_counter += 1
-            # Draw Green Box to indicate "Good"
-            h, w, _ = frame.shape
-            cv2.rectangle(frame, (20, 20), (w-20, h-20), (0, 255, 0), 4)
-            
-            # Require 10 consecutive stable frames (~0.3s)
-            if self.frame_stability_counter > 8:
-                self._capture_snap(rgb_small)
-                self.frame_stability_counter = 0 # Reset
-        else:
-            self.frame_stability_counter = 0 # Reset if user moves
-
-        return frame
-
-    def _capture_snap(self, rgb_frame):
-        """Encodings generate karta hai aur state change karta hai"""
-        encodings = get_face_encodings(rgb_frame)
-        if not encodings:
-            return
-        
-        self.captured_encodings.append(encodings[0])
-        count = len(self.captured_encodings)
-        self.progress['value'] = (count / 5) * 100
-        
-        # State Transitions
-        if count < 3:
-            self.capture_state = 'FRONT' # Keep taking Front
-        elif count == 3:
-            self.capture_state = 'LEFT' # Next state is LEFT
-        elif count == 4:
-            self.capture_state = 'RIGHT' # Next
-        elif count == 5:
-            self.capture_state = 'DONE' # Finished
+    def apply_capture_events(self):
+        """State Machine updates from the worker: 3 Front, 1 Left, 1 Right"""
+        for event in self.capture_worker.poll():
+            kind = event[0]
+            if kind == "pose":
+                _, target, pose = event
+                self.capture_state = target
+                self.pose_ok = pose == target
+                if pose is None:
+                    self.update_instruction("No Face Detected", "#e74c3c")
+                else:
+                    self.update_instruction(*POSE_INSTRUCTIONS[target])
+            elif kind == "captured":
+                _, target, count = event
+                self.capture_state = target
+                self.pose_ok = False
+                self.progress['value'] = (count / len(POSE_SEQUENCE)) * 100
+                self.update_instruction(*POSE_INSTRUCTIONS[target])
+            elif kind == "done":
+                self.captured_encodings = event[1]
+                self.progress['value'] = 100
+                self.capture_state = 'DONE' # Finished
+            elif kind == "error":
+                raise RuntimeError(event[1])
 
     def update_instruction(self, text, color):
         self.lbl_instruction.config(text=text, bg=color)
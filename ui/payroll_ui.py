@@ -1,14 +1,28 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from tkcalendar import DateEntry
 from datetime import datetime
 import os
 import subprocess
 import platform
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from ui.styles import *
 from services.payroll_service import PayrollService
+from services.report_export import default_path, export_attendance_matrix, export_payroll_register
 from models.employee_model import EmployeeModel # To get list of employees
+from ui.virtual_table import ColumnStore, VirtualTable
+
+# Rows computed / inserted per UI tick while streaming a payroll run
+ROW_CHUNK = 500
+POLL_MS = 50
+
+# Payroll result fields kept per employee, plus the UI-only "action" column
+PAYROLL_FIELDS = ("emp_code", "name", "dept", "role", "month_year", "base_salary", "present_days",
+                  "leaves", "pf", "tax", "bonus", "net_salary", "status", "action")
+ALL = "All"
 
 class PayrollFrame(tk.Frame):
     def __init__(self, parent, controller):
@@ -16,9 +30,18 @@ class PayrollFrame(tk.Frame):
         self.controller = controller
         self.service = PayrollService()
         self.emp_model = EmployeeModel() # Reusing to fetch employee list
+
+        # Background computation (one run at a time; a new run cancels the old one)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="payroll")
+        self.load_cancel = threading.Event()
+        self.payroll_store = ColumnStore(PAYROLL_FIELDS, key="emp_code")
         
         self._init_ui()
 
+        # Changing the period invalidates whatever is being shown/computed
+        self.month_var.trace_add("write", self._on_period_change)
+        self.year_var.trace_add("write", self._on_period_change)
+
     def _init_ui(self):
         # Header
         header = tk.Frame(self, bg="white", padx=20, pady=15)
@@ -44,20 +67,34 @@ class PayrollFrame(tk.Frame):
                               bg=ACCENT_COLOR, fg="white", font=FONT_BOLD)
         btn_process.pack(side="left", padx=20)
 
-        # Table
-        columns = ("code", "name", "present", "leaves", "net_salary", "status")
-        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=15)
-        
-        self.tree.heading("code", text="Emp Code")
-        self.tree.heading("name", text="Name")
-        self.tree.heading("present", text="Present Days")
-        self.tree.heading("leaves", text="Approved Leaves")
-        self.tree.heading("net_salary", text="Net Salary (₹)")
-        self.tree.heading("status", text="Action")
-        
-        self.tree.column("code", width=80)
-        self.tree.column("name", width=150)
-        self.tree.pack(fill="both", expand=True, padx=20, pady=10)
+        self.lbl_load = tk.Label(controls, text="", font=FONT_NORMAL, bg=BACKGROUND_MAIN, fg="#7f8c8d")
+        self.lbl_load.pack(side="left")
+
+        # Filters (applied to the loaded results, no recalculation)
+        self.role_var = tk.StringVar(value=ALL)
+        self.dept_var = tk.StringVar(value=ALL)
+        roles = [ALL] + sorted(r[1] for r in self.emp_model.get_roles())
+        depts = [ALL] + sorted(d[1] for d in self.emp_model.get_departments())
+
+        role_cb = ttk.Combobox(controls, textvariable=self.role_var, values=roles, width=14, state="readonly")
+        role_cb.pack(side="right", padx=5)
+        tk.Label(controls, text="Role:", font=FONT_NORMAL, bg=BACKGROUND_MAIN).pack(side="right")
+        dept_cb = ttk.Combobox(controls, textvariable=self.dept_var, values=depts, width=14, state="readonly")
+        dept_cb.pack(side="right", padx=5)
+        tk.Label(controls, text="Dept:", font=FONT_NORMAL, bg=BACKGROUND_MAIN).pack(side="right")
+        role_cb.bind("<<ComboboxSelected>>", self._on_filter_change)
+        dept_cb.bind("<<ComboboxSelected>>", self._on_filter_change)
+
+        # Table (virtual: only the visible rows exist as Treeview items; click a heading to sort)
+        columns = ("emp_code", "name", "present_days", "leaves", "net_salary", "action")
+        headings = {
+            "emp_code": "Emp Code", "name": "Name", "present_days": "Present Days",
+            "leaves": "Approved Leaves", "net_salary": "Net Salary (₹)", "action": "Action",
+        }
+        self.table = VirtualTable(self, columns, headings, widths={"emp_code": 80, "name": 150},
+                                  visible_rows=15, bg=BACKGROUND_MAIN)
+        self.table.set_store(self.payroll_store)
+        self.table.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Action Buttons
         btn_frame = tk.Frame(self, bg=BACKGROUND_MAIN)
@@ -67,48 +104,121 @@ class PayrollFrame(tk.Frame):
         tk.Button(btn_frame, text="+ Add Leave", command=self.open_add_leave_dialog,
                  bg="#e67e22", fg="white", font=FONT_BOLD, padx=15).pack(side="left")
 
+        # Left Side: CSV Exports (streamed to disk in the background)
+        self.btn_export_register = tk.Button(btn_frame, text="Export Register",
+                 command=lambda: self.export_report("payroll_register", export_payroll_register, self.btn_export_register),
+                 bg="#7f8c8d", fg="white", font=FONT_BOLD, padx=15)
+        self.btn_export_register.pack(side="left", padx=(10, 5))
+        self.btn_export_attendance = tk.Button(btn_frame, text="Export Attendance",
+                 command=lambda: self.export_report("attendance", export_attendance_matrix, self.btn_export_attendance),
+                 bg="#7f8c8d", fg="white", font=FONT_BOLD, padx=15)
+        self.btn_export_attendance.pack(side="left", padx=5)
+
         # Right Side: Payroll Actions
+        self.btn_batch = tk.Button(btn_frame, text="Generate All Payslips", command=self.generate_all_pdfs,
+                 bg="#34495e", fg="white", font=FONT_BOLD, padx=15)
+        self.btn_batch.pack(side="right", padx=5)
+
         tk.Button(btn_frame, text="Generate PDF", command=self.generate_pdf, 
                  bg="#34495e", fg="white", font=FONT_BOLD, padx=15).pack(side="right", padx=5)
                  
+        self.btn_pay_all = tk.Button(btn_frame, text="✓ Mark All as Paid", command=self.mark_all_paid,
+                 bg="#27ae60", fg="white", font=FONT_BOLD, padx=15)
+        self.btn_pay_all.pack(side="right", padx=5)
+
         tk.Button(btn_frame, text="✓ Mark as Paid", command=self.mark_paid, 
                  bg="#27ae60", fg="white", font=FONT_BOLD, padx=15).pack(side="right", padx=5)
 
+        self.lbl_batch = tk.Label(btn_frame, text="", font=FONT_NORMAL, bg=BACKGROUND_MAIN, fg=TEXT_DARK)
+        self.lbl_batch.pack(side="right", padx=10)
+
     def load_data(self):
-        # Clear Table
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Get all employees
-        # Note: Ideally EmployeeModel should have get_all_employees(), assume direct DB fetch here for speed
-        conn = self.emp_model.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT emp_code FROM employees WHERE is_active=1")
-        emps = cursor.fetchall()
-        conn.close()
-        
-        self.current_payroll_data = []
-        
-        for (code,) in emps:
-            data = self.service.calculate_salary(code, int(self.month_var.get()), int(self.year_var.get()))
-            if data:
-                self.current_payroll_data.append(data)
-                self.tree.insert("", "end", values=(
-                    data['emp_code'], data['name'], data['present_days'], 
-                    data['leaves'], data['net_salary'], "Ready"
-                ))
+        """Starts a background payroll run; rows stream into the table chunk by chunk."""
+        self.cancel_load()
+        self._clear_results()
+
+        try:
+            month, year = int(self.month_var.get()), int(self.year_var.get())
+        except ValueError:
+            return
+
+        cancel = threading.Event()
+        results = queue.Queue()
+        self.load_cancel = cancel
+        self.lbl_load.config(text="Calculating...")
+        self.executor.submit(self._compute_payroll, month, year, cancel, results)
+        self.after(POLL_MS, self._drain_results, cancel, results)
+
+    def cancel_load(self):
+        self.load_cancel.set()
+
+    def _on_period_change(self, *_):
+        self.cancel_load()
+        self._clear_results()
+        self.lbl_load.config(text="")
+
+    def _clear_results(self):
+        self.payroll_store.clear()
+        self.table.set_store(self.payroll_store)
+
+    def _on_filter_change(self, _event=None):
+        for column, var in (("dept", self.dept_var), ("role", self.role_var)):
+            value = var.get()
+            self.payroll_store.set_filter(column, None if value == ALL else value)
+        self.table.clear_selection()
+
+    def _compute_payroll(self, month, year, cancel, results):
+        """Worker thread: pushes result chunks, then None (or the exception)."""
+        try:
+            for chunk in self.service.iter_payroll(month, year, chunk_size=ROW_CHUNK):
+                if cancel.is_set():
+                    return
+                results.put(chunk)
+            results.put(None)
+        except Exception as e:
+            results.put(e)
+
+    def _drain_results(self, cancel, results):
+        """Main thread: inserts at most one chunk per tick so the UI stays responsive."""
+        if cancel.is_set() or not self.winfo_exists():
+            return
+        try:
+            chunk = results.get_nowait()
+        except queue.Empty:
+            self.after(POLL_MS, self._drain_results, cancel, results)
+            return
+
+        if chunk is None:
+            self.lbl_load.config(text=f"{self.payroll_store.total} employees")
+            return
+        if isinstance(chunk, Exception):
+            self.lbl_load.config(text="")
+            messagebox.showerror("Error", f"Payroll calculation failed: {chunk}")
+            return
+
+        for data in chunk:
+            data['action'] = "Ready"
+        self.payroll_store.extend(chunk)
+        self.table.refresh()
+        self.lbl_load.config(text=f"{self.payroll_store.total} employees...")
+        self.after(1, self._drain_results, cancel, results)
+
+    def _refresh_row(self, code):
+        """Recomputes one employee and updates only that row (action is kept)."""
+        if code not in self.payroll_store:
+            return
+        data = self.service.calculate_salary(code, int(self.month_var.get()), int(self.year_var.get()))
+        if not data:
+            return
+        self.table.update_record(code, data)
 
     def generate_pdf(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
+        code = self.table.selected_key()
+        if code is None:
             messagebox.showwarning("Select Employee", "Please select an employee row to generate payslip.")
             return
-            
-        item = self.tree.item(selected_item)
-        code = item['values'][0]
         
-        # Find data
-        data = next((x for x in self.current_payroll_data if x['emp_code'] == code), None)
+        data = self.payroll_store.record(code)
         if data:
             path = self.service.generate_payslip_pdf(data)
             messagebox.showinfo("Success", f"Payslip saved at:\n{path}")
@@ -119,15 +229,82 @@ class PayrollFrame(tk.Frame):
             elif platform.system() == 'Linux':
                 subprocess.call(['xdg-open', path])
 
+    def generate_all_pdfs(self):
+        """Month-end batch: renders every payslip in worker processes without freezing the UI."""
+        month = int(self.month_var.get())
+        year = int(self.year_var.get())
+        if not messagebox.askyesno("Generate Payslips", f"Generate payslips for all employees ({month}-{year})?"):
+            return
+
+        self.btn_batch.config(state="disabled")
+        self.lbl_batch.config(text="Starting...")
+
+        def on_progress(done, total):
+            self.after(0, lambda: self.lbl_batch.config(text=f"{done}/{total} payslips"))
+
+        def run():
+            try:
+                summary = self.service.generate_payslips_batch(month, year, progress=on_progress)
+                self.after(0, lambda: self._on_batch_done(summary))
+            except Exception as e:
+                self.after(0, lambda: self._on_batch_done(None, str(e)))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_batch_done(self, summary, error=None):
+        self.btn_batch.config(state="normal")
+        if error:
+            self.lbl_batch.config(text="")
+            messagebox.showerror("Error", error)
+            return
+        self.lbl_batch.config(text=f"{summary['slips_per_sec']} slips/sec")
+        messagebox.showinfo(
+            "Payslips Generated",
+            f"{summary['count']} payslips saved to:\n{summary['output_dir']}\n"
+            f"Failed: {summary['failed']} | Time: {summary['seconds']}s",
+        )
+
+    def export_report(self, kind, export, button):
+        """Asks for a target file and streams the month's report there off the UI thread."""
+        month = int(self.month_var.get())
+        year = int(self.year_var.get())
+        suggested = default_path(kind, month, year)
+        path = filedialog.asksaveasfilename(
+            title="Export CSV", defaultextension=".csv", initialfile=os.path.basename(suggested),
+            filetypes=[("CSV files", "*.csv")],
+        )
+        if not path:
+            return
+
+        button.config(state="disabled")
+
+        def on_progress(rows):
+            self.after(0, lambda: self.lbl_batch.config(text=f"{rows} rows exported"))
+
+        def run():
+            try:
+                summary = export(month, year, path=path, progress=on_progress)
+                self.after(0, lambda: self._on_export_done(button, summary))
+            except Exception as e:
+                self.after(0, lambda: self._on_export_done(button, None, str(e)))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_export_done(self, button, summary, error=None):
+        button.config(state="normal")
+        self.lbl_batch.config(text="")
+        if error:
+            messagebox.showerror("Export Failed", error)
+            return
+        messagebox.showinfo("Export Complete", f"{summary['rows']} rows saved to:\n{summary['path']}\nTime: {summary['seconds']}s")
+
     def mark_paid(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
+        code = self.table.selected_key()
+        if code is None:
             messagebox.showwarning("Select Employee", "Select an employee to mark as paid.")
             return
             
-        item = self.tree.item(selected_item)
-        code = item['values'][0]
-        net_salary = float(item['values'][4]) # Fetch from tree column
+        net_salary = float(self.payroll_store.record(code)['net_salary'])
         
         confirm = messagebox.askyesno("Confirm Payment", f"Mark ₹{net_salary} as PAID for {code}?")
         if confirm:
@@ -137,10 +314,38 @@ class PayrollFrame(tk.Frame):
             success, msg = self.service.mark_as_paid(code, month, year, net_salary)
             if success:
                 messagebox.showinfo("Success", msg)
-                self.load_data() # Refresh list
+                self.table.update_record(code, {"action": "Paid"}) # Only this row changed
             else:
                 messagebox.showerror("Error", msg)
 
+    def mark_all_paid(self):
+        """Closes the month for every employee in one transaction (re-runs are no-ops)."""
+        month = int(self.month_var.get())
+        year = int(self.year_var.get())
+        if not messagebox.askyesno("Confirm Payment", f"Mark ALL employees as PAID for {month}-{year}?"):
+            return
+
+        self.btn_pay_all.config(state="disabled")
+
+        def run():
+            try:
+                success, msg = self.service.mark_all_as_paid(month, year)
+            except Exception as e:
+                success, msg = False, str(e)
+            self.after(0, lambda: self._on_pay_all_done(success, msg, (month, year)))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_pay_all_done(self, success, msg, period):
+        self.btn_pay_all.config(state="normal")
+        if not success:
+            messagebox.showerror("Error", msg)
+            return
+        if period == (int(self.month_var.get()), int(self.year_var.get())):
+            self.payroll_store.fill("action", "Paid")
+            self.table.refresh()
+        messagebox.showinfo("Success", msg)
+
     def open_add_leave_dialog(self):
         top = tk.Toplevel(self)
         top.title("Add Leave Record")
@@ -166,8 +371,13 @@ class PayrollFrame(tk.Frame):
             if success:
                 messagebox.showinfo("Done", msg)
                 top.destroy()
-                self.load_data() # Refresh if needed
+                self._refresh_row(code) # Only this employee's leave count changed
             else:
                 messagebox.showerror("Error", msg)
                 
-        tk.Button(top, text="Save Leave", command=submit, bg=ACCENT_COLOR, fg="white").pack(pady=20)
\ No newline at end of file
+        tk.Button(top, text="Save Leave", command=submit, bg=ACCENT_COLOR, fg="white").pack(pady=20)
+
+    def destroy(self):
+        self.cancel_load()
+        self.executor.shutdown(wait=False)
+        super().destroy()
\ No newline at end of file
@@ -0,0 +1,303 @@
+import bisect
+import heapq
+import tkinter as tk
+from tkinter import ttk
+
+
+class ColumnStore:
+    """
+    Columnar record store with an O(1) key index and a filtered/sorted view.
+    Records are dicts; each field is kept in its own list. The 'view' is a
+    list of row numbers, so sort/filter never copies the records.
+    """
+
+    def __init__(self, columns, key):
+        self.key = key
+        self.columns = {name: [] for name in columns}
+        self._index = {}
+        self._view = []
+        self._filters = {}
+        self._sort = None  # (column, descending)
+
+    def clear(self):
+        for values in self.columns.values():
+            values.clear()
+        self._index.clear()
+        self._view = []
+
+    def __len__(self):
+        """Rows in the current (filtered) view."""
+        return len(self._view)
+
+    @property
+    def total(self):
+        return len(self._index)
+
+    def extend(self, records):
+        start = self.total
+        for record in records:
+            self._index[record[self.key]] = len(self._index)
+            for name, values in self.columns.items():
+                values.append(record.get(name))
+        new_rows = [row for row in range(start, self.total) if self._matches(row)]
+        if self._sort:
+            # Merge the sorted batch into the existing view instead of re-sorting everything
+            key, descending = self._sort_key(), self._sort[1]
+            new_rows.sort(key=key, reverse=descending)
+            self._view = list(heapq.merge(self._view, new_rows, key=key, reverse=descending))
+        else:
+            self._view.extend(new_rows)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def record(self, key):
+        row = self._index.get(key)
+        if row is None:
+            return None
+        return {name: values[row] for name, values in self.columns.items()}
+
+    def update(self, key, record):
+        """
+        Updates one row in place. If the sort column or a filtered column
+        changed, only that row is moved in (or dropped from) the view.
+        Returns True when the view changed.
+        """
+        row = self._index[key]
+        for name, values in self.columns.items():
+            if name in record:
+                values[row] = record[name]
+        watched = set(self._filters)
+        if self._sort:
+            watched.add(self._sort[0])
+        if watched.isdisjoint(record):
+            return False
+        return self._reposition(row)
+
+    def _reposition(self, row):
+        try:
+            pos = self._view.index(row)
+            del self._view[pos]
+        except ValueError:
+            pos = None
+        if not self._matches(row):
+            return pos is not None
+        if not self._sort:
+            bisect.insort(self._view, row)  # Unsorted view is in row order
+        else:
+            key, descending = self._sort_key(), self._sort[1]
+            k = key(row)
+            lo, hi = 0, len(self._view)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                mk = key(self._view[mid])
+                if mk >= k if descending else mk <= k:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            self._view.insert(lo, row)
+        return self._view.index(row) != pos
+
+    def fill(self, column, value):
+        """Sets column to value on every row."""
+        values = self.columns[column]
+        values[:] = [value] * len(values)
+        if self._sort and self._sort[0] == column:
+            self._rebuild_view()
+
+    def key_at(self, pos):
+        return self.columns[self.key][self._view[pos]]
+
+    def position_of(self, key):
+        row = self._index.get(key)
+        try:
+            return self._view.index(row)
+        except ValueError:
+            return None
+
+    def rows(self, start, stop, columns):
+        """Display tuples for view positions [start, stop)."""
+        cols = [self.columns[name] for name in columns]
+        return [tuple(col[row] for col in cols) for row in self._view[start:stop]]
+
+    def distinct(self, column):
+        return sorted({v for v in self.columns[column] if v is not None})
+
+    def set_filter(self, column, value):
+        """Keep only rows where column == value (None removes the filter)."""
+        if value is None:
+            self._filters.pop(column, None)
+        else:
+            self._filters[column] = value
+        self._rebuild_view()
+
+    def sort_by(self, column, descending=False):
+        self._sort = (column, descending)
+        self._rebuild_view()
+
+    def _matches(self, row):
+        return all(self.columns[col][row] == value for col, value in self._filters.items())
+
+    def _rebuild_view(self):
+        view = [row for row in range(self.total) if self._matches(row)]
+        if self._sort:
+            view.sort(key=self._sort_key(), reverse=self._sort[1])
+        self._view = view
+
+    def _sort_key(self):
+        values = self.columns[self._sort[0]]
+        return lambda row: (values[row] is None, values[row])
+
+
+class VirtualTable(tk.Frame):
+    """
+    Treeview that only materializes the visible window of a ColumnStore.
+    A fixed set of slot items is created once; scrolling just rewrites their
+    values, so 50k rows cost the same widgets as 20.
+    """
+    ROW_HEIGHT = 20
+    HEADER_HEIGHT = 25
+
+    def __init__(self, parent, columns, headings, widths=None, visible_rows=15, on_select=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.column_ids = list(columns)
+        self.store = None
+        self.offset = 0
+        self.on_select = on_select
+        self._selected_key = None
+        self._sort_state = {}
+
+        self.tree = ttk.Treeview(self, columns=self.column_ids, show="headings",
+                                 height=visible_rows, selectmode="browse")
+        for col in self.column_ids:
+            self.tree.heading(col, text=headings[col], command=lambda c=col: self.toggle_sort(c))
+            if widths and col in widths:
+                self.tree.column(col, width=widths[col])
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.slots = []
+        self._set_slot_count(visible_rows)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.tree.bind("<Up>", lambda e: self._step_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._step_selection(1))
+
+    # --- Data ---
+    def set_store(self, store):
+        self.store = store
+        self.offset = 0
+        self._selected_key = None
+        self.refresh()
+
+    def selected_key(self):
+        return self._selected_key
+
+    def clear_selection(self):
+        self._selected_key = None
+        self.refresh()
+
+    def toggle_sort(self, column):
+        if self.store is None:
+            return
+        descending = not self._sort_state.get(column, True)
+        self._sort_state = {column: descending}
+        self.store.sort_by(column, descending)
+        self.refresh()
+
+    # --- Rendering ---
+    def _set_slot_count(self, count):
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", "end", values=()))
+        while len(self.slots) > count:
+            self.tree.delete(self.slots.pop())
+
+    def refresh(self):
+        """Rewrites the visible slots from the store (no item insert/delete)."""
+        total = len(self.store) if self.store is not None else 0
+        n_slots = len(self.slots)
+        self.offset = max(0, min(self.offset, total - n_slots))
+        rows = self.store.rows(self.offset, self.offset + n_slots, self.column_ids) if total else []
+
+        selected_slot = None
+        for i, slot in enumerate(self.slots):
+            if i < len(rows):
+                self.tree.item(slot, values=rows[i])
+                self.tree.move(slot, "", i)
+                if self.store.key_at(self.offset + i) == self._selected_key:
+                    selected_slot = slot
+            else:
+                self.tree.detach(slot)
+
+        if selected_slot:
+            self.tree.selection_set(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + n_slots) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def update_record(self, key, record):
+        """Updates one store row; redraws everything if it moved, else only if visible."""
+        if self.store.update(key, record):
+            self.refresh()
+        else:
+            self.refresh_key(key)
+
+    def refresh_key(self, key):
+        """Re-render only if key is currently on screen."""
+        pos = self.store.position_of(key) if self.store is not None else None
+        if pos is not None and self.offset <= pos < self.offset + len(self.slots):
+            self.refresh()
+
+    # --- Scrolling ---
+    def scroll(self, amount, what="units"):
+        step = amount * (len(self.slots) if what == "pages" else 1)
+        self.offset += step
+        self.refresh()
+        return "break"
+
+    def _on_scrollbar(self, action, value, what=None):
+        if action == "moveto" and self.store is not None:
+            self.offset = int(float(value) * len(self.store))
+            self.refresh()
+        elif action == "scroll":
+            self.scroll(int(value), what)
+
+    def _on_resize(self, event):
+        rows = max(1, (event.height - self.HEADER_HEIGHT) // self.ROW_HEIGHT)
+        if rows != len(self.slots):
+            self._set_slot_count(rows)
+            self.refresh()
+
+    # --- Selection ---
+    def _on_tree_select(self, _event):
+        selection = self.tree.selection()
+        if not selection or self.store is None:
+            return
+        pos = self.offset + self.slots.index(selection[0])
+        if pos < len(self.store):
+            self._selected_key = self.store.key_at(pos)
+            if self.on_select:
+                self.on_select(self._selected_key)
+
+    def _step_selection(self, delta):
+        if self.store is None or not len(self.store):
+            return "break"
+        pos = self.store.position_of(self._selected_key) if self._selected_key is not None else None
+        pos = 0 if pos is None else max(0, min(len(self.store) - 1, pos + delta))
+        self._selected_key = self.store.key_at(pos)
+        if pos < self.offset:
+            self.offset = pos
+        elif pos >= self.offset + len(self.slots):
+            self.offset = pos - len(self.slots) + 1
+        self.refresh()
+        return "break"
@@ -0,0 +1,66 @@
+"""
+Binary storage format for face encodings (face_encodings.encoding BLOB).
+
+Layout: 4-byte tag + 128 little-endian float32 values (516 bytes).
+    tag = b"FE" (magic) + version byte + dtype byte (b"f" = float32 LE)
+Rows written before this format are pickled ndarrays; those are NOT
+loaded at runtime and must be converted once with:
+    python -m database.migrate_encodings
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENCODING_DIM = 128
+FORMAT_VERSION = 1
+ENCODING_TAG = b"FE" + bytes([FORMAT_VERSION]) + b"f"
+ENCODING_DTYPE = np.dtype("<f4")
+TAG_LEN = len(ENCODING_TAG)
+BLOB_LEN = TAG_LEN + ENCODING_DIM * ENCODING_DTYPE.itemsize
+
+PICKLE_PREFIX = b"\x80"  # Every pickle protocol >= 2 starts with PROTO opcode
+
+
+def pack_encoding(encoding) -> bytes:
+    """ndarray(128,) -> tagged float32 BLOB."""
+    arr = np.asarray(encoding, dtype=ENCODING_DTYPE).reshape(ENCODING_DIM)
+    return ENCODING_TAG + arr.tobytes()
+
+
+def is_packed(blob) -> bool:
+    return len(blob) == BLOB_LEN and bytes(blob[:TAG_LEN]) == ENCODING_TAG
+
+
+def is_legacy_pickle(blob) -> bool:
+    return bytes(blob[:1]) == PICKLE_PREFIX
+
+
+def unpack_into(blob, out_row):
+    """Decode one BLOB straight into a preallocated float32 row (no intermediate copies)."""
+    if not is_packed(blob):
+        raise ValueError("Unsupported face encoding format")
+    out_row[:] = np.frombuffer(blob, dtype=ENCODING_DTYPE, count=ENCODING_DIM, offset=TAG_LEN)
+
+
+def unpack_rows(rows):
+    """
+    rows: [(blob, ...), ...] -> (float32 matrix N x 128, rows that were decoded).
+    Legacy pickle rows are skipped (never unpickled at runtime).
+    """
+    matrix = np.empty((len(rows), ENCODING_DIM), dtype=np.float32)
+    kept = []
+    for row in rows:
+        if not is_packed(row[0]):
+            continue
+        unpack_into(row[0], matrix[len(kept)])
+        kept.append(row)
+
+    skipped = len(rows) - len(kept)
+    if skipped:
+        logger.warning(
+            f"Skipped {skipped} face samples in legacy format. "
+            "Run 'python -m database.migrate_encodings' to convert them."
+        )
+    return matrix[:len(kept)], kept